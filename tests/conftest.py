@@ -0,0 +1,31 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'virtual-esoteric-toolkit.py')
+
+
+def load_toolkit():
+    spec = importlib.util.spec_from_file_location('virtual_esoteric_toolkit', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so pool workers can unpickle the chunk functions by module name
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='session')
+def vet():
+    return load_toolkit()
+
+
+@pytest.fixture(scope='session')
+def sky(vet):
+    # The astronomy checks need skyfield and de421.bsp in the working directory (never downloaded by the tests)
+    pytest.importorskip('skyfield')
+    if not os.path.exists(vet.EPHEMERIS_FILE):
+        pytest.skip(f"{vet.EPHEMERIS_FILE} not in the working directory")
+    vet.ephemeris()
+    return vet
@@ -0,0 +1,89 @@
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+ROWS = [
+    {'id': 'a', 'datetime': '1990-05-17T14:30', 'latitude': '48.8566', 'longitude': '2.3522'},
+    {'id': '', 'datetime': '1955-02-24T19:15', 'latitude': '37.7749', 'longitude': '-122.4194'},
+    {'id': 'c', 'datetime': '2001-09-11T08:46', 'latitude': '-33.8688', 'longitude': '151.2093'},
+    {'id': '', 'datetime': '1979-12-31T23:59', 'latitude': '64.1466', 'longitude': '-21.9426'},
+] + [{'id': f"r{index}", 'datetime': f"{1920 + 3 * index}-{1 + index % 12:02d}-{1 + index % 28:02d}T{index % 24:02d}:{7 * index % 60:02d}",
+      'latitude': f"{-60 + 6 * index}", 'longitude': f"{-170 + 17 * index}"} for index in range(20)]
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / 'births.csv'
+    path.write_text('id,datetime,latitude,longitude\n' + ''.join(f"{row['id']},{row['datetime']},{row['latitude']},{row['longitude']}\n" for row in ROWS))
+    return str(path)
+
+
+def test_batch_records_match_one_chart_at_a_time(sky, csv_file):
+    records = list(sky.batch_charts(sky.read_rows(csv_file), workers=1, chunk_rows=5))
+    # Rows without an id are numbered by their position in the file
+    assert [record['id'] for record in records] == [row['id'] or index for index, row in enumerate(ROWS, 1)]
+    for record, row in zip(records, ROWS):
+        degrees = sky.chart_longitudes(datetime.fromisoformat(row['datetime']), float(row['latitude']), float(row['longitude']))
+        for (_, key), degree in zip(sky.CHART_BODIES, degrees):
+            assert record[f"{key}_degree"] == pytest.approx(degree, abs=1e-4)
+            assert record[f"{key}_sign"] == sky.get_sign(degree).split()[0]
+
+
+def test_chunking_and_workers_do_not_change_the_output(sky, csv_file):
+    records = list(sky.batch_charts(sky.read_rows(csv_file), workers=1, chunk_rows=5))
+    assert list(sky.batch_charts(sky.read_rows(csv_file), workers=2, chunk_rows=3)) == records
+    assert list(sky.batch_charts(sky.read_rows(csv_file), workers=1, chunk_rows=1000)) == records
+
+
+def test_jsonl_in_and_out(sky, csv_file, tmp_path):
+    jsonl = tmp_path / 'births.jsonl'
+    # Offsets are converted to UTC, and lat/lon work as short keys
+    jsonl.write_text(json.dumps({'id': 'tz', 'datetime': '1990-05-17T16:30+02:00', 'lat': 48.8566, 'lon': 2.3522}) + '\n\n')
+    record, = sky.batch_charts(sky.read_rows(str(jsonl)), workers=1)
+    first = next(sky.batch_charts(sky.read_rows(csv_file), workers=1))
+    assert {key: value for key, value in record.items() if key != 'id'} == {key: value for key, value in first.items() if key != 'id'}
+    out = tmp_path / 'charts.jsonl'
+    assert sky.write_rows(sky.batch_charts(sky.read_rows(csv_file), workers=1), str(out)) == len(ROWS)
+    assert [json.loads(line)['id'] for line in out.read_text().splitlines()] == [row['id'] or index for index, row in enumerate(ROWS, 1)]
+
+
+def test_csv_output_keeps_one_row_per_chart(sky, csv_file, tmp_path):
+    out = tmp_path / 'charts.csv'
+    assert sky.write_rows(sky.batch_charts(sky.read_rows(csv_file), workers=1), str(out)) == len(ROWS)
+    rows = list(sky.read_rows(str(out)))
+    assert len(rows) == len(ROWS) and rows[0]['sun_sign'] == 'Taurus'
+    assert np.isclose(float(rows[0]['moon_degree']), next(sky.batch_charts(sky.read_rows(csv_file), workers=1))['moon_degree'])
+
+
+@pytest.mark.parametrize('row, message', [
+    ({'id': 7, 'datetime': '1990-05-17T14:30', 'lat': '', 'lon': '2'}, 'Row 7 needs latitude'),
+    ({'id': 7, 'lat': '1', 'lon': '2'}, 'Row 7 needs datetime'),
+    ({'id': 7, 'datetime': 'yesterday', 'lat': '1', 'lon': '2'}, 'Row 7 has an invalid datetime'),
+    ({'id': 7, 'datetime': '1990-05-17T14:30', 'lat': 'north', 'lon': '2'}, 'Row 7 needs a number'),
+    ({'id': 7, 'datetime': '1990-05-17T14:30', 'lat': '90.5', 'lon': '2'}, 'Row 7 has latitude 90.5'),
+    ({'id': 7, 'datetime': '1990-05-17T14:30', 'lat': 'nan', 'lon': '2'}, 'Row 7 has latitude nan'),
+    ({'id': 7, 'datetime': '1990-05-17T14:30', 'lat': '1', 'lon': '-180.01'}, 'Row 7 has longitude -180.01'),
+    ({'datetime': '1990-05-17T14:30', 'lat': '1', 'lon': '200'}, 'Birth data has longitude 200.0'),
+])
+def test_bad_rows_name_the_row_and_the_problem(vet, row, message):
+    with pytest.raises(ValueError, match=message):
+        vet.parse_birth(row)
+
+
+def test_coordinate_limits_are_inclusive(vet):
+    assert vet.parse_birth({'datetime': '2000-01-01T00:00', 'lat': -90, 'lon': 180})[2:] == (-90.0, 180.0)
+
+
+def test_bad_rows_are_reported_and_skipped(sky):
+    bad = [dict(ROWS[0], id='', latitude=''), dict(ROWS[2], id='far', longitude='190')]
+    rows = ROWS[:3] + bad[:1] + ROWS[3:10] + bad[1:]
+    skipped = []
+    records = list(sky.batch_charts([dict(row) for row in rows], workers=1, chunk_rows=4, skipped=skipped.append))
+    assert skipped == ["Row 4 needs latitude.", "Row far has longitude 190.0; it must be between -180 and 180."]
+    assert [record['id'] for record in records] == [row['id'] or index for index, row in enumerate(rows, 1) if row not in bad]
+    assert list(sky.batch_charts([dict(row) for row in rows], workers=2, chunk_rows=3, skipped=[].append)) == records
+    # Without somewhere to report them, a bad row stops the batch
+    with pytest.raises(ValueError, match='Row 4'):
+        list(sky.batch_charts([dict(row) for row in rows], workers=1))
@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def cache(vet, tmp_path):
+    cache = vet.ResultCache()
+    cache.enable(str(tmp_path / 'cache.sqlite'))
+    # A fixed version stands in for the ephemeris file's stat
+    cache.version = 'test'
+    return cache
+
+
+def key(day, observer=''):
+    return (f"2000-01-{day:02d}T00:00:00", observer)
+
+
+def stored_bytes(cache):
+    connection = cache.connect()
+    total, = connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()
+    counter, = connection.execute("SELECT value FROM counters WHERE tool = '*' AND name = 'bytes'").fetchone()
+    return total, counter
+
+
+def test_round_trip_and_counts(cache):
+    cache.put_many('chart', {key(1): [1.5, 2.5], key(2, '51.5,0.0'): {'sun': 280.1}})
+    found = cache.get_many('chart', [key(1), key(2, '51.5,0.0'), key(3)])
+    assert found == {key(1): [1.5, 2.5], key(2, '51.5,0.0'): {'sun': 280.1}}
+    assert (cache.hits, cache.misses, cache.errors) == (2, 1, 0)
+    report = cache.report()
+    assert report['tools']['chart'] == {'entries': 2, 'bytes': report['bytes'], 'hits': 2, 'misses': 1}
+    # Other tools and versions never see these rows
+    assert cache.get_many('moon', [key(1)]) == {}
+    cache.version = 'other'
+    assert cache.get_many('chart', [key(1)]) == {}
+
+
+def test_disabled_or_versionless_cache_is_a_no_op(vet, tmp_path):
+    cache = vet.ResultCache()
+    cache.version = 'test'
+    cache.put_many('chart', {key(1): 1})
+    assert cache.get_many('chart', [key(1)]) == {}
+    assert cache.connection is None
+
+
+def test_overwrite_keeps_the_byte_total(cache):
+    cache.put_many('chart', {key(day): list(range(day)) for day in range(1, 20)})
+    cache.put_many('chart', {key(day): 'x' * 100 * day for day in range(1, 20, 2)})
+    total, counter = stored_bytes(cache)
+    assert total == counter == cache.report()['bytes']
+    assert cache.get_many('chart', [key(3)]) == {key(3): 'x' * 300}
+
+
+def test_least_recently_used_rows_are_evicted(vet, cache):
+    size = len('chart') + len(key(1)[0]) + len('test') + len('"' + 'x' * 40 + '"') + vet.RESULT_CACHE_ROW_BYTES
+    cache.max_bytes = size * 10
+    for day in range(1, 11):
+        cache.put_many('chart', {key(day): 'x' * 40})
+        time.sleep(0.002)
+    assert cache.report()['evictions'] == 0
+    cache.get_many('chart', [key(1)])
+    time.sleep(0.002)
+    cache.put_many('chart', {key(11): 'x' * 40})
+    kept = cache.get_many('chart', [key(day) for day in range(1, 12)])
+    # Down to RESULT_CACHE_KEEP of the limit: the oldest untouched rows go, the one just read stays
+    assert sorted(kept) == [key(day) for day in (1, *range(4, 12))]
+    assert cache.report()['evictions'] == 1
+    total, counter = stored_bytes(cache)
+    assert total == counter <= cache.max_bytes
+
+
+def test_clear_resets_everything(cache):
+    cache.put_many('chart', {key(day): day for day in range(1, 5)})
+    cache.get_many('chart', [key(1)])
+    cache.clear()
+    report = cache.report()
+    assert (report['bytes'], report['evictions'], report['tools']) == (0, 0, {})
+    assert stored_bytes(cache) == (0, 0)
+
+
+def write_rows(cache, worker, errors):
+    for batch in range(20):
+        cache.put_many('chart', {key(day, f"{worker},{batch}"): 'x' * 200 for day in range(1, 21)})
+        cache.get_many('chart', [key(day, f"{(worker + 1) % 4},{batch}") for day in range(1, 21)])
+    errors.put(cache.errors)
+
+
+def test_processes_share_the_file(cache):
+    cache.max_bytes = 100 << 10
+    cache.put_many('chart', {key(1): 0})
+    context = multiprocessing.get_context('fork')
+    errors = context.Queue()
+    processes = [context.Process(target=write_rows, args=(cache, worker, errors)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+    assert [errors.get(timeout=5) for _ in processes] == [0] * 4
+    total, counter = stored_bytes(cache)
+    assert total == counter <= cache.max_bytes
+    assert cache.report()['evictions'] > 0
+
+
+def test_cached_tools_return_what_they_compute(sky, tmp_path, monkeypatch):
+    cache = sky.ResultCache()
+    cache.enable(str(tmp_path / 'tools.sqlite'))
+    monkeypatch.setattr(sky, 'RESULTS', cache)
+    when = [datetime(1990, 5, 17, 14, 30), datetime(2001, 9, 11, 8, 46)]
+    direct = sky.sky_chart_longitudes(when, [48.85, -33.87], [2.35, 151.21])
+    for _ in range(2):
+        assert np.allclose(sky.chart_longitudes(when, [48.85, -33.87], [2.35, 151.21]), direct)
+    start = date(2020, 1, 1)
+    days = [indices.tolist() for _, indices in sky.moon_phase_chunks(start, start + timedelta(days=40))]
+    assert [indices.tolist() for _, indices in sky.moon_phase_chunks(start, start + timedelta(days=40))] == days
+    assert cache.report()['tools']['chart']['hits'] == 2 and cache.report()['tools']['moon']['hits'] == 41
+
+
+def test_write_ahead_log_stays_small(vet, cache):
+    cache.max_bytes = 200 << 10
+    for day in range(1, 40):
+        cache.put_many('chart', {(f"2000-{month:02d}-{day:02d}T00:00:00", ''): 'x' * 2000 for month in range(1, 13)})
+    assert cache.report()['evictions'] > 0
+    # Each eviction checkpoints into the main file and truncates the log
+    wal = cache.path + '-wal'
+    assert os.path.getsize(wal) <= vet.RESULT_CACHE_WAL_BYTES
+    assert cache.connect().execute('PRAGMA journal_size_limit').fetchone()[0] == vet.RESULT_CACHE_WAL_BYTES
+    cache.max_bytes = 0
+    cache.put_many('chart', {key(1): 'x'})
+    assert os.path.getsize(wal) == 0
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+OBLIQUITY = np.radians(23.44)
+
+
+def equatorial(longitude, obliquity):
+    # Right ascension and declination of an ecliptic longitude (degrees in, radians out)
+    longitude = np.radians(longitude)
+    return (np.arctan2(np.sin(longitude) * np.cos(obliquity), np.cos(longitude)),
+            np.arcsin(np.sin(obliquity) * np.sin(longitude)))
+
+
+@pytest.mark.parametrize('cusp', range(4))
+def test_placidus_cusps_trisect_the_semi_arc(vet, cusp):
+    # RA of each cusp = RAMC + base + fraction of the semi-arc (90° plus or minus the cusp's own ascensional difference)
+    rng = np.random.default_rng(cusp)
+    ramc = rng.uniform(0, 2 * np.pi, 500)
+    latitude = np.radians(rng.uniform(-66, 66, 500))
+    base, fraction, above = vet.PLACIDUS_CUSPS[cusp]
+    longitude = vet.placidus_cusp(ramc, OBLIQUITY, latitude, base, fraction, above)
+    ra, declination = equatorial(longitude, OBLIQUITY)
+    ascensional = np.degrees(np.arcsin(np.tan(latitude) * np.tan(declination)))
+    expected = np.degrees(ramc) + base + fraction * (90 + ascensional if above else 90 - ascensional)
+    assert np.abs((np.degrees(ra) - expected + 180) % 360 - 180).max() < 1e-6
+
+
+def test_placidus_at_the_equator_spaces_houses_evenly_in_right_ascension(vet):
+    ramc = np.radians(np.arange(0, 360, 15.0))
+    for (base, fraction, above), step in zip(vet.PLACIDUS_CUSPS, (30, 60, 120, 150)):
+        ra, _ = equatorial(vet.placidus_cusp(ramc, OBLIQUITY, np.zeros_like(ramc), base, fraction, above), OBLIQUITY)
+        assert np.allclose((np.degrees(ra - ramc) - step + 180) % 360 - 180, 0, atol=1e-9)
+
+
+@pytest.mark.parametrize('system', ['placidus', 'porphyry', 'equal', 'whole'])
+def test_cusps_run_in_order_from_the_ascendant(vet, system):
+    when = [datetime(1990 + year, 1 + year % 12, 1 + year % 28, year % 24) for year in range(30)]
+    latitude = np.linspace(-60, 60, 30)
+    _, ascendant, midheaven, cusps = vet.chart_frame(when, latitude, np.linspace(-170, 170, 30), system)
+    assert cusps.shape == (12, 30)
+    steps = np.diff(np.vstack([cusps, cusps[:1]]), axis=0) % 360
+    assert np.allclose(steps.sum(axis=0), 360)
+    if system in ('placidus', 'porphyry'):
+        assert np.allclose(cusps[0], ascendant) and np.allclose(cusps[9], midheaven)
+    houses = vet.house_positions(cusps + 0.01, cusps)
+    assert np.array_equal(houses, np.repeat(np.arange(1, 13)[:, None], 30, axis=1))
+
+
+def test_placidus_is_undefined_inside_the_polar_circles(vet):
+    _, _, _, cusps = vet.chart_frame([datetime(2000, 6, 21, 12)] * 2, [70.0, 45.0], [0.0, 0.0])
+    assert np.isnan(cusps[:, 0]).any() and not np.isnan(cusps[:, 1]).any()
+    assert vet.house_positions(np.zeros((1, 2)), cusps)[0, 0] == 0
+    with pytest.raises(ValueError):
+        vet.chart_frame([datetime(2000, 1, 1)], [0.0], [0.0], 'koch')
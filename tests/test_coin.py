@@ -0,0 +1,60 @@
+import itertools
+
+import numpy as np
+import pytest
+
+
+def reference_bits(vet, count, chunk, seed):
+    # The same packed bits coin_chunk draws, one chunk at a time
+    return np.concatenate([np.unpackbits(np.frombuffer(vet.seeded_rng(seed, index).bytes((size + 7) // 8), dtype=np.uint8))[:size]
+                           for size, seed, index in vet.chunk_tasks(count, chunk, seed)] or [np.zeros(0, dtype=np.uint8)])
+
+
+def reference_stats(vet, bits):
+    stats = vet.CoinStats()
+    for bit in bits:
+        stats.add(("Tails", "Heads")[bit])
+    return stats
+
+
+@pytest.mark.parametrize('count, chunk', [(1, 8), (7, 3), (1000, 1), (1000, 7), (5000, 64), (4096, 4096)])
+def test_bulk_runs_match_a_toss_by_toss_count(vet, count, chunk):
+    for seed in range(5):
+        bulk = vet.toss_bulk(count, seed=seed, chunk=chunk)
+        stats = reference_stats(vet, reference_bits(vet, count, chunk, seed))
+        assert (bulk['heads'], bulk['tails'], bulk['runs']) == (stats.heads, stats.tails, stats.runs)
+        assert (bulk['longest_heads'], bulk['longest_tails']) == (stats.longest['Heads'], stats.longest['Tails'])
+
+
+def test_runs_joined_across_many_single_side_chunks(vet):
+    # Search for a seed whose first chunks are all one side so the open run spans several chunk boundaries
+    for seed in itertools.count():
+        bits = reference_bits(vet, 12, 2, seed)
+        if len(set(bits[:6])) == 1:
+            break
+    bulk = vet.toss_bulk(12, seed=seed, chunk=2)
+    stats = reference_stats(vet, bits)
+    assert bulk['runs'] == stats.runs
+    assert max(bulk['longest_heads'], bulk['longest_tails']) == max(stats.longest.values()) >= 6
+
+
+def test_worker_count_does_not_change_results(vet):
+    assert vet.toss_bulk(300000, seed=9, chunk=50000) == vet.toss_bulk(300000, seed=9, chunk=50000, workers=2)
+
+
+def test_running_stats_match_a_recount(vet):
+    stats, results = vet.CoinStats(), []
+    for bit in reference_bits(vet, 500, 500, 3):
+        results.append(("Tails", "Heads")[bit])
+        stats.add(results[-1])
+    runs = [len(list(group)) for _, group in itertools.groupby(results)]
+    assert (stats.heads, stats.tails, stats.runs) == (results.count("Heads"), results.count("Tails"), len(runs))
+    assert stats.longest == {side: max(len(list(group)) for key, group in itertools.groupby(results) if key == side) for side in ("Heads", "Tails")}
+    assert (stats.side, stats.streak) == (results[-1], runs[-1])
+
+
+def test_empty_and_negative_counts(vet):
+    empty = vet.toss_bulk(0, seed=1)
+    assert (empty['heads'], empty['runs'], empty['chi_square']) == (0, 0, 0.0)
+    with pytest.raises(ValueError):
+        vet.toss_bulk(-1)
@@ -0,0 +1,80 @@
+import itertools
+from collections import Counter
+
+import numpy as np
+import pytest
+
+
+def brute_force(terms):
+    # Every combination of faces, keeping dice exactly as the expression says
+    totals = Counter({0: 1})
+    for term in terms:
+        outcomes = Counter()
+        if not term.sides:
+            outcomes[term.sign * term.count] = 1
+        else:
+            for faces in itertools.product(range(1, term.sides + 1), repeat=term.count):
+                kept = sorted(faces, reverse=term.keep_highest)[:term.keep]
+                outcomes[term.sign * sum(kept)] += 1
+        combined = Counter()
+        for (a, p), (b, q) in itertools.product(totals.items(), outcomes.items()):
+            combined[a + b] += p * q
+        totals = combined
+    weight = sum(totals.values())
+    return {total: count / weight for total, count in totals.items()}
+
+
+@pytest.mark.parametrize('expression', ['3d6', '4d6kh3', '2d20kl1', '5d4dl2', '4d6dh1', '3d8k2+2d4-3', '2d6+1d10kh1-2d4'])
+def test_keep_drop_distribution_matches_enumeration(vet, expression):
+    terms = vet.parse_dice(expression)
+    low, probs = vet.dice_distribution(terms)
+    exact = brute_force(terms)
+    assert set(range(low, low + len(probs))) >= set(exact)
+    for total, probability in zip(range(low, low + len(probs)), probs):
+        assert probability == pytest.approx(exact.get(total, 0.0), abs=1e-12)
+
+
+def test_exploding_die_distribution(vet):
+    low, probs = vet.dice_distribution(vet.parse_dice('1d6!'))
+    p = dict(zip(range(low, low + len(probs)), probs))
+    for face in range(1, 6):
+        assert p[face] == pytest.approx(1 / 6)
+        assert p[6 + face] == pytest.approx(1 / 36)
+        assert p[12 + face] == pytest.approx(1 / 216)
+    assert p.get(6, 0) == 0 and p.get(12, 0) == 0
+    assert probs.sum() == pytest.approx(1)
+
+
+def test_bulk_rolls_follow_the_exact_distribution(vet):
+    terms = vet.parse_dice('4d6kh3+1d4')
+    low, probs = vet.dice_distribution(terms)
+    totals = vet.roll_totals(terms, 200000, seed=7)
+    observed = np.bincount(totals - low, minlength=len(probs)) / len(totals)
+    assert np.abs(observed - probs).max() < 0.005
+    assert np.array_equal(totals, vet.roll_totals(terms, 200000, seed=7, workers=2))
+
+
+def test_single_rolls_keep_the_right_dice(vet):
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        (term, rolls, kept, subtotal), (_, _, _, constant) = vet.roll_pool(vet.parse_dice('5d6dl2-3'), rng)
+        assert sorted(kept) == sorted(rolls)[2:] and subtotal == sum(kept) and constant == -3
+
+
+def test_legacy_expressions(vet):
+    terms = vet.parse_dice('d6(2),d8(3)')
+    assert [(term.count, term.sides) for term in terms] == [(2, 6), (3, 8)]
+
+
+@pytest.mark.parametrize('expression', ['', '0d6', '3d0', '2d6kh3', '3d6dl3', '1d1!', '2x6'])
+def test_invalid_expressions(vet, expression):
+    with pytest.raises(ValueError):
+        vet.parse_dice(expression)
+
+
+@pytest.mark.parametrize('rolls', ['0', '-1', 'x'])
+def test_rolls_below_one_are_rejected_on_the_command_line(vet, rolls, capsys):
+    with pytest.raises(SystemExit):
+        vet.build_parser().parse_args(['dice', '3d6', '--rolls', rolls])
+    assert '--rolls' in capsys.readouterr().err
+    assert vet.build_parser().parse_args(['dice', '3d6', '--rolls', '1']).rolls == 1
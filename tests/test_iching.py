@@ -0,0 +1,66 @@
+import itertools
+
+import numpy as np
+import pytest
+
+METHODS = ['coins', 'yarrow']
+
+
+def enumerate_casts(vet, method):
+    # Joint probability of every (primary, secondary) pair from all 4^6 line sequences
+    odds = dict(zip((6, 7, 8, 9), vet.CASTING_METHODS[method]))
+    joint = np.zeros((64, 64))
+    for lines in itertools.product((6, 7, 8, 9), repeat=6):
+        primary, secondary = vet.hexagram_pair(lines)
+        joint[primary, secondary] += np.prod([odds[line] for line in lines])
+    return joint
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_transition_matrix_matches_enumeration(vet, method):
+    joint = enumerate_casts(vet, method)
+    primary = vet.primary_probabilities(method)
+    assert np.allclose(primary, joint.sum(axis=1))
+    assert np.allclose(vet.transition_matrix(method), joint / joint.sum(axis=1, keepdims=True))
+    assert np.allclose(vet.transition_matrix(method).sum(axis=1), 1)
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_bulk_casts_follow_the_exact_odds(vet, method):
+    pairs = vet.cast_statistics(400000, method, seed=3)
+    assert pairs.sum() == 400000
+    expected = vet.primary_probabilities(method)[:, None] * vet.transition_matrix(method)
+    assert np.abs(pairs / pairs.sum() - expected).max() < 0.002
+    assert np.array_equal(pairs, vet.cast_statistics(400000, method, seed=3, workers=2))
+
+
+def test_streamed_casts_match_the_statistics(vet):
+    pairs = np.zeros((64, 64), dtype=np.int64)
+    for primary, secondary in vet.cast_hexagrams(50000, 'yarrow', seed=11):
+        np.add.at(pairs, (primary.astype(np.int64), secondary.astype(np.int64)), 1)
+    assert np.array_equal(pairs, vet.cast_statistics(50000, 'yarrow', seed=11))
+
+
+def test_summary_rates(vet):
+    summary = vet.cast_summary(vet.cast_statistics(100000, 'coins', seed=5), 'coins')
+    assert summary['exact_changing'] == pytest.approx(1 - 0.75 ** 6)
+    assert abs(summary['changing'] - summary['exact_changing']) < 0.01
+    lines = vet.cast_lines(summary)
+    assert lines[0].startswith('100000 casts (coins)') and lines[0].endswith(f"(exact {1 - 0.75 ** 6:.2%})")
+    assert len(lines) == 6
+
+
+def test_king_wen_numbering(vet):
+    assert sorted(vet.KING_WEN) == list(range(1, 65))
+    assert vet.KING_WEN[vet.hexagram_pair([7] * 6)[0]] == 1 and vet.KING_WEN[vet.hexagram_pair([8] * 6)[0]] == 2
+    # Line 1 is the bottom line: Thunder below Water above is Zhun, hexagram 3
+    assert vet.KING_WEN[vet.hexagram_pair([7, 8, 8, 8, 7, 8])[0]] == 3
+    assert vet.hexagram_pair([9, 6, 7, 8, 7, 8]) == (0b010101, 0b010110)
+
+
+@pytest.mark.parametrize('count', [0, -4])
+def test_cast_counts_below_one_are_rejected(vet, count):
+    with pytest.raises(ValueError):
+        vet.cast_statistics(count)
+    with pytest.raises(ValueError):
+        list(vet.cast_hexagrams(count))
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope='module')
+def index(sky):
+    return sky.PositionIndex.build(2000, 2004)
+
+
+def test_every_body_meets_the_target(sky, index):
+    # Segments are fitted to a margin under the target, so an independent, denser sweep still lands inside it
+    assert all(type(error) is float and error <= sky.INDEX_FIT_MARGIN for error in index.errors.values())
+    checked = index.validate(samples=50000, seed=123)
+    assert max(checked.values()) < 1.0
+    assert max(checked['sun'], checked['moon']) < 0.5
+
+
+def test_only_the_segments_that_need_it_are_split(sky, index):
+    for key, edges in index.edges.items():
+        assert edges[0] == index.jd_start and edges[-1] == index.jd_end and np.all(np.diff(edges) > 0), key
+        assert np.diff(edges).max() <= sky.INDEX_SEGMENT_DAYS[key] and len(edges) < 4 * (index.jd_end - index.jd_start) / sky.INDEX_SEGMENT_DAYS[key]
+
+
+def test_segment_edges_join_up(sky, index):
+    for key, edges in index.edges.items():
+        below, above = index.longitudes(edges[1:-1] - 1e-9, [key])[0], index.longitudes(edges[1:-1], [key])[0]
+        assert np.abs(sky.wrap_degrees(above - below)).max() * 3600 < 1.0, key
+
+
+def test_a_target_out_of_reach_fails_the_build(sky, monkeypatch):
+    monkeypatch.setattr(sky, 'INDEX_MIN_SEGMENT_DAYS', 4.0)
+    with pytest.raises(ValueError, match='cannot fit'):
+        sky.PositionIndex.build(2000, 2001, accuracy_arcsec=1e-4)
+    monkeypatch.setattr(sky, 'INDEX_MIN_SEGMENT_DAYS', 2.0 ** -10)
+    monkeypatch.setattr(sky, 'INDEX_MAX_SEGMENTS', 20)
+    with pytest.raises(ValueError, match='cannot fit'):
+        sky.PositionIndex.build(2000, 2001, accuracy_arcsec=1e-4)
+
+
+def test_save_load_round_trip(sky, index, tmp_path):
+    path = tmp_path / 'index.npz'
+    index.save(path)
+    loaded = sky.PositionIndex.load(path)
+    jd = np.linspace(index.jd_start, index.jd_end, 1000)
+    assert np.array_equal(loaded.longitudes(jd), index.longitudes(jd))
+    with pytest.raises(ValueError):
+        loaded.longitudes(index.jd_end + 1)
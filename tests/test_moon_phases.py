@@ -0,0 +1,33 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+
+def phases(sky, start, end, **kwargs):
+    return [(first + timedelta(days=day), sky.MOON_PHASES[index])
+            for first, indices in sky.moon_phase_chunks(start, end, **kwargs) for day, index in enumerate(indices.tolist())]
+
+
+def test_january_2020(sky):
+    named = dict(phases(sky, date(2020, 1, 1), date(2020, 1, 31)))
+    assert named[date(2020, 1, 3)] == 'First Quarter'
+    assert named[date(2020, 1, 10)] == 'Full Moon'
+    assert named[date(2020, 1, 17)] == 'Last Quarter'
+    assert named[date(2020, 1, 24)] == 'New Moon'
+    assert len(set(named.values())) == 8
+
+
+def test_quarter_days_carry_the_quarter_name(sky):
+    # A quarter event is at most 12 hours from the nearest midnight, about 6 degrees of elongation
+    days = dict(phases(sky, date(2020, 1, 1), date(2022, 12, 31)))
+    for when, quarter in sky.moon_phase_events(datetime(2020, 1, 2), datetime(2022, 12, 30)):
+        nearest = (when + timedelta(hours=12)).date()
+        assert days[nearest] == sky.QUARTER_PHASES[quarter], when
+
+
+def test_chunks_do_not_change_the_answer(sky):
+    start, end = date(2019, 12, 1), date(2020, 3, 1)
+    assert phases(sky, start, end, chunk_days=7) == phases(sky, start, end)
+    jd = [sky.ephemeris().ts.utc(day.year, day.month, day.day).tt for day, _ in phases(sky, start, end)]
+    expected = (sky.moon_elongation(np.array(jd)) + 22.5) % 360 // 45
+    assert [sky.MOON_PHASES.index(name) for _, name in phases(sky, start, end)] == expected.astype(int).tolist()
@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+import pytest
+
+PEOPLE = [('Jane Doe', '1990-05-17'), ('JOHN SMITH', '1955-02-24'), ('Zoë Ångström', '2001-09-11'),
+          ('Mary-Kate O\'Neil', '1979-12-29'), ('', '2000-01-01'), ('Abcdefghijklmnopqrstuvwxyz' * 3000, '1999-11-22')]
+
+
+def reference_reduce(n):
+    # The original digit loop, stopping at master numbers
+    while n > 9 and n not in (11, 22, 33):
+        n = sum(int(digit) for digit in str(n))
+    return n
+
+
+def test_reduce_tables_match_the_digit_loop(vet):
+    values = list(range(0, 70000)) + [10 ** 9 + 7, 2 ** 40, 99999999999, 123456789 * 1000]
+    expected = [reference_reduce(n) for n in values]
+    assert [vet.reduce(n) for n in values] == expected
+    assert vet.reduce_array(values).tolist() == expected
+
+
+def write_people(tmp_path, rows, suffix):
+    path = tmp_path / f"people{suffix}"
+    if suffix == '.csv':
+        path.write_text('name,birthdate\n' + ''.join(f"\"{name}\",{birth}\n" for name, birth in rows), encoding='utf-8')
+    else:
+        path.write_text(''.join(json.dumps({'name': name, 'birth': birth}) + '\n' for name, birth in rows), encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.jsonl'])
+def test_batch_rows_match_the_one_person_report(vet, tmp_path, suffix):
+    records = list(vet.batch_numerology(vet.read_rows(write_people(tmp_path, PEOPLE, suffix)), workers=1, chunk_rows=4))
+    assert [record['id'] for record in records] == list(range(1, len(PEOPLE) + 1))
+    for record, (name, birth) in zip(records, PEOPLE):
+        expected = {key: number for number, _, key in vet.numerology_report(name, birth.replace('-', ' '))}
+        assert {key: value for key, value in record.items() if key != 'id'} == expected
+
+
+def test_chunking_and_workers_do_not_change_the_output(vet, tmp_path):
+    rng = np.random.default_rng(2)
+    rows = [(''.join(rng.choice(list('abcdefghijklmnopqrstuvwxyz AEIOU'), rng.integers(0, 30))),
+             f"{rng.integers(1900, 2030)}-{rng.integers(1, 13):02d}-{rng.integers(1, 29):02d}") for _ in range(2000)]
+    path = write_people(tmp_path, rows, '.jsonl')
+    records = list(vet.batch_numerology(vet.read_rows(path), workers=1))
+    assert list(vet.batch_numerology(vet.read_rows(path), workers=2, chunk_rows=333)) == records
+
+
+def test_bad_rows_name_the_row(vet):
+    with pytest.raises(ValueError, match='Row 7'):
+        list(vet.batch_numerology([{'id': 7, 'name': 'Jane', 'birthdate': '17 May 1990'}], workers=1))
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize('text, days', [('1d', 1.0), ('6h', 0.25), ('30m', 30 / 1440), ('2.5', 2.5), (' 12H ', 0.5)])
+def test_parse_step(vet, text, days):
+    assert vet.parse_step(text) == pytest.approx(days)
+
+
+@pytest.mark.parametrize('text', ['0', '0h', '-1d', '-2', 'inf', 'nan', '', 'd'])
+def test_steps_that_are_not_positive_are_rejected(vet, text):
+    with pytest.raises(ValueError):
+        vet.parse_step(text)
+
+
+def test_table_matches_planet_positions(sky, tmp_path):
+    path = tmp_path / 'table.npy'
+    assert sky.write_planet_table(path, datetime(2020, 1, 1), datetime(2020, 1, 3), 0.25, chunk_steps=3) == 9
+    table = np.load(path, mmap_mode='r')
+    assert np.allclose(np.diff(table['jd_tt']), 0.25)
+    for name, (ra, dec, lon) in sky.planet_positions(sky.ephemeris().ts.tt_jd(table['jd_tt'])).items():
+        assert np.allclose(table[f"{name}_ra"], ra, atol=1e-4) and np.allclose(table[f"{name}_dec"], dec, atol=1e-3)
+        assert np.allclose(table[f"{name}_lon"], lon, atol=1e-3)
+
+
+@pytest.mark.parametrize('start, end, step', [
+    (datetime(2020, 1, 1), datetime(2020, 1, 3), 0),
+    (datetime(2020, 1, 1), datetime(2020, 1, 3), -1),
+    (datetime(2020, 1, 3), datetime(2020, 1, 1), 1),
+    # Less than one step before the start: an error, not a one-row table
+    (datetime(2020, 1, 3, 12), datetime(2020, 1, 3), 1),
+])
+def test_bad_table_ranges_are_rejected(sky, tmp_path, start, end, step):
+    with pytest.raises(ValueError):
+        sky.write_planet_table(tmp_path / 'table.npy', start, end, step)
+    assert not (tmp_path / 'table.npy').exists()
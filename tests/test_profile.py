@@ -0,0 +1,48 @@
+import pytest
+
+
+@pytest.fixture
+def profile(vet, monkeypatch):
+    # Profiling switched on without registering the dump at exit
+    monkeypatch.setattr(vet.PROFILE, 'enabled', True)
+    monkeypatch.setattr(vet.PROFILE, 'tool', 'test')
+    monkeypatch.setattr(vet.PROFILE, 'spans', {})
+    monkeypatch.setattr(vet.PROFILE, 'counters', {})
+    return vet.PROFILE
+
+
+def test_worker_counters_reach_the_parent(vet, profile):
+    chunks = len(list(vet.chunk_tasks(100000, 7000, 1)))
+    for workers in (1, 2):
+        profile.take()
+        vet.toss_bulk(100000, seed=1, chunk=7000, workers=workers)
+        assert profile.counters[('test', 'rng.streams')] == chunks, workers
+
+
+def test_worker_spans_reach_the_parent(sky, profile):
+    rows = [{'datetime': f"19{50 + index}-03-0{1 + index % 9}T12:00", 'lat': index, 'lon': -index} for index in range(40)]
+    list(sky.batch_charts(rows, workers=2, chunk_rows=10))
+    names = {name for tool, name in profile.spans}
+    assert {f"observe.{key}" for _, key in sky.CHART_BODIES} <= names
+    assert profile.spans[('test', 'observe.sun')][0] == 4
+
+
+def test_absorb_adds_up_spans_and_counters(vet, profile):
+    profile.record('work', 0.001)
+    profile.count('items', 2)
+    worker = vet.Profiler()
+    worker.enabled, worker.tool = True, 'test'
+    worker.record('work', 0.5)
+    worker.record('work', 0.0001)
+    worker.count('items', 3)
+    assert profile.absorb(('result', worker.take())) == 'result'
+    count, total, low, high, buckets = profile.spans[('test', 'work')]
+    assert (count, low, high) == (3, 0.0001, 0.5) and total == pytest.approx(0.5011)
+    assert sum(buckets.values()) == 3 and profile.counters[('test', 'items')] == 5
+
+
+def test_profiled_call_drops_what_the_worker_inherited(vet, profile):
+    profile.count('items', 7)
+    result, (spans, counters) = vet.profiled_call(lambda chunk: [seed for seed, *_ in chunk], 'coin', [(1,), (2,)])
+    assert result == [1, 2] and counters == {} and spans == {}
+    assert profile.tool == 'coin'
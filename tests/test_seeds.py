@@ -0,0 +1,69 @@
+import re
+
+import pytest
+
+READINGS = [
+    ['tarot', '--draws', '5', '--reversals'],
+    ['tarot', '--spread', 'celtic-cross', '--reversals'],
+    ['runes', '--draws', '3'],
+    ['coin', '--tosses', '20'],
+    ['dice', '3d6+1d20!-2'],
+    ['iching'],
+]
+BULK = [
+    ['tarot', '--spread', 'three-card', '--simulate', '5000', '--reversals'],
+    ['coin', '--bulk', '300000'],
+    ['dice', '4d6kh3', '--rolls', '100000'],
+    ['iching', '--casts', '100000', '--method', 'yarrow'],
+]
+
+
+def run(vet, capsys, argv):
+    vet.main(argv)
+    out, err = capsys.readouterr()
+    return out, int(re.search(r'Seed: (\d+)', err).group(1))
+
+
+@pytest.mark.parametrize('argv', READINGS + BULK)
+def test_a_logged_seed_replays_the_reading(vet, capsys, argv):
+    first, seed = run(vet, capsys, argv)
+    assert run(vet, capsys, argv + ['--seed', str(seed)]) == (first, seed)
+
+
+@pytest.mark.parametrize('argv', READINGS[:4])
+def test_each_reading_gets_its_own_seed(vet, capsys, argv):
+    # 20 tosses or several cards come out the same by chance far too rarely to matter
+    (first, seed), (second, other) = run(vet, capsys, argv), run(vet, capsys, argv)
+    assert seed != other and first != second
+
+
+@pytest.mark.parametrize('argv', BULK)
+def test_bulk_results_do_not_depend_on_the_worker_count(vet, capsys, argv):
+    one = run(vet, capsys, argv + ['--seed', '99', '--workers', '1'])
+    assert run(vet, capsys, argv + ['--seed', '99', '--workers', '3']) == one
+
+
+def test_a_session_replays_from_its_master_seed(vet, capsys):
+    vet.RANDOM.reseed(2024)
+    session = [run(vet, capsys, argv) for argv in READINGS]
+    vet.RANDOM.reseed(2024)
+    assert [run(vet, capsys, argv) for argv in READINGS] == session
+    vet.RANDOM.reseed()
+
+
+def test_streams_are_independent_per_key(vet):
+    a, b = vet.seeded_rng(5, 0).integers(1 << 62, size=4), vet.seeded_rng(5, 1).integers(1 << 62, size=4)
+    assert (a != b).all()
+    assert (vet.seeded_rng(5, 0).integers(1 << 62, size=4) == a).all()
+    tasks = list(vet.chunk_tasks(10, 4, 7, 'coins'))
+    assert tasks == [('coins', 4, 7, 0), ('coins', 4, 7, 1), ('coins', 2, 7, 2)]
+
+
+@pytest.mark.parametrize('tool, request_body', [
+    ('tarot', {'draws': 4, 'reversals': True}), ('runes', {'spread': 'three-card'}), ('coin', {'tosses': 12}),
+    ('dice', {'expression': '2d6+1d8'}), ('iching', {}), ('coin', {'bulk': 5000}),
+])
+def test_service_readings_replay_from_their_seed(vet, tool, request_body):
+    first = vet.SERVICE_TOOLS[tool](dict(request_body))
+    assert first['seed'] is not None
+    assert vet.SERVICE_TOOLS[tool](dict(request_body, seed=first['seed'])) == first
@@ -0,0 +1,208 @@
+import asyncio
+import contextlib
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+CHART = {'datetime': '1990-05-17T14:30', 'lat': 48.8566, 'lon': 2.3522}
+SLOW_DICE = {'expression': '20d6', 'rolls': 8000000, 'seed': 1}
+
+
+@contextlib.contextmanager
+def running(service):
+    # The service's event loop in a background thread, on a free loopback port
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(service.start('127.0.0.1', 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.sockets[0].getsockname()[1]
+    finally:
+        asyncio.run_coroutine_threadsafe(stop(server), loop).result(10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(10)
+        loop.close()
+        service.pool.shutdown(cancel_futures=True)
+
+
+async def stop(server):
+    # Closes the listener and cancels the batcher and any idle keep-alive connections
+    server.close()
+    tasks = asyncio.all_tasks() - {asyncio.current_task()}
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.fixture(scope='module')
+def service(sky):
+    service = sky.ToolService(workers=2, batch_window=0.05)
+    with running(service) as port:
+        service.port = port
+        yield service
+
+
+def call(port, method, path, payload=None, connection=None):
+    connection = connection or http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    body = payload if isinstance(payload, (str, type(None))) else json.dumps(payload)
+    connection.request(method, path, body, {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read()), response
+
+
+def post(port, tool, payload, connection=None):
+    return call(port, 'POST', f"/{tool}", payload, connection)
+
+
+def test_every_tool_answers_like_the_library(sky, service):
+    port = service.port
+    status, body, _ = post(port, 'dice', {'expression': '4d6kh3', 'dist': True})
+    low, probs = sky.dice_distribution(sky.parse_dice('4d6kh3'))
+    assert status == 200 and body['lowest'] == low and np.allclose(body['probabilities'], probs)
+    status, body, _ = post(port, 'coin', {'bulk': 10000, 'seed': 5})
+    assert status == 200 and body['heads'] == sky.toss_bulk(10000, seed=5)['heads']
+    status, body, _ = post(port, 'iching', {'casts': 1000, 'method': 'yarrow', 'seed': 2})
+    assert status == 200 and sum(count for *_, count in body['pairs']) == 1000
+    status, body, _ = post(port, 'sigil', {'lines': ['Łódź Þór', 'αθήνα'], 'alphabet': 'latin'})
+    assert status == 200 and body['sigils'] == [sky.sigil_consonants('Łódź Þór'), '']
+    status, body, _ = post(port, 'numerology', {'name': 'Jane Doe', 'birthdate': '1990-05-17'})
+    assert status == 200 and body['destiny'] == sky.calculate_destiny('Jane Doe')
+    status, body, _ = post(port, 'chart', CHART)
+    expected, = sky.chart_chunk([dict(CHART, id=None)])
+    assert status == 200 and body['sun_degree'] == pytest.approx(expected['sun_degree'])
+    status, body, _ = post(port, 'moon', {'dates': '2020-01-01..2020-01-10'})
+    assert status == 200 and len(body['days']) == 10
+    for tool in ('tarot', 'runes', 'planets'):
+        assert post(port, tool, {})[0] == 200
+
+
+@pytest.mark.parametrize('method, path, payload, status', [
+    ('POST', '/astrolabe', {}, 404),
+    ('GET', '/dice', None, 405),
+    ('POST', '/dice', '{"expression": ', 400),
+    ('POST', '/dice', '[1, 2]', 400),
+    ('POST', '/dice', {}, 400),
+    ('POST', '/dice', {'expression': '2x6'}, 400),
+    ('POST', '/iching', {'method': 'tortoise'}, 400),
+    ('POST', '/chart', {'datetime': 'yesterday', 'lat': 0, 'lon': 0}, 400),
+    ('POST', '/dice', {'expression': '3d6', 'rolls': 0}, 400),
+    ('POST', '/dice', {'expression': '3d6', 'rolls': -5}, 400),
+    ('POST', '/dice', {'expression': '3d6', 'rolls': 2.5}, 400),
+    ('POST', '/tarot', {'draws': 0}, 400),
+    ('POST', '/tarot', {'draws': -1}, 400),
+    ('POST', '/runes', {'draws': '3'}, 400),
+])
+def test_bad_requests(service, method, path, payload, status):
+    answer, body, _ = call(service.port, method, path, payload)
+    assert answer == status and body['error']
+
+
+def test_keep_alive_reuses_one_connection(service):
+    before = service.connections
+    connection = http.client.HTTPConnection('127.0.0.1', service.port, timeout=60)
+    for seed in range(5):
+        status, _, response = post(service.port, 'dice', {'expression': '3d6', 'seed': seed}, connection)
+        assert status == 200 and response.getheader('Connection') == 'keep-alive'
+    assert service.connections == before + 1
+    assert call(service.port, 'GET', '/health', connection=connection)[1] == {'status': 'ok'}
+
+
+def test_concurrent_requests_are_batched(sky, service):
+    rows = [dict(CHART, lat=-60 + 5 * index) for index in range(24)]
+    results, barrier = [None] * len(rows), threading.Barrier(len(rows))
+
+    def send(index):
+        barrier.wait()
+        results[index] = post(service.port, 'chart', rows[index])[:2]
+
+    before = service.batches
+    threads = [threading.Thread(target=send, args=(index,)) for index in range(len(rows))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+    assert service.batches - before < len(rows)
+    for (status, body), expected in zip(results, sky.chart_chunk([dict(row, id=None) for row in rows])):
+        assert status == 200 and body['moon_degree'] == pytest.approx(expected['moon_degree'])
+
+
+def test_a_failing_request_does_not_fail_its_batch(sky):
+    # 1700 is outside de421, and skyfield's range error cannot be pickled back from a worker
+    items = [('chart', CHART), ('chart', dict(CHART, datetime='1700-01-01T12:00')), ('dice', {'expression': '3d6'})]
+    (good, record), (bad, error), (dice, _) = sky.service_batch(items)
+    expected, = sky.chart_chunk([dict(CHART, id=None)])
+    assert (good, dice) == (200, 200) and bad >= 400 and error['error']
+    assert record['sun_degree'] == pytest.approx(expected['sun_degree'])
+
+
+def test_backpressure_answers_503(sky):
+    service = sky.ToolService(workers=1, max_pending=0)
+    with running(service) as port:
+        status, body, response = post(port, 'coin', {})
+        assert status == 503 and response.getheader('Retry-After') == '1'
+        assert call(port, 'GET', '/health')[0] == 200
+        assert call(port, 'GET', '/stats')[1]['rejected'] == 1
+
+
+def test_only_binds_to_loopback(sky):
+    service = sky.ToolService(workers=1)
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(service.start('0.0.0.0', 0))
+    finally:
+        service.pool.shutdown()
+
+
+def children(pid):
+    # Live (not zombie) child processes, from /proc
+    found = []
+    for entry in filter(str.isdigit, os.listdir('/proc')):
+        with contextlib.suppress(OSError):
+            with open(f"/proc/{entry}/stat") as stat:
+                state, parent = stat.read().rsplit(')', 1)[1].split()[:2]
+            if int(parent) == pid and state != 'Z':
+                found.append(int(entry))
+    return found
+
+
+def alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except OSError:
+        return False
+
+
+def test_sigterm_drains_requests_and_stops_the_pool(sky):
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen([sys.executable, sky.__file__, 'serve', '--port', str(port), '--workers', '2'],
+                               stderr=subprocess.PIPE, text=True)
+    try:
+        assert 'Serving' in process.stderr.readline()
+        assert post(port, 'dice', {'expression': '3d6'})[0] == 200
+        workers = children(process.pid)
+        assert workers
+        answer = {}
+        slow = threading.Thread(target=lambda: answer.update(zip(('status', 'body'), post(port, 'dice', SLOW_DICE)[:2])))
+        slow.start()
+        time.sleep(0.5)
+        process.send_signal(signal.SIGTERM)
+        slow.join(60)
+        # The request in flight when the signal came still gets its answer
+        assert answer['status'] == 200 and answer['body']['rolls'] == SLOW_DICE['rolls']
+        assert process.wait(60) == 0
+        assert not any(alive(pid) for pid in workers)
+    finally:
+        if process.poll() is None:
+            process.kill()
@@ -0,0 +1,60 @@
+import io
+
+import numpy as np
+import pytest
+
+
+def reference_sigil(intention):
+    # The original prompt's rule: letters that are not vowels, first occurrence order
+    intention = intention.upper()
+    return ''.join(sorted(set(c for c in intention if c.isalpha() and c not in 'AEIOU'), key=intention.index))
+
+
+def random_text(seed, size, alphabet="abcdefghijklmnopqrstuvwxyz ABCXYZ,.!?\n"):
+    rng = np.random.default_rng(seed)
+    return ''.join(rng.choice(list(alphabet), size))
+
+
+def test_ascii_sigils_match_the_original_rule(vet):
+    for seed in range(50):
+        text = random_text(seed, int(np.random.default_rng(seed).integers(0, 200)))
+        assert vet.sigil_consonants(text) == reference_sigil(text)
+
+
+@pytest.mark.parametrize('alphabet, text, sigil', [
+    ('latin', 'Łódź Þór', 'LDZTHR'),
+    ('latin', 'Ça brûle, señor', 'CBRLSN'),
+    ('greek', 'Αθήνα και Σπάρτη', 'ΘΝΚΣΠΡΤ'),
+    ('greek', 'λόγος', 'ΛΓΣ'),
+    ('hebrew', 'שָׁלוֹם עֲלֵיכֶם', 'שלומעיכ'),
+])
+def test_alphabets_fold_diacritics_and_final_forms(vet, alphabet, text, sigil):
+    assert vet.sigil_consonants(text, alphabet) == sigil
+
+
+class CountingReader(io.StringIO):
+    def read(self, size=-1):
+        self.reads = getattr(self, 'reads', 0) + 1
+        return super().read(size)
+
+
+@pytest.mark.parametrize('chunk_chars', [1, 3, 64, 1 << 20])
+def test_line_stream_matches_each_line(vet, chunk_chars):
+    for text in (random_text(1, 5000), random_text(2, 300) + '\n', '\n\nabc\n\n', '', 'no newline at all'):
+        expected = [reference_sigil(line) for line in text.split('\n')]
+        if text.endswith('\n') or not text:
+            expected = expected[:-1]
+        assert list(vet.stream_sigils(io.StringIO(text), per_line=True, chunk_chars=chunk_chars)) == expected
+
+
+@pytest.mark.parametrize('chunk_chars', [1, 7, 1 << 20])
+def test_whole_stream_is_one_sigil(vet, chunk_chars):
+    text = random_text(3, 3000, 'bcdfg aeiou\n')
+    assert list(vet.stream_sigils(io.StringIO(text), chunk_chars=chunk_chars)) == [reference_sigil(text)]
+
+
+def test_whole_stream_stops_once_every_consonant_is_seen(vet):
+    reader = CountingReader('the quick brown fox jumps over the lazy dog' + 'x' * 100000)
+    sigil, = vet.stream_sigils(reader, chunk_chars=16)
+    assert sorted(sigil) == sorted('BCDFGHJKLMNPQRSTVWXYZ')
+    assert reader.reads < 10
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+START, END = datetime(2020, 1, 1), datetime(2022, 1, 1)
+KEYS = ['sun', 'moon', 'mercury', 'venus', 'mars', 'jupiter', 'saturn', 'pluto']
+STEP = 0.01
+
+
+@pytest.fixture(scope='module')
+def events(sky):
+    return list(sky.sky_events(START, END, KEYS, workers=1))
+
+
+@pytest.fixture(scope='module')
+def samples(sky):
+    ts = sky.ephemeris().ts
+    jd = np.arange(ts.utc(START.year, START.month, START.day).tt, ts.utc(END.year, END.month, END.day).tt, STEP)
+    return jd, dict(zip(KEYS, sky.exact_longitudes(jd, KEYS)))
+
+
+def event_jd(sky, when):
+    return sky.ephemeris().ts.from_datetime(when).tt
+
+
+@pytest.mark.parametrize('key', KEYS)
+def test_events_match_fine_sampling(sky, events, samples, key):
+    # Brute force: every sign change and every turn in the direction of motion between samples STEP days apart
+    jd, lon = samples[0], samples[1][key]
+    sign = (lon // 30).astype(int) % 12
+    crossed = np.flatnonzero(sign[1:] != sign[:-1])
+    found = [(event_jd(sky, when), sign_index) for when, body, kind, sign_index, *_ in events if body == key and kind == 'ingress']
+    assert [entered for _, entered in found] == sign[crossed + 1].tolist()
+    assert np.all(np.abs(np.array([t for t, _ in found]) - jd[crossed]) <= STEP)
+    moving = sky.wrap_degrees(np.diff(lon)) > 0
+    turned = np.flatnonzero(moving[1:] != moving[:-1])
+    stations = [(event_jd(sky, when), kind) for when, body, kind, *_ in events if body == key and kind != 'ingress']
+    assert [kind for _, kind in stations] == ['retrograde' if moving[index] else 'direct' for index in turned]
+    # The speed is near zero at a station, so sampled turns only pin it down to a fraction of a day
+    assert np.all(np.abs(np.array([t for t, _ in stations]) - jd[turned + 1]) <= 0.25)
+
+
+def test_ingresses_land_on_the_boundary(sky, events):
+    ingresses = [event for event in events if event[2] == 'ingress']
+    jd = np.array([event_jd(sky, event[0]) for event in ingresses])
+    for key in KEYS:
+        mine = [index for index, event in enumerate(ingresses) if event[1] == key]
+        lon = sky.exact_longitudes(jd[mine], [key])[0]
+        boundary = np.array([ingresses[index][5] for index in mine])
+        # Datetimes carry microseconds, which is 0.15 arcsec of the Moon's motion at most
+        assert np.abs(sky.wrap_degrees(lon - boundary)).max(initial=0) < 1e-4
+
+
+def test_events_are_ordered_and_do_not_depend_on_chunking(sky, events):
+    times = [event[0] for event in events]
+    assert times == sorted(times)
+    chunked = list(sky.sky_events(START, END, KEYS, workers=2, chunk_days=37.3))
+    # Roots are refined from different brackets at chunk edges, so times agree to the solver tolerance
+    assert [event[1:5] for event in chunked] == [event[1:5] for event in events]
+    assert max(abs((a[0] - b[0]).total_seconds()) for a, b in zip(chunked, events)) <= sky.EVENT_TOLERANCE_DAYS * 86400
+    assert np.allclose([event[5] for event in chunked], [event[5] for event in events], rtol=0, atol=1e-6)
+
+
+def test_unknown_body(sky):
+    with pytest.raises(ValueError):
+        list(sky.sky_events(START, END, ['vulcan']))
@@ -0,0 +1,102 @@
+import timeit
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope='module')
+def store(vet):
+    rng = np.random.default_rng(42)
+    longitudes = rng.uniform(0, 360, size=(len(vet.SYNASTRY_KEYS), 3000))
+    # Points bunched around 0° so the windows that wrap the circle get exercised
+    longitudes[:, :200] = rng.uniform(-10, 10, size=(len(vet.SYNASTRY_KEYS), 200)) % 360
+    return vet.SynastryStore([f"c{index}" for index in range(longitudes.shape[1])], longitudes)
+
+
+def scan(vet, store, key, longitude, aspect, orb):
+    # Brute force: angular distance of every chart's point from the longitude, against the aspect angle
+    angle, default_orb = vet.ASPECTS[aspect]
+    orb = default_orb if orb is None else orb
+    values = store.longitudes[store.point(key)].astype(float)
+    distance = np.abs((values - longitude + 180) % 360 - 180)
+    off = np.abs(distance - angle)
+    return {index: off[index] for index in np.flatnonzero(off <= orb)}
+
+
+@pytest.mark.parametrize('aspect', ['conjunction', 'sextile', 'square', 'trine', 'opposition'])
+@pytest.mark.parametrize('orb', [None, 0.5, 15.0])
+def test_matches_equal_a_full_scan(vet, store, aspect, orb):
+    rng = np.random.default_rng(7)
+    for longitude in [0.0, 359.9, 2.5, 180.0, *rng.uniform(0, 360, 20)]:
+        for key in ('sun', 'moon', 'ascendant'):
+            found, off = store.matches(key, longitude, aspect, orb)
+            expected = scan(vet, store, key, longitude, aspect, orb)
+            assert sorted(found.tolist()) == sorted(expected)
+            assert len(set(found.tolist())) == len(found)
+            assert np.allclose(off, [expected[index] for index in found.tolist()])
+            assert np.all(np.diff(off) >= 0)
+
+
+def test_contacts_cover_every_pair_and_aspect(vet, store):
+    chart = store.chart('c5')
+    contacts = list(store.contacts(chart, pairs=[('sun', 'moon'), ('venus', 'mars')]))
+    expected = {(index, source, target, aspect)
+                for source, target in [('sun', 'moon'), ('venus', 'mars')]
+                for aspect in vet.ASPECTS
+                for index in scan(vet, store, target, chart[source], aspect, None)}
+    assert {contact[:4] for contact in contacts} == expected
+    assert len(contacts) == len(expected)
+
+
+def test_window_wraps_the_circle(vet, store):
+    row = store.point('sun')
+    values = store.longitudes[row]
+    found = set(store.window(row, 355, 365).tolist())
+    assert found == set(np.flatnonzero((values >= 355) | (values <= 5)).tolist())
+
+
+def test_window_keeps_its_edges(vet, store):
+    row = store.point('moon')
+    for index in (0, 250, 2999):
+        value = float(store.longitudes[row, index])
+        assert index in store.window(row, value, value).tolist()
+        assert index in store.window(row, value - 1e-9, value - 1e-9 + 2e-9).tolist()
+
+
+def test_lookup_time_stays_flat_as_the_store_grows(vet):
+    # Searches are O(log n): a store 100x larger should not make a narrow lookup anywhere near 100x slower
+    rng = np.random.default_rng(3)
+    times = []
+    for size in (10_000, 1_000_000):
+        store = vet.SynastryStore(np.arange(size), rng.uniform(0, 360, size=(len(vet.SYNASTRY_KEYS), size)))
+        row = store.point('sun')
+        times.append(min(timeit.repeat(lambda: store.window(row, 123.4, 123.5), number=20, repeat=5)))
+    assert times[1] < 10 * times[0]
+
+
+def test_save_and_load_round_trip(vet, store, tmp_path):
+    path = tmp_path / 'store.npz'
+    store.save(path)
+    loaded = vet.SynastryStore.load(path)
+    assert np.array_equal(loaded.ids, store.ids) and np.array_equal(loaded.order, store.order)
+    assert np.array_equal(loaded.matches('moon', 123.0, 'trine')[0], store.matches('moon', 123.0, 'trine')[0])
+
+
+@pytest.mark.parametrize('kwargs', [{'aspect': 'quincunx'}, {'orb': 180}, {'orb': -1}])
+def test_invalid_queries(store, kwargs):
+    with pytest.raises(ValueError):
+        store.matches('sun', 10.0, **kwargs)
+    with pytest.raises(ValueError):
+        store.matches('vertex', 10.0)
+
+
+def test_build_stores_the_chart_longitudes(sky):
+    rows = [{'id': f"p{index}", 'datetime': f"{1950 + index}-0{1 + index % 9}-1{index % 10}T0{index % 10}:30",
+             'lat': -50 + 4 * index, 'lon': -120 + 9 * index} for index in range(25)]
+    store = sky.SynastryStore.build(rows, workers=1, chunk_rows=7)
+    assert store.ids.tolist() == [row['id'] for row in rows]
+    assert np.array_equal(sky.SynastryStore.build(rows, workers=2, chunk_rows=4).longitudes, store.longitudes)
+    for record in sky.batch_charts(rows, workers=1):
+        chart = store.chart(record['id'])
+        for key in sky.SYNASTRY_KEYS:
+            assert abs((chart[key] - record[f"{key}_degree"] + 180) % 360 - 180) < 1e-3, key
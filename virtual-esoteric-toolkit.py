@@ -19,20 +19,179 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 # Virtual Esoteric Toolkit
 import os
+import sys
+import argparse
+import atexit
+import contextlib
+import functools
+import importlib
+import itertools
+import csv
+import json
 import random
+import re
+import signal
+import threading
 import time
-from datetime import datetime, timedelta
-from skyfield.api import load, Topos
+import unicodedata
+from collections import deque
+from datetime import datetime, timedelta, timezone
 import math
 
+class LazyModule:
+    # Stands in for a heavy module: the import happens on the first attribute lookup, so the divination tools start
+    # without numpy (and without skyfield, see astronomy()); each attribute is cached on the proxy after that
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        value = getattr(importlib.import_module(self._name), attr)
+        setattr(self, attr, value)
+        return value
+
+np = LazyModule('numpy')
+asyncio = LazyModule('asyncio')
+subprocess = LazyModule('subprocess')
+futures = LazyModule('concurrent.futures')
+sqlite3 = LazyModule('sqlite3')
+
+# Instrumentation (VET_PROFILE=1 or FILE, or --profile [FILE]); spans are a shared no-op while disabled
+PROFILE_FILE = 'vet-profile.json'
+NO_SPAN = contextlib.nullcontext()
+
+class Span:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler, self.name = profiler, name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+
+class Profiler:
+    # Per-tool span timings (count, total, min, max, power-of-two microsecond histogram) and counters
+    def __init__(self):
+        self.enabled, self.path, self.tool = False, None, 'main'
+        self.spans, self.counters = {}, {}
+
+    def enable(self, path=PROFILE_FILE):
+        if not self.enabled:
+            atexit.register(self.dump)
+        self.enabled, self.path = True, path
+
+    def span(self, name):
+        return Span(self, name) if self.enabled else NO_SPAN
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            key = (self.tool, name)
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def record(self, name, seconds):
+        key = (self.tool, name)
+        stats = self.spans.get(key)
+        if stats is None:
+            stats = self.spans[key] = [0, 0.0, seconds, seconds, {}]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2], stats[3] = min(stats[2], seconds), max(stats[3], seconds)
+        bucket = 1 << max(math.frexp(seconds * 1e6)[1], 0)
+        stats[4][bucket] = stats[4].get(bucket, 0) + 1
+
+    def take(self):
+        # (spans, counters) recorded so far, starting afresh
+        taken = self.spans, self.counters
+        self.spans, self.counters = {}, {}
+        return taken
+
+    def absorb(self, value):
+        # (result, (spans, counters)) from profiled_call in a pool worker -> result, with the worker's spans and
+        # counters added to this process's
+        result, (spans, counters) = value
+        for key, (count, total, low, high, buckets) in spans.items():
+            stats = self.spans.setdefault(key, [0, 0.0, low, high, {}])
+            stats[0] += count
+            stats[1] += total
+            stats[2], stats[3] = min(stats[2], low), max(stats[3], high)
+            for bucket, hits in buckets.items():
+                stats[4][bucket] = stats[4].get(bucket, 0) + hits
+        for key, amount in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + amount
+        return result
+
+    def report(self):
+        tools = {}
+        for (tool, name), (count, total, low, high, buckets) in self.spans.items():
+            tools.setdefault(tool, {'spans': {}, 'counters': {}})['spans'][name] = {
+                'count': count, 'total_s': total, 'mean_s': total / count, 'min_s': low, 'max_s': high,
+                'histogram_us': {str(bucket): buckets[bucket] for bucket in sorted(buckets)}}
+        for (tool, name), value in self.counters.items():
+            tools.setdefault(tool, {'spans': {}, 'counters': {}})['counters'][name] = value
+        return {'pid': os.getpid(), 'created': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'tools': tools}
+
+    def dump(self):
+        report = json.dumps(self.report(), indent=1)
+        if self.path == '-':
+            print(report, file=sys.stderr)
+        else:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(report)
+
+PROFILE = Profiler()
+if os.environ.get('VET_PROFILE'):
+    PROFILE.enable(PROFILE_FILE if os.environ['VET_PROFILE'].lower() in ('1', 'true', 'yes') else os.environ['VET_PROFILE'])
+
 # ANSI color codes
 RED, RESET = "\033[0;31m", "\033[0m"
 
+# Rendering: results are built as records and written a block at a time, one write per block with the colour
+# applied around the whole block; 'jsonl' writes each record's data as a JSON line and sends notes to stderr
+RENDER_MODES = ('color', 'plain', 'jsonl')
+RENDER_BLOCK_RECORDS = 4096
+
+class Renderer:
+    def __init__(self, mode=None, stream=None):
+        self.mode, self.stream = mode, stream
+
+    @property
+    def out(self):
+        return self.stream or sys.stdout
+
+    def auto(self, mode=None):
+        # Colour on a terminal, plain text when piped
+        self.mode = mode or ('color' if self.out.isatty() else 'plain')
+
+    def write(self, text):
+        with PROFILE.span('render.write'):
+            self.out.write(f"{RED}{text}{RESET}" if self.mode == 'color' else text)
+
+    def records(self, items, text=str, data=None):
+        # text(item) gives the line(s) shown for an item, data(item) its JSON-ready record (the item itself by default)
+        for block in chunked(items, RENDER_BLOCK_RECORDS):
+            if self.mode == 'jsonl':
+                self.write("".join(json.dumps(data(item) if data else item, ensure_ascii=False, default=json_default) + "\n"
+                                   for item in block))
+            else:
+                self.write("".join(f"{text(item)}\n" for item in block))
+
+    def record(self, item, text=str, data=None):
+        self.records((item,), text, data)
+
+    def note(self, text):
+        if self.mode == 'jsonl':
+            sys.stderr.write(f"{text}\n")
+        else:
+            self.write(f"{text}\n")
+
+SCREEN = Renderer('color')
+OUTPUT = Renderer()
+
 # Override print and input for colored output
-def colored_print(*args, **kwargs):
-    print(f"{RED}", end="")
-    print(*args, **kwargs)
-    print(f"{RESET}", end="")
+def colored_print(*args, sep=" ", end="\n"):
+    SCREEN.write(sep.join(map(str, args)) + end)
 
 def colored_input(prompt=""):
     return input(f"{RED}{prompt}{RESET}")
@@ -41,7 +200,1073 @@ def colored_input(prompt=""):
 def clear_terminal():
     os.system('cls' if os.name == 'nt' else 'clear')
 
+# Ephemeris cache (shared by the astronomy tools)
+def astronomy():
+    # skyfield is only imported when an astronomy tool is first used
+    try:
+        from skyfield import api
+    except ImportError as e:
+        raise ImportError("The astronomy tools need skyfield (pip install skyfield); the other tools work without it.") from e
+    return api
+
+EPHEMERIS_FILE = 'de421.bsp'
+BODY_KEYS = {
+    'sun': 'sun', 'moon': 'moon', 'mercury': 'mercury', 'venus': 'venus', 'earth': 'earth',
+    'mars': 'mars', 'jupiter': 'jupiter barycenter', 'saturn': 'saturn barycenter',
+    'uranus': 'uranus barycenter', 'neptune': 'neptune barycenter', 'pluto': 'pluto barycenter'
+}
+
+class Ephemeris:
+    def __init__(self, filename=EPHEMERIS_FILE):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.eph = self.ts = None
+        self.bodies = {}
+        self.load_time = 0.0
+        self.loads = self.reuses = 0
+
+    def get(self):
+        # Loaded once per process; later callers only bump the reuse counter
+        with self.lock:
+            if self.eph is None:
+                start = time.perf_counter()
+                api = astronomy()
+                with PROFILE.span('ephemeris.load'):
+                    eph = api.load(self.filename)
+                with PROFILE.span('ephemeris.timescale'):
+                    self.ts = api.load.timescale()
+                self.bodies = {name: eph[key] for name, key in BODY_KEYS.items()}
+                self.eph = eph
+                self.load_time = time.perf_counter() - start
+                self.loads += 1
+            else:
+                self.reuses += 1
+                PROFILE.count('ephemeris.reuses')
+        return self
+
+    def stats(self):
+        return {"file": self.filename, "loaded": self.eph is not None,
+                "load_time": self.load_time, "loads": self.loads, "reuses": self.reuses}
+
+    def status(self):
+        return f"Ephemeris {self.filename}: loaded in {self.load_time:.2f}s, reused {self.reuses}x"
+
+EPHEMERIS = Ephemeris()
+
+def ephemeris():
+    return EPHEMERIS.get()
+
+# Result cache (VET_CACHE=1 or FILE, or --cache / --cache-file FILE): astronomy results in SQLite, one row per
+# (tool, UTC time, observer, ephemeris version), so repeat queries from any session or process are a lookup.
+# WAL lets readers and writers in several processes share it; past the size limit the least recently used
+# rows go. The -wal file is not counted in the limit: every eviction checkpoints and empties it, and
+# journal_size_limit cuts it back to RESULT_CACHE_WAL_BYTES after any other checkpoint. Cache errors only ever
+# cost a recomputation
+RESULT_CACHE_FILE = 'vet-cache.sqlite'
+RESULT_CACHE_SCHEMA = 3
+RESULT_CACHE_MAX_BYTES = 64 << 20
+RESULT_CACHE_KEEP = 0.9
+RESULT_CACHE_MAX_BATCH = 512
+RESULT_CACHE_LOOKUP_ROWS = 256
+RESULT_CACHE_TIMEOUT = 10.0
+RESULT_CACHE_WAL_BYTES = 4 << 20
+# Bytes charged per row on top of its key and value: b-tree cells, the LRU index entry and page slack
+RESULT_CACHE_ROW_BYTES = 160
+
+class ResultCache:
+    def __init__(self, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.enabled, self.path, self.max_bytes = False, None, max_bytes
+        self.lock = threading.Lock()
+        self.connection = self.pid = self.version = None
+        self.hits = self.misses = self.errors = 0
+
+    def enable(self, path=RESULT_CACHE_FILE):
+        self.enabled, self.path, self.connection = True, path, None
+
+    def connect(self):
+        # One connection per process: forked pool workers open their own
+        if self.connection is None or self.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=RESULT_CACHE_TIMEOUT, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(f'PRAGMA journal_size_limit={RESULT_CACHE_WAL_BYTES}')
+            with connection:
+                connection.execute('CREATE TABLE IF NOT EXISTS results (tool TEXT, moment TEXT, observer TEXT, version TEXT, '
+                                   'value TEXT, size INTEGER, used REAL, PRIMARY KEY (tool, moment, observer, version)) WITHOUT ROWID')
+                connection.execute('CREATE INDEX IF NOT EXISTS results_used ON results (used, size)')
+                connection.execute('CREATE TABLE IF NOT EXISTS counters (tool TEXT, name TEXT, value INTEGER, PRIMARY KEY (tool, name))')
+                # The running byte total is kept by triggers, so it stays right whichever process writes
+                connection.execute("INSERT OR IGNORE INTO counters SELECT '*', 'bytes', COALESCE(SUM(size), 0) FROM results")
+                for event, change in (('INSERT', 'new.size'), ('DELETE', '-old.size'), ('UPDATE OF size', 'new.size - old.size')):
+                    connection.execute(f"CREATE TRIGGER IF NOT EXISTS results_bytes_{event.split()[0].lower()} AFTER {event} ON results "
+                                       f"BEGIN UPDATE counters SET value = value + {change} WHERE tool = '*' AND name = 'bytes'; END")
+            self.connection, self.pid = connection, os.getpid()
+        return self.connection
+
+    def ephemeris_version(self):
+        # The ephemeris file's name, size and mtime, read without loading it; None (no caching) until it exists
+        if self.version is None:
+            try:
+                stat = os.stat(EPHEMERIS.filename)
+            except OSError:
+                return None
+            self.version = f"{EPHEMERIS.filename}:{stat.st_size}:{int(stat.st_mtime)}:{RESULT_CACHE_SCHEMA}"
+        return self.version
+
+    def count(self, connection, tool, hits, misses):
+        self.hits, self.misses = self.hits + hits, self.misses + misses
+        PROFILE.count('cache.hits', hits)
+        PROFILE.count('cache.misses', misses)
+        connection.executemany('INSERT INTO counters VALUES (?, ?, ?) ON CONFLICT (tool, name) DO UPDATE SET value = value + excluded.value',
+                               [(tool, 'hits', hits), (tool, 'misses', misses)])
+
+    def get_many(self, tool, keys):
+        # keys are (moment, observer) pairs; returns {key: value} for the ones cached, marking them used
+        version = self.ephemeris_version()
+        if not self.enabled or version is None:
+            return {}
+        found = {}
+        try:
+            with self.lock, PROFILE.span('cache.get'):
+                connection = self.connect()
+                for block in chunked(keys, RESULT_CACHE_LOOKUP_ROWS):
+                    rows = connection.execute(
+                        f"SELECT moment, observer, value FROM results WHERE tool = ? AND version = ? AND (moment, observer) IN "
+                        f"(VALUES {', '.join(['(?, ?)'] * len(block))})", [tool, version, *itertools.chain.from_iterable(block)])
+                    found.update(((moment, observer), json.loads(value)) for moment, observer, value in rows)
+                with connection:
+                    connection.executemany('UPDATE results SET used = ? WHERE tool = ? AND moment = ? AND observer = ? AND version = ?',
+                                           [(time.time(), tool, moment, observer, version) for moment, observer in found])
+                    self.count(connection, tool, len(found), len(keys) - len(found))
+        except sqlite3.Error:
+            self.errors += 1
+        return found
+
+    def put_many(self, tool, values):
+        # values is {(moment, observer): JSON-able value}
+        version = self.ephemeris_version()
+        if not self.enabled or version is None or not values:
+            return
+        try:
+            with self.lock, PROFILE.span('cache.put'):
+                connection = self.connect()
+                now = time.time()
+                rows = []
+                for (moment, observer), value in values.items():
+                    text = json.dumps(value)
+                    size = len(tool) + len(moment) + len(observer) + len(version) + len(text) + RESULT_CACHE_ROW_BYTES
+                    rows.append((tool, moment, observer, version, text, size, now))
+                with connection:
+                    connection.executemany('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (tool, moment, observer, version) '
+                                           'DO UPDATE SET value = excluded.value, size = excluded.size, used = excluded.used', rows)
+                self.evict(connection)
+        except sqlite3.Error:
+            self.errors += 1
+
+    def evict(self, connection):
+        # Drop the least recently used rows until the values fit in RESULT_CACHE_KEEP of the limit
+        total, = connection.execute("SELECT value FROM counters WHERE tool = '*' AND name = 'bytes'").fetchone() or (0,)
+        if total <= self.max_bytes:
+            return
+        excess, oldest = total - self.max_bytes * RESULT_CACHE_KEEP, []
+        for *key, size in connection.execute('SELECT tool, moment, observer, version, size FROM results ORDER BY used'):
+            oldest.append(key)
+            excess -= size
+            if excess <= 0:
+                break
+        with connection:
+            connection.executemany('DELETE FROM results WHERE tool = ? AND moment = ? AND observer = ? AND version = ?', oldest)
+            connection.execute('INSERT INTO counters VALUES (?, ?, ?) ON CONFLICT (tool, name) DO UPDATE SET value = value + excluded.value',
+                               ('*', 'evictions', 1))
+        # Empties the -wal file; if readers in other processes still need part of it, a later checkpoint finishes
+        connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def report(self):
+        # Totals over every process that has used this file, plus this process's own hits and misses
+        with self.lock:
+            connection = self.connect()
+            tools = {tool: {'entries': entries, 'bytes': size, 'hits': 0, 'misses': 0}
+                     for tool, entries, size in connection.execute('SELECT tool, COUNT(*), SUM(size) FROM results GROUP BY tool')}
+            totals = {'bytes': 0, 'evictions': 0}
+            for tool, name, value in connection.execute('SELECT tool, name, value FROM counters'):
+                if tool == '*':
+                    totals[name] = value
+                else:
+                    tools.setdefault(tool, {'entries': 0, 'bytes': 0, 'hits': 0, 'misses': 0})[name] = value
+        return {'file': self.path, 'max_bytes': self.max_bytes, 'bytes': totals['bytes'], 'evictions': totals['evictions'], 'tools': tools,
+                'process': {'hits': self.hits, 'misses': self.misses, 'errors': self.errors}}
+
+    def clear(self):
+        with self.lock:
+            connection = self.connect()
+            with connection:
+                connection.execute('DELETE FROM results')
+                connection.execute("DELETE FROM counters WHERE name != 'bytes'")
+            connection.execute('VACUUM')
+
+RESULTS = ResultCache()
+if os.environ.get('VET_CACHE'):
+    RESULTS.enable(RESULT_CACHE_FILE if os.environ['VET_CACHE'].lower() in ('1', 'true', 'yes') else os.environ['VET_CACHE'])
+
+def cached(tool, keys, compute):
+    # Values for (moment, observer) keys from the cache; compute(missing key indices) fills the rest in one call
+    found = RESULTS.get_many(tool, keys)
+    missing = [i for i, key in enumerate(keys) if key not in found]
+    if missing:
+        computed = dict(zip((keys[i] for i in missing), compute(missing)))
+        RESULTS.put_many(tool, computed)
+        found.update(computed)
+    return [found[key] for key in keys]
+
+def cache_moment(when):
+    return when.strftime('%Y-%m-%dT%H:%M:%S')
+
+def cache_observer(latitude, longitude):
+    return f"{float(latitude):.6f},{float(longitude):.6f}"
+
+# Moon phase engine
+MOON_PHASES = ["New Moon", "Waxing Crescent", "First Quarter", "Waxing Gibbous",
+               "Full Moon", "Waning Gibbous", "Last Quarter", "Waning Crescent"]
+MOON_VISUALS = ["◯", "☽", "◑", "(", "●", ")", "◐", "☾"]
+MOON_CHUNK_DAYS = 4096
+
+def moon_phase_indices(start_date, offsets):
+    # Phase index at midnight UTC of start_date + each day offset, from one array-valued Time
+    ephem = ephemeris()
+    with PROFILE.span('time.build'):
+        t = ephem.ts.utc(start_date.year, start_date.month, start_date.day + np.asarray(offsets))
+    moon, sun = ecliptic_longitudes(ephem.bodies['earth'].at(t), ['moon', 'sun'])
+    # Geocentric elongation in eighths of the circle, each centred on its phase: New Moon covers 337.5-22.5 degrees
+    return ((moon - sun + 22.5) % 360 // 45).astype(int)
+
+def moon_phase_chunks(start_date, end_date=None, chunk_days=MOON_CHUNK_DAYS):
+    # Yields (first_date, phase_indices) a chunk at a time; short spans go through the result cache, long ones are
+    # cheaper to recompute than to look up
+    days = ((end_date or start_date) - start_date).days + 1
+    if RESULTS.enabled and days <= RESULT_CACHE_MAX_BATCH:
+        keys = [(f"{start_date + timedelta(days=day):%Y-%m-%d}", '') for day in range(days)]
+        yield start_date, np.array(cached('moon', keys, lambda missing: moon_phase_indices(start_date, missing).tolist()))
+        return
+    for offset in range(0, days, chunk_days):
+        yield start_date + timedelta(days=offset), moon_phase_indices(start_date, offset + np.arange(min(chunk_days, days - offset)))
+
+# Lunar phase events
+QUARTER_PHASES = ["New Moon", "First Quarter", "Full Moon", "Last Quarter"]
+EVENT_STEP_DAYS = 5.0
+EVENT_CHUNK_DAYS = 36525.0
+EVENT_TOLERANCE_DAYS = 1e-6
+
+def ecliptic_longitudes(observer, keys):
+    # Apparent ecliptic longitudes in degrees, one row per body key
+    bodies = ephemeris().bodies
+    lons = []
+    for key in keys:
+        with PROFILE.span(f'observe.{key}'):
+            x, y = observer.observe(bodies[key]).apparent().ecliptic_position().au[:2]
+        lons.append(np.degrees(np.arctan2(y, x)) % 360)
+    return np.array(lons)
+
+def moon_elongation(jd):
+    ephem = ephemeris()
+    with PROFILE.span('time.build'):
+        t = ephem.ts.tt_jd(jd)
+    moon, sun = ecliptic_longitudes(ephem.bodies['earth'].at(t), ['moon', 'sun'])
+    return (moon - sun) % 360
+
+def refine_crossings(residual, lo, hi, tolerance=EVENT_TOLERANCE_DAYS, max_iterations=64):
+    # Vectorized Illinois false position over all brackets at once: residual(lo) < 0 <= residual(hi)
+    lo, hi = np.array(lo, dtype=float), np.array(hi, dtype=float)
+    if not lo.size:
+        return lo
+    f_lo, f_hi = residual(lo), residual(hi)
+    x, side = lo, np.zeros(lo.shape, dtype=int)
+    for _ in range(max_iterations):
+        x_new = (lo * f_hi - hi * f_lo) / (f_hi - f_lo)
+        fx = residual(x_new)
+        before = fx < 0
+        lo, f_lo = np.where(before, x_new, lo), np.where(before, fx, f_lo)
+        hi, f_hi = np.where(before, hi, x_new), np.where(before, f_hi, fx)
+        f_hi = np.where(before & (side < 0), f_hi / 2, f_hi)
+        f_lo = np.where(~before & (side > 0), f_lo / 2, f_lo)
+        side = np.where(before, -1, 1)
+        converged = np.abs(x_new - x).max() < tolerance
+        x = x_new
+        if converged:
+            break
+    return x
+
+def moon_phase_events(start_date, end_date, step_days=EVENT_STEP_DAYS, chunk_days=EVENT_CHUNK_DAYS):
+    # Yields (utc datetime, quarter index) for every new moon, quarter and full moon in the span
+    ts = ephemeris().ts
+    jd_start = ts.utc(start_date.year, start_date.month, start_date.day, start_date.hour, start_date.minute).tt
+    jd_end = ts.utc(end_date.year, end_date.month, end_date.day, end_date.hour, end_date.minute).tt
+    chunk_start = jd_start
+    while chunk_start < jd_end:
+        chunk_end = min(chunk_start + chunk_days, jd_end)
+        jd = np.append(np.arange(chunk_start, chunk_end, step_days), chunk_end)
+        quarter = (moon_elongation(jd) // 90).astype(int)
+        crossed = np.flatnonzero(quarter[1:] != quarter[:-1])
+        targets = quarter[crossed + 1]
+        events = refine_crossings(
+            lambda x: (moon_elongation(x) - targets * 90 + 180) % 360 - 180,
+            jd[crossed], jd[crossed + 1])
+        for t, index in zip(ts.tt_jd(events).utc_datetime() if events.size else [], targets.tolist()):
+            yield t, index
+        chunk_start = chunk_end
+
+# Process pool helpers
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+def profiled_call(function, tool, chunk):
+    # Runs in a pool worker while profiling. Workers never run the atexit dump, so the spans and counters recorded
+    # for this chunk travel back with its result (anything inherited from the parent at fork is dropped first)
+    PROFILE.enabled, PROFILE.tool = True, tool
+    PROFILE.take()
+    result = function(chunk)
+    return result, PROFILE.take()
+
+def pool_task(function):
+    # (task, finish): what to submit to a process pool for function, and what turns the task's return value
+    # back into function's result, merging the worker's profile when profiling
+    if not PROFILE.enabled:
+        return function, lambda result: result
+    return functools.partial(profiled_call, function, PROFILE.tool), PROFILE.absorb
+
+def pool_map(function, chunks, workers=None, window=None):
+    # Like ProcessPoolExecutor.map, but keeps only a bounded window of chunks in flight
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(function, chunks)
+        return
+    task, finish = pool_task(function)
+    pending = deque()
+    with futures.ProcessPoolExecutor(workers) as pool:
+        for chunk in chunks:
+            pending.append(pool.submit(task, chunk))
+            if len(pending) >= (window or workers * 2):
+                yield finish(pending.popleft().result())
+        while pending:
+            yield finish(pending.popleft().result())
+
+# Random streams
+SEED_BITS = 63
+
+def new_seed():
+    return int.from_bytes(os.urandom(8), 'little') >> (64 - SEED_BITS)
+
+def seeded_rng(seed, *key):
+    # Independent generator for a seed and key path; the same (seed, key) gives the same stream in any process
+    PROFILE.count('rng.streams')
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=key)))
+
+class ReadingRandom(random.Random):
+    # Generator-style integers() for single readings, which stay small enough not to need numpy
+    def integers(self, low, high=None):
+        return self.randrange(low) if high is None else self.randrange(low, high)
+
+class RandomStreams:
+    # One master seed per session (VET_SEED to fix it); every reading takes its own seed from the master,
+    # so a reading replays from its logged seed and a whole session from the master seed
+    def __init__(self, seed=None):
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        self.seed = new_seed() if seed is None else int(seed)
+        self.master = ReadingRandom(self.seed)
+        self.readings = 0
+
+    def next_seed(self, seed=None):
+        self.readings += 1
+        PROFILE.count('rng.readings')
+        return self.master.getrandbits(SEED_BITS) if seed is None else int(seed)
+
+    def reading(self, seed=None):
+        seed = self.next_seed(seed)
+        return seed, ReadingRandom(seed)
+
+RANDOM = RandomStreams(os.environ.get('VET_SEED'))
+
+def chunk_tasks(count, chunk, seed, *params):
+    # (params..., size, seed, chunk index) per chunk: chunk i always draws from seeded_rng(seed, i), whatever the worker count
+    return (params + (min(chunk, count - first), seed, index) for index, first in enumerate(range(0, count, chunk)))
+
+# Birth chart engine
+ZODIAC_SIGNS = ["Aries ♈", "Taurus ♉", "Gemini ♊", "Cancer ♋", "Leo ♌", "Virgo ♍",
+                "Libra ♎", "Scorpio ♏", "Sagittarius ♐", "Capricorn ♑", "Aquarius ♒", "Pisces ♓"]
+CHART_BODIES = [('Sun ☉', 'sun'), ('Moon ☽', 'moon'), ('Mercury ☿', 'mercury'), ('Venus ♀', 'venus'),
+                ('Mars ♂', 'mars'), ('Jupiter ♃', 'jupiter'), ('Saturn ♄', 'saturn'),
+                ('Uranus ♅', 'uranus'), ('Neptune ♆', 'neptune'), ('Pluto ♇', 'pluto')]
+CHART_CHUNK_ROWS = 2000
+
+def get_sign(degree):
+    return ZODIAC_SIGNS[int(degree // 30) % 12]
+
+def chart_longitudes(when, latitude, longitude):
+    # when is a datetime or a list of them (UTC); latitude/longitude are scalars or matching arrays.
+    # Returns apparent ecliptic longitudes, one row per CHART_BODIES entry. Single charts and small batches go
+    # through the result cache; bulk batches rarely repeat and skip it
+    many = isinstance(when, (list, tuple))
+    stamps = when if many else [when]
+    if not RESULTS.enabled or len(stamps) > RESULT_CACHE_MAX_BATCH:
+        return sky_chart_longitudes(when, latitude, longitude)
+    latitudes = np.broadcast_to(np.asarray(latitude, dtype=float), (len(stamps),))
+    longitudes = np.broadcast_to(np.asarray(longitude, dtype=float), (len(stamps),))
+    keys = [(cache_moment(stamp), cache_observer(lat, lon)) for stamp, lat, lon in zip(stamps, latitudes.tolist(), longitudes.tolist())]
+    degrees = np.array(cached('chart', keys, lambda missing: sky_chart_longitudes(
+        [stamps[i] for i in missing], latitudes[missing], longitudes[missing]).T.tolist())).T
+    return degrees if many else degrees[:, 0]
+
+def sky_chart_longitudes(when, latitude, longitude):
+    ephem = ephemeris()
+    many = isinstance(when, (list, tuple))
+    stamps = when if many else [when]
+    with PROFILE.span('time.build'):
+        t = ephem.ts.utc(*(np.array([getattr(d, field) for d in stamps])
+                           for field in ('year', 'month', 'day', 'hour', 'minute', 'second')))
+    location = astronomy().Topos(latitude_degrees=np.asarray(latitude, dtype=float), longitude_degrees=np.asarray(longitude, dtype=float))
+    observer = (ephem.bodies['earth'] + location).at(t if many else t[0])
+    return ecliptic_longitudes(observer, [key for _, key in CHART_BODIES])
+
+def chart_degrees(birth_datetime, latitude, longitude):
+    return chart_longitudes(birth_datetime.replace(second=0, microsecond=0), latitude, longitude)
+
+# Chart angles, houses and aspects. Angles are worked in the mean ecliptic of date, then shifted by the
+# general precession into the J2000 ecliptic the body longitudes are in; every function takes one or many charts
+HOUSE_SYSTEMS = ('placidus', 'porphyry', 'equal', 'whole')
+PLACIDUS_ITERATIONS = 200
+PLACIDUS_TOLERANCE = 1e-10
+# Placidus cusps 11, 12, 2, 3: hour angle = base + fraction of the diurnal (above) or nocturnal (below) semi-arc
+PLACIDUS_CUSPS = ((0, 1 / 3, True), (0, 2 / 3, True), (180, -2 / 3, False), (180, -1 / 3, False))
+ASPECTS = {'conjunction': (0, 8.0), 'sextile': (60, 4.0), 'square': (90, 7.0), 'trine': (120, 7.0), 'opposition': (180, 8.0)}
+ASPECT_SYMBOLS = {'conjunction': '☌', 'sextile': '⚹', 'square': '□', 'trine': '△', 'opposition': '☍'}
+CHART_ANGLES = [('Ascendant', 'ascendant'), ('Midheaven', 'midheaven')]
+CHART_POINTS = CHART_BODIES + CHART_ANGLES
+J2000 = datetime(2000, 1, 1, 12)
+
+def julian_centuries(when):
+    # Centuries of UT since J2000 for a datetime or a list of them (UT and TT differ by far less than these terms need)
+    stamps = when if isinstance(when, (list, tuple)) else [when]
+    return np.array([(stamp - J2000) / timedelta(days=36525) for stamp in stamps])
+
+def sidereal_time(centuries, longitude):
+    # Local mean sidereal time in degrees: IAU 1982 GMST plus east longitude
+    return (280.46061837 + 360.98564736629 * 36525 * centuries + 0.000387933 * centuries ** 2
+            - centuries ** 3 / 38710000 + np.asarray(longitude, dtype=float)) % 360
+
+def mean_obliquity(centuries):
+    return 23.43929111 - (46.8150 * centuries + 0.00059 * centuries ** 2 - 0.001813 * centuries ** 3) / 3600
+
+def general_precession(centuries):
+    # Accumulated precession in ecliptic longitude since J2000 (IAU 2006), degrees
+    return (5028.796195 * centuries + 1.1054348 * centuries ** 2) / 3600
+
+def ecliptic_at_ra(ra, obliquity):
+    # Longitude of the ecliptic point with right ascension ra (radians in, degrees out)
+    return np.degrees(np.arctan2(np.sin(ra), np.cos(ra) * np.cos(obliquity))) % 360
+
+def placidus_cusp(ramc, obliquity, latitude, base, fraction, above):
+    # Trisects the semi-arc in time; the declination, and so the semi-arc, depends on the cusp being solved for.
+    # Convergence slows towards the polar circles, so iterate until every chart's RA settles (NaN ones never do)
+    ra = ramc + np.radians(base + fraction * 90)
+    with np.errstate(invalid='ignore'):
+        for _ in range(PLACIDUS_ITERATIONS):
+            declination = np.arctan(np.sin(ra) * np.tan(obliquity))
+            ascensional = np.degrees(np.arcsin(np.tan(latitude) * np.tan(declination)))
+            ra, previous = ramc + np.radians(base + fraction * (90 + ascensional if above else 90 - ascensional)), ra
+            if not (np.abs(ra - previous) > PLACIDUS_TOLERANCE).any():
+                break
+    return ecliptic_at_ra(ra, obliquity)
+
+def house_cusps(ramc, obliquity, latitude, ascendant, midheaven, shift, system='placidus'):
+    # (12, charts) cusp longitudes, house 1 first, from the J2000 ascendant and midheaven; Placidus works from
+    # the sidereal time of date and is shifted like the angles, and is NaN inside the polar circles
+    if system == 'whole':
+        return (ascendant // 30 * 30 + 30 * np.arange(12)[:, None]) % 360
+    if system == 'equal':
+        return (ascendant + 30 * np.arange(12)[:, None]) % 360
+    if system == 'porphyry':
+        imum = (midheaven + 180) % 360
+        rising, setting = (imum - ascendant) % 360, (ascendant + 180 - imum) % 360
+        east = [ascendant, ascendant + rising / 3, ascendant + 2 * rising / 3, imum, imum + setting / 3, imum + 2 * setting / 3]
+    elif system == 'placidus':
+        eleventh, twelfth, second, third = (placidus_cusp(ramc, obliquity, latitude, *cusp) - shift for cusp in PLACIDUS_CUSPS)
+        east = [ascendant, second, third, (midheaven + 180) % 360, (eleventh + 180) % 360, (twelfth + 180) % 360]
+        if np.isnan(eleventh + twelfth + second + third).any():
+            east = [np.where(np.isnan(eleventh + twelfth + second + third), np.nan, cusp) for cusp in east]
+    else:
+        raise ValueError(f"Unknown house system: {system} (choose from {', '.join(HOUSE_SYSTEMS)})")
+    east = np.array(east) % 360
+    return np.concatenate([east, (east + 180) % 360])
+
+def chart_frame(when, latitude, longitude, houses='placidus'):
+    # Local sidereal time (hours), ascendant, midheaven and (12, charts) cusps, all J2000 ecliptic degrees
+    centuries = julian_centuries(when)
+    lst = sidereal_time(centuries, longitude)
+    ramc, obliquity, phi = np.radians(lst), np.radians(mean_obliquity(centuries)), np.radians(np.asarray(latitude, dtype=float))
+    shift = general_precession(centuries)
+    midheaven = (ecliptic_at_ra(ramc, obliquity) - shift) % 360
+    ascendant = (np.degrees(np.arctan2(np.cos(ramc), -(np.sin(obliquity) * np.tan(phi) + np.cos(obliquity) * np.sin(ramc)))) - shift) % 360
+    return lst / 15, ascendant, midheaven, house_cusps(ramc, obliquity, phi, ascendant, midheaven, shift, houses)
+
+def house_positions(degrees, cusps):
+    # House number (1-12) of each (points, charts) longitude; 0 where the cusps are undefined
+    offset = (degrees - cusps[0]) % 360
+    starts = (cusps - cusps[0]) % 360
+    house = (starts[None, :, :] <= offset[:, None, :]).sum(axis=1)
+    return np.where(np.isnan(cusps).any(axis=0), 0, house)
+
+def aspect_grid(degrees, orbs=None):
+    # degrees: (points, charts); returns the aspect index into ASPECTS (-1 for none) and its orb, both (points, points, charts)
+    unknown = set(orbs or ()) - set(ASPECTS)
+    if unknown:
+        raise ValueError(f"Unknown aspect: {', '.join(sorted(unknown))} (choose from {', '.join(ASPECTS)})")
+    angles = np.array([angle for angle, _ in ASPECTS.values()], dtype=float)
+    limits = np.array([float((orbs or {}).get(name, orb)) for name, (_, orb) in ASPECTS.items()])
+    separation = np.abs((degrees[:, None] - degrees[None, :] + 180) % 360 - 180)
+    off = np.abs(separation[..., None] - angles)
+    off = np.where(off <= limits, off, np.inf)
+    kind, orb = off.argmin(axis=-1), off.min(axis=-1)
+    found = np.isfinite(orb)
+    return np.where(found, kind, -1), np.where(found, orb, np.nan)
+
+def parse_orbs(text):
+    # "square=6,trine=5" -> {'square': 6.0, 'trine': 5.0}
+    orbs = {}
+    for part in filter(None, (part.strip() for part in (text or '').split(','))):
+        name, _, orb = part.partition('=')
+        orbs[name.strip().lower()] = float(orb)
+    return orbs
+
+def chart_records(ids, when, latitude, longitude, degrees, houses='placidus', orbs=None):
+    # One record per chart from (bodies, charts) longitudes; the angles, houses and aspect grid are one array pass
+    lst, ascendant, midheaven, cusps = chart_frame(when, latitude, longitude, houses)
+    points = np.vstack([degrees, ascendant[None], midheaven[None]])
+    body_houses = house_positions(degrees, cusps)
+    kind, orb = aspect_grid(points, orbs)
+    # Aspects between two bodies or a body and an angle, gathered for all charts in one pass
+    first, second = np.triu_indices(len(points), 1)
+    pairs = first < len(CHART_BODIES)
+    first, second = first[pairs], second[pairs]
+    pair_kind, pair_orb = kind[first, second].T, orb[first, second].T
+    aspects = [[] for _ in ids]
+    names = list(ASPECTS)
+    found = np.nonzero(pair_kind >= 0)
+    for column, pair, index, degrees_off in zip(found[0].tolist(), found[1].tolist(), pair_kind[found].tolist(),
+                                                np.round(pair_orb[found], 2).tolist()):
+        aspects[column].append({'from': CHART_POINTS[first[pair]][1], 'to': CHART_POINTS[second[pair]][1],
+                                'aspect': names[index], 'orb': degrees_off})
+    signs = [sign.split()[0] for sign in ZODIAC_SIGNS]
+    point_keys = [(f"{key}_sign", f"{key}_degree", f"{key}_house") for _, key in CHART_POINTS]
+    cusp_keys = [f"cusp_{number}" for number in range(1, 13)]
+    records = []
+    for row_id, row, row_signs, row_houses, row_cusps, row_lst, row_aspects in zip(
+            ids, np.round(points, 4).T.tolist(), (points // 30 % 12).astype(int).T.tolist(), body_houses.T.tolist(),
+            np.round(cusps, 4).T.tolist(), np.round(lst, 6).tolist(), aspects):
+        record = {'id': row_id}
+        for (sign_key, degree_key, house_key), degree, sign, house in zip(point_keys, row, row_signs, row_houses + [None, None]):
+            record[sign_key] = signs[sign]
+            record[degree_key] = degree
+            if house is not None:
+                record[house_key] = house or None
+        record['lst_hours'] = row_lst
+        record['houses'] = houses
+        record.update(zip(cusp_keys, (None if math.isnan(cusp) else cusp for cusp in row_cusps)))
+        record['aspects'] = row_aspects
+        records.append(record)
+    return records
+
+def chart_lines(record):
+    labels = dict((key, label) for label, key in CHART_POINTS)
+    lines = []
+    for label, key in CHART_POINTS:
+        degree = record[f"{key}_degree"]
+        house = record.get(f"{key}_house")
+        lines.append(f"{label}: {get_sign(degree)} ({degree:.2f}°)" + (f", house {house}" if house else ""))
+    lines.append(f"Local sidereal time: {record['lst_hours']:.4f}h")
+    lines.append(f"\nHouse cusps ({record['houses']}):")
+    for number in range(1, 13):
+        cusp = record[f"cusp_{number}"]
+        lines.append(f"{number:>2}: {get_sign(cusp)} ({cusp:.2f}°)" if cusp is not None else f"{number:>2}: undefined at this latitude")
+    lines.append("\nAspects:")
+    for aspect in record['aspects']:
+        lines.append(f"{labels[aspect['from']]} {ASPECT_SYMBOLS[aspect['aspect']]} {labels[aspect['to']]}: {aspect['aspect']} (orb {aspect['orb']:.2f}°)")
+    return lines
+
+def parse_birth(row):
+    # Accepts datetime/lat/lon rows from CSV or JSONL; naive datetimes are taken as UTC. Errors name the row's id
+    label = "Birth data" if row.get('id') is None else f"Row {row['id']}"
+    fields = {'datetime': row.get('datetime') or row.get('when'), 'latitude': row.get('latitude', row.get('lat')),
+              'longitude': row.get('longitude', row.get('lon'))}
+    missing = [field for field, value in fields.items() if value is None or not str(value).strip()]
+    if missing:
+        raise ValueError(f"{label} needs {' and '.join(missing)}.")
+    try:
+        when = datetime.fromisoformat(str(fields['datetime']).strip())
+    except ValueError:
+        raise ValueError(f"{label} has an invalid datetime: {fields['datetime']!r}.") from None
+    try:
+        latitude, longitude = float(fields['latitude']), float(fields['longitude'])
+    except (TypeError, ValueError):
+        raise ValueError(f"{label} needs a number for latitude and longitude.") from None
+    if not -90 <= latitude <= 90:
+        raise ValueError(f"{label} has latitude {latitude}; it must be between -90 and 90.")
+    if not -180 <= longitude <= 180:
+        raise ValueError(f"{label} has longitude {longitude}; it must be between -180 and 180.")
+    if when.tzinfo:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    return row.get('id'), when, latitude, longitude
+
+def read_rows(path):
+    # Streams dict rows from a .csv or .jsonl file ("-" for stdin, sniffed from the first line)
+    stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+    try:
+        first = stream.readline()
+        lines = itertools.chain([first], stream)
+        if path.lower().endswith('.csv') or (path == '-' and not first.lstrip().startswith('{')):
+            yield from csv.DictReader(lines)
+        else:
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def chart_chunk(rows, houses='placidus', orbs=None):
+    births = [parse_birth(row) for row in rows]
+    ids, when, latitude, longitude = zip(*births)
+    degrees = chart_longitudes(list(when), latitude, longitude)
+    return chart_records(ids, list(when), latitude, longitude, degrees, houses, orbs)
+
+def number_rows(rows):
+    for index, row in enumerate(rows, 1):
+        if not row.get('id'):
+            row['id'] = index
+        yield row
+
+def valid_rows(rows, parse, skipped):
+    # The rows that parse, in order; the error of each one that does not goes to skipped(message) instead
+    for row in rows:
+        try:
+            parse(row)
+        except ValueError as e:
+            skipped(str(e))
+            continue
+        yield row
+
+def batch_charts(rows, workers=None, chunk_rows=CHART_CHUNK_ROWS, houses='placidus', orbs=None, skipped=None):
+    # Streams chart records in input order; each worker process keeps its own warm ephemeris. With skipped, bad
+    # rows are reported to it and left out rather than stopping the batch
+    rows = number_rows(rows)
+    if skipped:
+        rows = valid_rows(rows, parse_birth, skipped)
+    for records in pool_map(functools.partial(chart_chunk, houses=houses, orbs=orbs), chunked(rows, chunk_rows), workers):
+        yield from records
+
+def write_rows(records, path):
+    # Streams dict records to a .csv or .jsonl file ("-" for JSONL on stdout); returns the row count
+    stream = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+    count, writer = 0, None
+    try:
+        for record in records:
+            if path.lower().endswith('.csv'):
+                if writer is None:
+                    writer = csv.DictWriter(stream, fieldnames=list(record))
+                    writer.writeheader()
+                writer.writerow({key: json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+                                 for key, value in record.items()})
+            else:
+                stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return count
+
+# Planetary positions engine
+PLANET_SYMBOLS = [('sun', '☉'), ('moon', '☽'), ('mercury', '☿'), ('venus', '♀'), ('mars', '♂'), ('jupiter', '♃'), ('saturn', '♄'), ('uranus', '♅'), ('neptune', '♆'), ('pluto', '♇')]
+TABLE_COLUMNS = ('ra', 'dec', 'lon')
+TABLE_CHUNK_STEPS = 4096
+STEP_UNITS = {'d': 1.0, 'h': 1 / 24, 'm': 1 / 1440}
+
+def planet_positions(t):
+    # {name: (ra hours, dec degrees, ecliptic longitude)} as seen from Earth, all from one apparent position per
+    # body; arrays when t is
+    ephem = ephemeris()
+    observer = ephem.bodies['earth'].at(t)
+    positions = {}
+    for name, _ in PLANET_SYMBOLS:
+        with PROFILE.span(f'observe.{name}'):
+            apparent = observer.observe(ephem.bodies[name]).apparent()
+            ra, dec, _ = apparent.radec()
+            x, y = apparent.ecliptic_position().au[:2]
+        positions[name] = (ra.hours, dec.degrees, np.degrees(np.arctan2(y, x)) % 360)
+    return positions
+
+def planet_snapshot(when=None):
+    # planet_positions at a naive UTC datetime, through the result cache, or right now
+    if when is None:
+        return planet_positions(ephemeris().ts.now())
+    return cached('planets', [(cache_moment(when), '')], lambda missing: [
+        {name: [float(value) for value in position]
+         for name, position in planet_positions(ephemeris().ts.from_datetime(when.replace(tzinfo=timezone.utc))).items()}])[0]
+
+def parse_step(step):
+    # "1d", "6h", "30m" or a bare number of days
+    text = str(step).strip().lower()
+    days = float(text[:-1]) * STEP_UNITS[text[-1]] if text and text[-1] in STEP_UNITS else float(text)
+    check_step(days)
+    return days
+
+def check_step(step_days):
+    if not 0 < step_days < math.inf:
+        raise ValueError(f"Step must be a positive number of days, not {step_days}.")
+
+def planet_table_dtype():
+    return np.dtype([('jd_tt', 'f8')] + [(f"{name}_{column}", 'f4')
+                                         for name, _ in PLANET_SYMBOLS for column in TABLE_COLUMNS])
+
+def write_planet_table(path, start_date, end_date, step_days, chunk_steps=TABLE_CHUNK_STEPS):
+    # Writes a structured .npy table (TT Julian date plus RA/Dec/longitude per body) chunk by chunk;
+    # read it back with np.load(path, mmap_mode='r')
+    ts = ephemeris().ts
+    jd_start = ts.utc(start_date.year, start_date.month, start_date.day, start_date.hour, start_date.minute).tt
+    jd_end = ts.utc(end_date.year, end_date.month, end_date.day, end_date.hour, end_date.minute).tt
+    check_step(step_days)
+    if jd_end < jd_start:
+        raise ValueError("End must not be before start.")
+    count = int((jd_end - jd_start) / step_days + 1e-9) + 1
+    table = np.lib.format.open_memmap(path, mode='w+', dtype=planet_table_dtype(), shape=(count,))
+    for offset in range(0, count, chunk_steps):
+        jd = jd_start + step_days * np.arange(offset, min(offset + chunk_steps, count))
+        block = table[offset:offset + len(jd)]
+        block['jd_tt'] = jd
+        for name, values in planet_positions(ts.tt_jd(jd)).items():
+            for column, value in zip(TABLE_COLUMNS, values):
+                block[f"{name}_{column}"] = value
+    table.flush()
+    del table
+    return count
+
+# Fast position index (Chebyshev fits of geocentric ecliptic longitude)
+INDEX_FILE = 'positions-index.npz'
+INDEX_DEGREE = 12
+INDEX_SEGMENT_DAYS = {'sun': 64.0, 'moon': 8.0, 'mercury': 16.0, 'venus': 32.0, 'mars': 32.0, 'jupiter': 64.0,
+                      'saturn': 64.0, 'uranus': 64.0, 'neptune': 64.0, 'pluto': 64.0}
+INDEX_MIN_SEGMENT_DAYS = 2.0 ** -10
+INDEX_MAX_SEGMENTS = 1 << 18
+# Probes and sweeps only sample the error, so segments are fitted to this fraction of the target
+INDEX_FIT_MARGIN = 0.5
+INDEX_SUN_RADIUS = 0.27
+INDEX_CHUNK_SEGMENTS = 2048
+INDEX_VALIDATION_SAMPLES = 20000
+INDEX_PROBE_DENSITY = 2
+
+def julian_date_tt(year, month=1, day=1, hour=0, minute=0, second=0):
+    return ephemeris().ts.utc(year, month, day, hour, minute, second).tt
+
+def exact_longitudes(jd, keys):
+    ephem = ephemeris()
+    with PROFILE.span('time.build'):
+        t = ephem.ts.tt_jd(jd)
+    return ecliptic_longitudes(ephem.bodies['earth'].at(t), keys)
+
+def fit_error(key, fitted, exact, sun):
+    # Arcsec off the exact longitude, not counted while a planet is within the Sun's radius of it in longitude:
+    # behind the disc, where it cannot be seen anyway, skyfield's light deflection spikes by minutes of arc
+    error = np.abs(wrap_degrees(fitted - exact)) * 3600
+    if key in ('sun', 'moon'):
+        return error
+    return np.where(np.abs(wrap_degrees(exact - sun)) < INDEX_SUN_RADIUS, 0.0, error)
+
+def fit_segments(key, starts, lengths, degree):
+    # Least-squares fit on 2(degree+1) Chebyshev nodes per segment; each segment's error is the max over
+    # INDEX_PROBE_DENSITY probes per node, segment ends included. Returns (coefficients, errors in arcsec)
+    nodes = np.cos(np.pi * (np.arange(2 * (degree + 1)) + 0.5) / (2 * (degree + 1)))[::-1]
+    probes = np.linspace(-1, 1, INDEX_PROBE_DENSITY * len(nodes) + 1)
+    solve = np.linalg.pinv(np.polynomial.chebyshev.chebvander(nodes, degree))
+    x = np.concatenate([nodes, probes])
+    coefficients, errors = [], []
+    for first in range(0, len(starts), INDEX_CHUNK_SEGMENTS):
+        begin, span = starts[first:first + INDEX_CHUNK_SEGMENTS], lengths[first:first + INDEX_CHUNK_SEGMENTS]
+        lons, sun = exact_longitudes((begin[:, None] + (x + 1) / 2 * span[:, None]).ravel(), [key, 'sun'])
+        lons = np.unwrap(lons.reshape(len(begin), len(x)), period=360, axis=1)
+        chunk = lons[:, :len(nodes)] @ solve.T
+        fitted = np.polynomial.chebyshev.chebval(probes, chunk.T, tensor=True)
+        sun = sun.reshape(len(begin), len(x))[:, len(nodes):]
+        errors.append(fit_error(key, fitted, lons[:, len(nodes):], sun).max(axis=1))
+        coefficients.append(chunk)
+    return np.concatenate(coefficients), np.concatenate(errors)
+
+def segment_longitudes(edges, coefficients, jd):
+    # Longitudes (degrees) from Chebyshev segments between consecutive edges
+    segment = np.clip(np.searchsorted(edges, jd, 'right') - 1, 0, len(coefficients) - 1)
+    x = 2 * (jd - edges[segment]) / (edges[segment + 1] - edges[segment]) - 1
+    return np.polynomial.chebyshev.chebval(x, coefficients[segment].T, tensor=False) % 360, segment
+
+def fit_body(key, jd_start, jd_end, accuracy_arcsec, degree, rng):
+    # (edges, coefficients, max error in arcsec) for one body. Starts from INDEX_SEGMENT_DAYS and halves every
+    # segment that misses the target until none does. Light deflection within a degree or so of the Sun makes
+    # spikes too narrow for the starting segments; halving only those keeps the index small
+    segments = int(np.ceil((jd_end - jd_start) / INDEX_SEGMENT_DAYS[key]))
+    # Segments tile the era exactly so no fit node falls outside it
+    edges = np.linspace(jd_start, jd_end, segments + 1)
+    coefficients, errors = fit_segments(key, edges[:-1], np.diff(edges), degree)
+    target = accuracy_arcsec * INDEX_FIT_MARGIN
+    while True:
+        bad = errors > target
+        if not bad.any():
+            # The probes can still step over a brief spike; a random sweep over the whole era catches most of the rest
+            jd = rng.uniform(jd_start, jd_end, INDEX_VALIDATION_SAMPLES)
+            lons, segment = segment_longitudes(edges, coefficients, jd)
+            np.maximum.at(errors, segment, fit_error(key, lons, *exact_longitudes(jd, [key, 'sun'])))
+            bad = errors > target
+            if not bad.any():
+                return edges, coefficients, float(errors.max())
+        starts, lengths = edges[:-1][bad], np.diff(edges)[bad] / 2
+        if lengths.min() < INDEX_MIN_SEGMENT_DAYS or len(errors) + len(starts) > INDEX_MAX_SEGMENTS:
+            raise ValueError(f"The position index cannot fit {key} to {accuracy_arcsec}\" ({errors.max():.3f}\" left "
+                             f"with {len(errors)} segments, the shortest {lengths.min() * 2880:.1f} minutes).")
+        halves = np.concatenate([starts, starts + lengths])
+        fitted, fitted_errors = fit_segments(key, halves, np.concatenate([lengths, lengths]), degree)
+        starts = np.concatenate([edges[:-1][~bad], halves])
+        order = np.argsort(starts, kind='stable')
+        edges = np.append(starts[order], jd_end)
+        coefficients = np.concatenate([coefficients[~bad], fitted])[order]
+        errors = np.concatenate([errors[~bad], fitted_errors])[order]
+
+class PositionIndex:
+    def __init__(self, jd_start, jd_end, edges, coefficients, errors=None):
+        self.jd_start, self.jd_end = float(jd_start), float(jd_end)
+        self.edges = edges
+        self.coefficients = coefficients
+        self.errors = errors or {}
+
+    @classmethod
+    def build(cls, start_year, end_year, accuracy_arcsec=1.0, degree=INDEX_DEGREE):
+        # Every body within accuracy_arcsec of skyfield as measured at build time, or ValueError
+        jd_start, jd_end = julian_date_tt(start_year), julian_date_tt(end_year)
+        rng = np.random.default_rng(0)
+        edges, coefficients, errors = {}, {}, {}
+        for _, key in CHART_BODIES:
+            edges[key], coefficients[key], errors[key] = fit_body(key, jd_start, jd_end, accuracy_arcsec, degree, rng)
+        return cls(jd_start, jd_end, edges, coefficients, errors)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        with np.load(path) as data:
+            keys = [key for _, key in CHART_BODIES]
+            if f"{keys[0]}_edges" not in data:
+                raise ValueError(f"{path} was built by an older version; build it again with 'index build'.")
+            return cls(data['jd_start'], data['jd_end'], {key: data[f"{key}_edges"] for key in keys},
+                       {key: data[f"{key}_coefficients"] for key in keys})
+
+    def save(self, path=INDEX_FILE):
+        arrays = {'jd_start': self.jd_start, 'jd_end': self.jd_end}
+        for key, edges in self.edges.items():
+            arrays[f"{key}_edges"] = edges
+            arrays[f"{key}_coefficients"] = self.coefficients[key]
+        np.savez(path, **arrays)
+
+    def longitudes(self, jd, keys=None):
+        # Geocentric ecliptic longitudes (degrees), one row per key, for TT Julian date(s) inside the era
+        jd = np.atleast_1d(np.asarray(jd, dtype=float))
+        if (jd < self.jd_start).any() or (jd > self.jd_end).any():
+            raise ValueError("Date outside the position index era.")
+        return np.array([segment_longitudes(self.edges[key], self.coefficients[key], jd)[0]
+                         for key in keys or [key for _, key in CHART_BODIES]])
+
+    def validate(self, samples=INDEX_VALIDATION_SAMPLES, seed=0):
+        # Maximum error in arcseconds against the exact skyfield result, per body (see fit_error)
+        jd = np.random.default_rng(seed).uniform(self.jd_start, self.jd_end, samples)
+        keys = [key for _, key in CHART_BODIES]
+        *exact, sun = exact_longitudes(jd, keys + ['sun'])
+        return {key: float(fit_error(key, fitted, row, sun).max()) for key, fitted, row in zip(keys, self.longitudes(jd, keys), exact)}
+
+def fast_degrees(index, birth_datetime):
+    jd = julian_date_tt(birth_datetime.year, birth_datetime.month, birth_datetime.day,
+                        birth_datetime.hour, birth_datetime.minute)
+    return index.longitudes(jd)[:, 0]
+
+# Sign ingresses and stations. Each body is sampled at a step short of its fastest motion and retrograde loop;
+# stations are the zeros of the sampled speed, and inserting them into the samples leaves only monotonic
+# stretches, so every sign change between neighbours is exactly one ingress
+SKY_EVENT_STEP_DAYS = {'sun': 2.0, 'moon': 0.5, 'mercury': 1.0, 'venus': 2.0, 'mars': 2.0, 'jupiter': 4.0,
+                       'saturn': 4.0, 'uranus': 8.0, 'neptune': 8.0, 'pluto': 8.0}
+STATION_DELTA_DAYS = 0.01
+STATION_FREE = ('sun', 'moon')
+
+def wrap_degrees(angle):
+    return (angle + 180) % 360 - 180
+
+def body_events(key, jd_lo, jd_hi):
+    # [(tt jd, key, kind, sign index, retrograde, longitude)] for jd_lo <= jd < jd_hi; samples reach one step
+    # past both ends so events at a chunk edge are found by exactly one chunk
+    step = SKY_EVENT_STEP_DAYS[key]
+    longitude = lambda x: exact_longitudes(x, [key])[0]
+    jd = np.arange(jd_lo - step, jd_hi + 2 * step, step)
+    lon = longitude(jd)
+    stations = np.empty(0)
+    if key not in STATION_FREE:
+        speed = lambda x: wrap_degrees(longitude(x + STATION_DELTA_DAYS) - longitude(x))
+        moving = wrap_degrees(longitude(jd + STATION_DELTA_DAYS) - lon) > 0
+        turned = np.flatnonzero(moving[1:] != moving[:-1])
+        towards = np.where(moving[turned], -1.0, 1.0)
+        stations = refine_crossings(lambda x: towards * speed(x), jd[turned], jd[turned + 1])
+        jd, lon = np.concatenate([jd, stations]), np.concatenate([lon, longitude(stations)])
+        order = np.argsort(jd, kind='stable')
+        jd, lon = jd[order], lon[order]
+    sign = (lon // 30).astype(int) % 12
+    crossed = np.flatnonzero(sign[1:] != sign[:-1])
+    forward = wrap_degrees(lon[crossed + 1] - lon[crossed]) > 0
+    boundary = np.where(forward, sign[crossed + 1], sign[crossed]) * 30
+    towards = np.where(forward, 1.0, -1.0)
+    ingresses = refine_crossings(lambda x: towards * wrap_degrees(longitude(x) - boundary), jd[crossed], jd[crossed + 1])
+    events = [(t, key, 'ingress', entered, not ahead, float(degree))
+              for t, entered, ahead, degree in zip(ingresses.tolist(), sign[crossed + 1].tolist(), forward.tolist(), boundary.tolist())]
+    if stations.size:
+        station_lon = longitude(stations)
+        events += [(t, key, 'retrograde' if retrograde else 'direct', int(degree // 30) % 12, retrograde, degree)
+                   for t, retrograde, degree in zip(stations.tolist(), moving[turned].tolist(), station_lon.tolist())]
+    return [event for event in events if jd_lo <= event[0] < jd_hi]
+
+def sky_event_chunk(task):
+    jd_lo, jd_hi, keys = task
+    return sorted((event for key in keys for event in body_events(key, jd_lo, jd_hi)), key=lambda event: event[0])
+
+def sky_events(start_date, end_date, keys=None, workers=None, chunk_days=None):
+    # Yields (utc datetime, key, kind, sign index, retrograde, longitude) in time order; chunks run in parallel
+    # and come back in order, each already sorted. Every ephemeris call costs a few ms however short, so the
+    # span is cut into one chunk per worker (at most a century) rather than many small ones
+    ts = ephemeris().ts
+    keys = keys or list(SKY_EVENT_STEP_DAYS)
+    unknown = set(keys) - set(SKY_EVENT_STEP_DAYS)
+    if unknown:
+        raise ValueError(f"Unknown body: {', '.join(sorted(unknown))} (choose from {', '.join(SKY_EVENT_STEP_DAYS)})")
+    jd_start = ts.utc(start_date.year, start_date.month, start_date.day, start_date.hour, start_date.minute).tt
+    jd_end = ts.utc(end_date.year, end_date.month, end_date.day, end_date.hour, end_date.minute).tt
+    workers = workers or os.cpu_count() or 1
+    chunk_days = chunk_days or min(max(jd_end - jd_start, 1.0) / workers, EVENT_CHUNK_DAYS)
+    bounds = np.append(np.arange(jd_start, jd_end, chunk_days), jd_end)
+    tasks = [(lo, hi, keys) for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist())]
+    for events in pool_map(sky_event_chunk, tasks, workers):
+        if events:
+            times = ts.tt_jd(np.array([event[0] for event in events])).utc_datetime()
+            for when, event in zip(times, events):
+                yield (when,) + event[1:]
+
+def sky_event_record(event):
+    when, key, kind, sign, retrograde, degree = event
+    return {'time': when.isoformat(), 'body': key, 'event': kind, 'sign': ZODIAC_SIGNS[sign].split()[0],
+            'retrograde': retrograde, 'longitude': round(degree, 4)}
+
+def sky_event_text(event):
+    when, key, kind, sign, retrograde, degree = event
+    body = f"{key.capitalize()} {dict(PLANET_SYMBOLS)[key]}"
+    if kind == 'ingress':
+        return f"{when.strftime('%Y-%m-%d %H:%M')} UTC: {body} enters {ZODIAC_SIGNS[sign]}{' (retrograde)' if retrograde else ''}"
+    return f"{when.strftime('%Y-%m-%d %H:%M')} UTC: {body} stations {kind} at {degree % 30:.2f}° {ZODIAC_SIGNS[sign]}"
+
+# Synastry store: every chart's body and angle longitudes in one float32 array, with a sorted index per point
+# so aspect lookups are a binary search instead of a scan or any ephemeris work
+SYNASTRY_FILE = 'synastry-store.npz'
+SYNASTRY_KEYS = [key for _, key in CHART_POINTS]
+
+def synastry_chunk(rows):
+    ids, when, latitude, longitude = zip(*(parse_birth(row) for row in rows))
+    degrees = chart_longitudes(list(when), latitude, longitude)
+    _, ascendant, midheaven, _ = chart_frame(list(when), latitude, longitude, 'equal')
+    return [str(row_id) for row_id in ids], np.vstack([degrees, ascendant[None], midheaven[None]]).astype(np.float32)
+
+class SynastryStore:
+    def __init__(self, ids, longitudes, order=None):
+        self.ids = np.asarray(ids, dtype=str)
+        self.longitudes = np.asarray(longitudes, dtype=np.float32)
+        if order is None:
+            order = np.argsort(self.longitudes, axis=1, kind='stable')
+        self.order = order.astype(np.int32 if len(self.ids) < 1 << 31 else np.int64)
+        self.sorted = np.take_along_axis(self.longitudes, self.order, axis=1)
+        self.rows = {key: row for row, key in enumerate(SYNASTRY_KEYS)}
+
+    @classmethod
+    def build(cls, rows, workers=None, chunk_rows=CHART_CHUNK_ROWS):
+        ids, blocks = [], []
+        for chunk_ids, block in pool_map(synastry_chunk, chunked(number_rows(rows), chunk_rows), workers):
+            ids.extend(chunk_ids)
+            blocks.append(block)
+        return cls(ids, np.hstack(blocks) if blocks else np.zeros((len(SYNASTRY_KEYS), 0), dtype=np.float32))
+
+    @classmethod
+    def load(cls, path=SYNASTRY_FILE):
+        with np.load(path) as data:
+            return cls(data['ids'], data['longitudes'], data['order'])
+
+    def save(self, path=SYNASTRY_FILE):
+        np.savez(path, ids=self.ids, longitudes=self.longitudes, order=self.order)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def point(self, key):
+        if key not in self.rows:
+            raise ValueError(f"Unknown chart point: {key} (choose from {', '.join(SYNASTRY_KEYS)})")
+        return self.rows[key]
+
+    def chart(self, chart_id):
+        # Stored longitudes of one chart by id, as {point: degree}
+        found = np.flatnonzero(self.ids == str(chart_id))
+        if not len(found):
+            raise ValueError(f"No chart with id {chart_id} in the store.")
+        return dict(zip(SYNASTRY_KEYS, self.longitudes[:, found[0]].tolist()))
+
+    def window(self, row, low, high):
+        # Chart indices whose longitude lies in [low, high] on the circle, for high - low < 360. The bounds take the
+        # row's dtype (a float64 bound would make searchsorted copy the whole row) and are widened by one ulp so
+        # rounding never drops an edge; matches() applies the exact orb afterwards
+        ordered = self.sorted[row]
+        kind = ordered.dtype.type
+        low = np.nextafter(kind(low % 360), kind(-np.inf))
+        high = np.nextafter(kind(high % 360), kind(np.inf))
+        if low <= high:
+            return self.order[row, np.searchsorted(ordered, low, 'left'):np.searchsorted(ordered, high, 'right')]
+        return np.concatenate([self.order[row, np.searchsorted(ordered, low, 'left'):],
+                               self.order[row, :np.searchsorted(ordered, high, 'right')]])
+
+    def matches(self, key, longitude, aspect='conjunction', orb=None):
+        # Charts whose point `key` makes `aspect` to `longitude` within the orb: (indices, orbs), closest first
+        if aspect not in ASPECTS:
+            raise ValueError(f"Unknown aspect: {aspect} (choose from {', '.join(ASPECTS)})")
+        angle, default_orb = ASPECTS[aspect]
+        orb = default_orb if orb is None else float(orb)
+        if not 0 <= orb < 180:
+            raise ValueError(f"Orb must be at least 0 and under 180 degrees, not {orb}.")
+        row = self.point(key)
+        targets = {(longitude + angle) % 360, (longitude - angle) % 360}
+        found = [self.window(row, target - orb, target + orb) for target in targets]
+        found = np.unique(np.concatenate(found)) if len(found) > 1 else found[0]
+        off = np.abs(np.abs((self.longitudes[row, found].astype(float) - longitude + 180) % 360 - 180) - angle)
+        keep = off <= orb
+        found, off = found[keep], off[keep]
+        ranked = np.argsort(off, kind='stable')
+        return found[ranked], off[ranked]
+
+    def contacts(self, chart, pairs=None, aspects=None, orbs=None):
+        # Synastry of one chart ({point: degree}) against the store: yields (index, from, to, aspect, orb)
+        for source, target in pairs or itertools.product(chart, SYNASTRY_KEYS):
+            for aspect in aspects or ASPECTS:
+                found, off = self.matches(target, chart[source], aspect, (orbs or {}).get(aspect))
+                for index, degrees_off in zip(found.tolist(), off.tolist()):
+                    yield index, source, target, aspect, degrees_off
+
 # Menu
+MENU_CHOICES = {
+    "1": "tarot", "2": "runes", "3": "coin", "4": "dice", "5": "iching",
+    "6": "birthchart", "7": "planets", "8": "moon", "9": "numerology", "10": "createsigil"
+}
+
 def menu():
     while True:
         clear_terminal()
@@ -57,478 +1282,1009 @@ def menu():
         if choice == "X":
             colored_print("\nThank you for using The Virtual Esoteric Toolkit.")
             time.sleep(3)
-            break
-        actions = {
-            "1": tarot, "2": runes, "3": coin, "4": dice, "5": iching,
-            "6": birthchart, "7": planets, "8": moon, "9": numerology, "10": createsigil
-        }
-        if choice in actions:
-            actions[choice]()
-        else:
-            colored_print("Invalid selection.")
+            return None
+        if choice in MENU_CHOICES:
+            return MENU_CHOICES[choice]
+        colored_print("Invalid selection.")
 
 # Tarot Deck
+def card_box(text):
+    return f"+{'-' * (len(text) + 2)}+\n| {text} |\n+{'-' * (len(text) + 2)}+"
+
+class Card:
+    # Display strings, meanings and boxes are indexed by is_reversed
+    __slots__ = ('id', 'name', 'displays', 'meanings', 'boxes')
+
+    def __init__(self, id, symbol, name, upright, reversed):
+        self.id, self.name = id, name
+        self.displays = (f"{symbol} - {name}", f"{symbol} - {name} (Reversed)")
+        self.meanings = (upright, reversed)
+        self.boxes = tuple(card_box(display) for display in self.displays)
+
+def card_record(position, card, is_reversed):
+    return {'position': position, 'card': card.name, 'reversed': bool(is_reversed),
+            'display': card.displays[is_reversed], 'meaning': card.meanings[is_reversed]}
+
+def card_text(record):
+    return f"{record['position']}: {record['display']}: {record['meaning']}" if record['position'] else f"{record['display']}: {record['meaning']}"
+
+def build_deck(symbols, data):
+    return tuple(Card(i, symbol, name, upright, reversed)
+                 for i, (symbol, (name, upright, reversed)) in enumerate(zip(symbols, data)))
+
+TAROT_DATA = (
+    ("The Fool", "Beginnings, innocence", "Recklessness, naivety"),
+    ("The Magician", "Manifestation, skill", "Manipulation, untapped potential"),
+    ("The High Priestess", "Intuition, mystery", "Secrets, disconnection"),
+    ("The Empress", "Fertility, nurturing", "Dependence, smothering"),
+    ("The Emperor", "Authority, structure", "Tyranny, rigidity"),
+    ("The Hierophant", "Tradition, guidance", "Rebellion, nonconformity"),
+    ("The Lovers", "Love, harmony", "Disharmony, imbalance"),
+    ("The Chariot", "Willpower, victory", "Lack of control, obstacles"),
+    ("Strength", "Courage, compassion", "Weakness, insecurity"),
+    ("The Hermit", "Introspection, solitude", "Isolation, loneliness"),
+    ("Wheel of Fortune", "Change, cycles", "Bad luck, resistance"),
+    ("Justice", "Fairness, truth", "Unfairness, dishonesty"),
+    ("The Hanged Man", "Sacrifice, surrender", "Stalling, indecision"),
+    ("Death", "Transformation, endings", "Resistance, stagnation"),
+    ("Temperance", "Balance, patience", "Imbalance, excess"),
+    ("The Devil", "Bondage, materialism", "Detachment, freedom"),
+    ("The Tower", "Upheaval, chaos", "Avoiding disaster, fear"),
+    ("The Star", "Hope, renewal", "Despair, disconnection"),
+    ("The Moon", "Illusion, anxiety", "Clarity, fear release"),
+    ("The Sun", "Joy, success", "Depression, lack of success"),
+    ("Judgement", "Rebirth, awakening", "Self-doubt, refusal"),
+    ("The World", "Completion, harmony", "Incompletion, delay"),
+    ("Ace of Cups", "Love, compassion", "Blocked emotions, emptiness"),
+    ("Two of Cups", "Partnership, unity", "Break-up, disharmony"),
+    ("Three of Cups", "Celebration, friendship", "Overindulgence, isolation"),
+    ("Four of Cups", "Contemplation, apathy", "Withdrawal, missed opportunity"),
+    ("Five of Cups", "Loss, regret", "Recovery, moving on"),
+    ("Six of Cups", "Nostalgia, reunion", "Stuck in past, naivety"),
+    ("Seven of Cups", "Choices, dreams", "Overwhelm, indecision"),
+    ("Eight of Cups", "Abandonment, change", "Indecision, drifting"),
+    ("Nine of Cups", "Satisfaction, gratitude", "Dissatisfaction, materialism"),
+    ("Ten of Cups", "Harmony, family", "Disconnection, conflict"),
+    ("Page of Cups", "Creativity, intuition", "Creative blocks, immaturity"),
+    ("Knight of Cups", "Romance, idealism", "Unrealistic, jealousy"),
+    ("Queen of Cups", "Empathy, nurturing", "Insecurity, codependency"),
+    ("King of Cups", "Emotional balance, diplomacy", "Manipulation, moodiness"),
+    ("Ace of Pentacles", "Prosperity, opportunity", "Lost opportunity, poor planning"),
+    ("Two of Pentacles", "Balance, adaptability", "Disorganization, overwhelm"),
+    ("Three of Pentacles", "Teamwork, skill", "Disharmony, isolation"),
+    ("Four of Pentacles", "Security, control", "Greed, overspending"),
+    ("Five of Pentacles", "Poverty, insecurity", "Recovery, hope"),
+    ("Six of Pentacles", "Generosity, sharing", "Selfishness, debt"),
+    ("Seven of Pentacles", "Patience, investment", "Limited reward, impatience"),
+    ("Eight of Pentacles", "Skill, diligence", "Perfectionism, stagnation"),
+    ("Nine of Pentacles", "Abundance, independence", "Overwork, lack of self-worth"),
+    ("Ten of Pentacles", "Wealth, legacy", "Financial loss, instability"),
+    ("Page of Pentacles", "Opportunity, learning", "Procrastination, failure"),
+    ("Knight of Pentacles", "Hard work, routine", "Boredom, perfectionism"),
+    ("Queen of Pentacles", "Nurturing, practicality", "Work-life imbalance"),
+    ("King of Pentacles", "Wealth, leadership", "Greed, obsession"),
+    ("Ace of Swords", "Clarity, breakthrough", "Confusion, chaos"),
+    ("Two of Swords", "Indecision, stalemate", "Confusion, overload"),
+    ("Three of Swords", "Heartbreak, sorrow", "Healing, optimism"),
+    ("Four of Swords", "Rest, meditation", "Burnout, exhaustion"),
+    ("Five of Swords", "Conflict, tension", "Reconciliation, amends"),
+    ("Six of Swords", "Transition, healing", "Resistance, unfinished business"),
+    ("Seven of Swords", "Deception, strategy", "Self-deceit, exposure"),
+    ("Eight of Swords", "Restriction, fear", "Freedom, self-awareness"),
+    ("Nine of Swords", "Anxiety, despair", "Fear, secrets"),
+    ("Ten of Swords", "Betrayal, ending", "Recovery, resilience"),
+    ("Page of Swords", "Curiosity, ideas", "Haste, all talk"),
+    ("Knight of Swords", "Ambition, action", "Impulsiveness, recklessness"),
+    ("Queen of Swords", "Clarity, independence", "Coldness, manipulation"),
+    ("King of Swords", "Intellect, authority", "Tyranny, abuse"),
+    ("Ace of Wands", "Inspiration, growth", "Lack of direction, delays"),
+    ("Two of Wands", "Planning, progress", "Fear of change, indecision"),
+    ("Three of Wands", "Expansion, foresight", "Delays, lack of vision"),
+    ("Four of Wands", "Celebration, harmony", "Conflict, tension"),
+    ("Five of Wands", "Competition, conflict", "Avoiding conflict, tension"),
+    ("Six of Wands", "Victory, recognition", "Ego, fall from grace"),
+    ("Seven of Wands", "Defense, perseverance", "Exhaustion, giving up"),
+    ("Eight of Wands", "Speed, action", "Delays, frustration"),
+    ("Nine of Wands", "Resilience, courage", "Fatigue, overwhelm"),
+    ("Ten of Wands", "Burden, duty", "Overload, delegation"),
+    ("Page of Wands", "Inspiration, exploration", "Indecision, redirection"),
+    ("Knight of Wands", "Passion, energy", "Haste, scattered"),
+    ("Queen of Wands", "Confidence, courage", "Insecurity, introversion"),
+    ("King of Wands", "Leadership, vision", "Impulsiveness, ruthlessness")
+)
+
+TAROT = build_deck([str(i) for i in range(len(TAROT_DATA))], TAROT_DATA)
+
+SPREADS = {
+    'single': ("Card",),
+    'three-card': ("Past", "Present", "Future"),
+    'celtic-cross': ("Present", "Challenge", "Foundation", "Recent Past", "Crown", "Near Future",
+                     "Self", "Environment", "Hopes and Fears", "Outcome"),
+    'full-deck': None
+}
+SIMULATION_CHUNK = 65536
+
+def draw_card(available, use_reversals, replace, rng):
+    # available holds card ids; without replacement the pick is swapped with the last id and popped, O(1)
+    index = int(rng.integers(len(available)))
+    card_id = available[index]
+    if not replace:
+        available[index] = available[-1]
+        available.pop()
+    return card_id, use_reversals and bool(rng.integers(2))
+
+def draw_many(deck, draws, use_reversals, unlimited, rng):
+    available = list(range(len(deck)))
+    results = []
+    for _ in range(draws):
+        if not unlimited and not available:
+            break
+        card_id, is_reversed = draw_card(available, use_reversals, unlimited, rng)
+        results.append((deck[card_id], is_reversed))
+    return results
+
+def spread_positions(deck, spread):
+    if spread not in SPREADS:
+        raise ValueError(f"Unknown spread: {spread} (choose from {', '.join(SPREADS)})")
+    positions = SPREADS[spread] or tuple(str(i + 1) for i in range(len(deck)))
+    if len(positions) > len(deck):
+        raise ValueError(f"The {spread} spread needs {len(positions)} cards.")
+    return positions
+
+def draw_spread(deck, spread, use_reversals, rng):
+    # Partial Fisher-Yates over card ids: only as many swaps as the spread has positions
+    positions = spread_positions(deck, spread)
+    ids = list(range(len(deck)))
+    for i in range(len(positions)):
+        j = int(rng.integers(i, len(ids)))
+        ids[i], ids[j] = ids[j], ids[i]
+    return [(position, deck[ids[i]], use_reversals and rng.random() < 0.5) for i, position in enumerate(positions)]
+
+def spread_chunk(task):
+    cards, slots, use_reversals, size, seed, index = task
+    rng = seeded_rng(seed, index)
+    offsets = np.arange(slots) * cards
+    ids = np.tile(np.arange(cards, dtype=np.int16), (size, 1))
+    rows = np.arange(size)
+    for i in range(slots):
+        j = rng.integers(i, cards, size=size)
+        picked = ids[rows, j]
+        ids[rows, j] = ids[:, i]
+        ids[:, i] = picked
+    cells = (ids[:, :slots] + offsets).ravel()
+    drawn_counts = np.bincount(cells, minlength=slots * cards)
+    reversed_counts = np.zeros(slots * cards, dtype=np.int64)
+    if use_reversals:
+        flipped = rng.random(size * slots) < 0.5
+        reversed_counts = np.bincount(cells[flipped], minlength=slots * cards)
+    return drawn_counts, reversed_counts
+
+def simulate_spreads(deck, spread, count, use_reversals=False, seed=None, chunk=SIMULATION_CHUNK, workers=1):
+    # Vectorized partial Fisher-Yates over chunks of spreads; returns position x card draw and reversal counts
+    return spread_counts(deck, spread, count, use_reversals, RANDOM.next_seed(seed), chunk, workers)
+
+def spread_counts(deck, spread, count, use_reversals, seed, chunk=SIMULATION_CHUNK, workers=1):
+    # simulate_spreads for a seed already drawn
+    positions = spread_positions(deck, spread)
+    cards, slots = len(deck), len(positions)
+    drawn_counts = np.zeros(slots * cards, dtype=np.int64)
+    reversed_counts = np.zeros(slots * cards, dtype=np.int64)
+    tasks = chunk_tasks(count, chunk, seed, cards, slots, use_reversals)
+    for drawn, flipped in pool_map(spread_chunk, tasks, workers):
+        drawn_counts += drawn
+        reversed_counts += flipped
+    return positions, drawn_counts.reshape(slots, cards), reversed_counts.reshape(slots, cards)
+
+def spread_statistics(deck, spread, count, use_reversals=False, seed=None, workers=1):
+    seed = RANDOM.next_seed(seed)
+    positions, drawn, flipped = spread_counts(deck, spread, count, use_reversals, seed, workers=workers)
+    expected = count / len(deck)
+    chi_square = ((drawn - expected) ** 2 / expected).sum(axis=1)
+    totals = drawn.sum(axis=0)
+    return {
+        'spread': spread, 'spreads': count, 'deck_size': len(deck), 'reversals': use_reversals, 'seed': seed,
+        'positions': [{'position': position, 'chi_square': float(chi), 'degrees_of_freedom': len(deck) - 1,
+                       'most_drawn': deck[int(row.argmax())].name, 'least_drawn': deck[int(row.argmin())].name}
+                      for position, chi, row in zip(positions, chi_square, drawn)],
+        'cards': [{'card': card.name, 'drawn': int(total), 'frequency': float(total / max(count * len(positions), 1)),
+                   'reversed': int(rev)} for card, total, rev in zip(deck, totals, flipped.sum(axis=0))],
+        'position_counts': drawn.tolist(),
+        'reversed_counts': flipped.tolist()
+    }
+
+def show_spread(deck, use_reversals):
+    spread = colored_input(f"Spread ({', '.join(SPREADS)}): ").strip().lower()
+    seed, rng = RANDOM.reading()
+    try:
+        for position, card, is_reversed in draw_spread(deck, spread, use_reversals, rng):
+            colored_print(f"\n{position}:\n{card.boxes[is_reversed]}\nMeaning: {card.meanings[is_reversed]}")
+        colored_print(f"\nSeed: {seed}")
+    except ValueError as e:
+        colored_print(f"Error: {e}")
+
 def tarot():
     clear_terminal()
-    tarot_deck = [
-        f"{i} - {name}" for i, name in enumerate([
-            "The Fool", "The Magician", "The High Priestess", "The Empress", "The Emperor",
-            "The Hierophant", "The Lovers", "The Chariot", "Strength", "The Hermit",
-            "Wheel of Fortune", "Justice", "The Hanged Man", "Death", "Temperance",
-            "The Devil", "The Tower", "The Star", "The Moon", "The Sun", "Judgement",
-            "The World"] + [f"{n} of {suit}" for suit in ["Cups", "Pentacles", "Swords", "Wands"]
-                           for n in ["Ace", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine", "Ten", "Page", "Knight", "Queen", "King"]
-        ])
-    ]
-    
-    tarot_data = [
-        ("The Fool", "Beginnings, innocence", "Recklessness, naivety"),
-        ("The Magician", "Manifestation, skill", "Manipulation, untapped potential"),
-        ("The High Priestess", "Intuition, mystery", "Secrets, disconnection"),
-        ("The Empress", "Fertility, nurturing", "Dependence, smothering"),
-        ("The Emperor", "Authority, structure", "Tyranny, rigidity"),
-        ("The Hierophant", "Tradition, guidance", "Rebellion, nonconformity"),
-        ("The Lovers", "Love, harmony", "Disharmony, imbalance"),
-        ("The Chariot", "Willpower, victory", "Lack of control, obstacles"),
-        ("Strength", "Courage, compassion", "Weakness, insecurity"),
-        ("The Hermit", "Introspection, solitude", "Isolation, loneliness"),
-        ("Wheel of Fortune", "Change, cycles", "Bad luck, resistance"),
-        ("Justice", "Fairness, truth", "Unfairness, dishonesty"),
-        ("The Hanged Man", "Sacrifice, surrender", "Stalling, indecision"),
-        ("Death", "Transformation, endings", "Resistance, stagnation"),
-        ("Temperance", "Balance, patience", "Imbalance, excess"),
-        ("The Devil", "Bondage, materialism", "Detachment, freedom"),
-        ("The Tower", "Upheaval, chaos", "Avoiding disaster, fear"),
-        ("The Star", "Hope, renewal", "Despair, disconnection"),
-        ("The Moon", "Illusion, anxiety", "Clarity, fear release"),
-        ("The Sun", "Joy, success", "Depression, lack of success"),
-        ("Judgement", "Rebirth, awakening", "Self-doubt, refusal"),
-        ("The World", "Completion, harmony", "Incompletion, delay"),
-        ("Ace of Cups", "Love, compassion", "Blocked emotions, emptiness"),
-        ("Two of Cups", "Partnership, unity", "Break-up, disharmony"),
-        ("Three of Cups", "Celebration, friendship", "Overindulgence, isolation"),
-        ("Four of Cups", "Contemplation, apathy", "Withdrawal, missed opportunity"),
-        ("Five of Cups", "Loss, regret", "Recovery, moving on"),
-        ("Six of Cups", "Nostalgia, reunion", "Stuck in past, naivety"),
-        ("Seven of Cups", "Choices, dreams", "Overwhelm, indecision"),
-        ("Eight of Cups", "Abandonment, change", "Indecision, drifting"),
-        ("Nine of Cups", "Satisfaction, gratitude", "Dissatisfaction, materialism"),
-        ("Ten of Cups", "Harmony, family", "Disconnection, conflict"),
-        ("Page of Cups", "Creativity, intuition", "Creative blocks, immaturity"),
-        ("Knight of Cups", "Romance, idealism", "Unrealistic, jealousy"),
-        ("Queen of Cups", "Empathy, nurturing", "Insecurity, codependency"),
-        ("King of Cups", "Emotional balance, diplomacy", "Manipulation, moodiness"),
-        ("Ace of Pentacles", "Prosperity, opportunity", "Lost opportunity, poor planning"),
-        ("Two of Pentacles", "Balance, adaptability", "Disorganization, overwhelm"),
-        ("Three of Pentacles", "Teamwork, skill", "Disharmony, isolation"),
-        ("Four of Pentacles", "Security, control", "Greed, overspending"),
-        ("Five of Pentacles", "Poverty, insecurity", "Recovery, hope"),
-        ("Six of Pentacles", "Generosity, sharing", "Selfishness, debt"),
-        ("Seven of Pentacles", "Patience, investment", "Limited reward, impatience"),
-        ("Eight of Pentacles", "Skill, diligence", "Perfectionism, stagnation"),
-        ("Nine of Pentacles", "Abundance, independence", "Overwork, lack of self-worth"),
-        ("Ten of Pentacles", "Wealth, legacy", "Financial loss, instability"),
-        ("Page of Pentacles", "Opportunity, learning", "Procrastination, failure"),
-        ("Knight of Pentacles", "Hard work, routine", "Boredom, perfectionism"),
-        ("Queen of Pentacles", "Nurturing, practicality", "Work-life imbalance"),
-        ("King of Pentacles", "Wealth, leadership", "Greed, obsession"),
-        ("Ace of Swords", "Clarity, breakthrough", "Confusion, chaos"),
-        ("Two of Swords", "Indecision, stalemate", "Confusion, overload"),
-        ("Three of Swords", "Heartbreak, sorrow", "Healing, optimism"),
-        ("Four of Swords", "Rest, meditation", "Burnout, exhaustion"),
-        ("Five of Swords", "Conflict, tension", "Reconciliation, amends"),
-        ("Six of Swords", "Transition, healing", "Resistance, unfinished business"),
-        ("Seven of Swords", "Deception, strategy", "Self-deceit, exposure"),
-        ("Eight of Swords", "Restriction, fear", "Freedom, self-awareness"),
-        ("Nine of Swords", "Anxiety, despair", "Fear, secrets"),
-        ("Ten of Swords", "Betrayal, ending", "Recovery, resilience"),
-        ("Page of Swords", "Curiosity, ideas", "Haste, all talk"),
-        ("Knight of Swords", "Ambition, action", "Impulsiveness, recklessness"),
-        ("Queen of Swords", "Clarity, independence", "Coldness, manipulation"),
-        ("King of Swords", "Intellect, authority", "Tyranny, abuse"),
-        ("Ace of Wands", "Inspiration, growth", "Lack of direction, delays"),
-        ("Two of Wands", "Planning, progress", "Fear of change, indecision"),
-        ("Three of Wands", "Expansion, foresight", "Delays, lack of vision"),
-        ("Four of Wands", "Celebration, harmony", "Conflict, tension"),
-        ("Five of Wands", "Competition, conflict", "Avoiding conflict, tension"),
-        ("Six of Wands", "Victory, recognition", "Ego, fall from grace"),
-        ("Seven of Wands", "Defense, perseverance", "Exhaustion, giving up"),
-        ("Eight of Wands", "Speed, action", "Delays, frustration"),
-        ("Nine of Wands", "Resilience, courage", "Fatigue, overwhelm"),
-        ("Ten of Wands", "Burden, duty", "Overload, delegation"),
-        ("Page of Wands", "Inspiration, exploration", "Indecision, redirection"),
-        ("Knight of Wands", "Passion, energy", "Haste, scattered"),
-        ("Queen of Wands", "Confidence, courage", "Insecurity, introversion"),
-        ("King of Wands", "Leadership, vision", "Impulsiveness, ruthlessness")
-    ]
-    
-    tarot_meanings = {card: {"upright": up, "reversed": rev} for card, up, rev in tarot_data}
-    
-    def draw_card(available_cards, use_reversals):
-        card_base = random.choice(available_cards)
-        is_reversed = use_reversals and random.choice([True, False])
-        card_display = card_base + " (Reversed)" if is_reversed else card_base
-        name = card_base.split(" - ")[1]
-        meaning = tarot_meanings[name]["reversed"] if is_reversed else tarot_meanings[name]["upright"]
-        return card_display, meaning
-    
     colored_print("\nVirtual Tarot Deck")
     use_reversals = colored_input("\nUse reversals? (Y/N): ").strip().upper() == "Y"
     unlimited_draws = colored_input("\nUnlimited draws? (Y/N): ").strip().upper() == "Y"
-    available_cards = tarot_deck.copy()
-    colored_print("\n[Enter] to draw, [R] to reset, [M] for menu.\n")
+    available_cards = list(range(len(TAROT)))
+    seed, rng = RANDOM.reading()
+    colored_print(f"\nSeed: {seed}")
+    colored_print("\n[Enter] to draw, [S] for a spread, [R] to reset, [M] for menu.\n")
     
     while True:
         command = colored_input().strip().upper()
         if command == 'R':
-            return tarot()
+            return 'tarot'
         if command == "M":
-            return menu()
+            return 'menu'
+        if command == "S":
+            show_spread(TAROT, use_reversals)
+            continue
         if command != '':
             colored_print("Invalid command.")
             continue
         if not unlimited_draws and not available_cards:
             message = "No More Cards to Draw"
-            colored_print(f"+{'-' * (len(message) + 2)}+\n| {message} |\n+{'-' * (len(message) + 2)}+")
+            colored_print(card_box(message))
             continue
-        card_display, meaning = draw_card(available_cards, use_reversals)
-        if not unlimited_draws:
-            base_card = card_display.split(" (")[0]
-            available_cards.remove(base_card)
-        colored_print(f"+{'-' * (len(card_display) + 2)}+\n| {card_display} |\n+{'-' * (len(card_display) + 2)}+")
-        colored_print(f"Meaning: {meaning}")
+        card_id, is_reversed = draw_card(available_cards, use_reversals, unlimited_draws, rng)
+        colored_print(TAROT[card_id].boxes[is_reversed])
+        colored_print(f"Meaning: {TAROT[card_id].meanings[is_reversed]}")
 # Rune Set
+RUNE_GLYPHS = ("ᚠ", "ᚢ", "ᚦ", "ᚨ", "ᚱ", "ᚲ", "ᚷ", "ᚹ", "ᚺ", "ᚾ", "ᛁ", "ᛃ",
+               "ᛇ", "ᛈ", "ᛉ", "ᛋ", "ᛏ", "ᛒ", "ᛖ", "ᛗ", "ᛚ", "ᛜ", "ᛞ", "ᛟ")
+
+RUNES_DATA = (
+    ("Fehu", "Wealth, success", "Loss, greed"),
+    ("Uruz", "Strength, health", "Weakness, obsession"),
+    ("Thurisaz", "Protection, warning", "Danger, compulsion"),
+    ("Ansuz", "Wisdom, communication", "Misunderstanding, delusion"),
+    ("Raidho", "Journey, change", "Crisis, rigidity"),
+    ("Kenaz", "Creativity, vision", "Instability, loss"),
+    ("Gebo", "Generosity, balance", "Greed, dependence"),
+    ("Wunjo", "Joy, harmony", "Sorrow, alienation"),
+    ("Hagalaz", "Challenge, growth", "Disaster, stagnation"),
+    ("Nauthiz", "Need, constraint", "Hardship, deprivation"),
+    ("Isa", "Stillness, focus", "Ego, stagnation"),
+    ("Jera", "Harvest, reward", "Setback, reversal"),
+    ("Eihwaz", "Strength, reliability", "Confusion, dissatisfaction"),
+    ("Perthro", "Mystery, chance", "Addiction, loneliness"),
+    ("Algiz", "Protection, support", "Vulnerability, danger"),
+    ("Sowilo", "Success, vitality", "False goals, gullibility"),
+    ("Tiwaz", "Honor, leadership", "Imbalance, strife"),
+    ("Berkano", "Growth, fertility", "Anxiety, stagnation"),
+    ("Ehwaz", "Progress, movement", "Restlessness, mistrust"),
+    ("Mannaz", "Self, community", "Depression, isolation"),
+    ("Laguz", "Intuition, flow", "Fear, avoidance"),
+    ("Ingwaz", "Fertility, virtue", "Impotence, stagnation"),
+    ("Dagaz", "Awakening, clarity", "Blindness, hopelessness"),
+    ("Othala", "Legacy, prosperity", "Disorder, loss")
+)
+
+RUNES = build_deck(RUNE_GLYPHS, RUNES_DATA)
+
 def runes():
     clear_terminal()
-    runes_set = [
-        f"{r} - {n}" for r, n in [
-            ("ᚠ", "Fehu"), ("ᚢ", "Uruz"), ("ᚦ", "Thurisaz"), ("ᚨ", "Ansuz"), ("ᚱ", "Raidho"),
-            ("ᚲ", "Kenaz"), ("ᚷ", "Gebo"), ("ᚹ", "Wunjo"), ("ᚺ", "Hagalaz"), ("ᚾ", "Nauthiz"),
-            ("ᛁ", "Isa"), ("ᛃ", "Jera"), ("ᛇ", "Eihwaz"), ("ᛈ", "Perthro"), ("ᛉ", "Algiz"),
-            ("ᛋ", "Sowilo"), ("ᛏ", "Tiwaz"), ("ᛒ", "Berkano"), ("ᛖ", "Ehwaz"), ("ᛗ", "Mannaz"),
-            ("ᛚ", "Laguz"), ("ᛜ", "Ingwaz"), ("ᛞ", "Dagaz"), ("ᛟ", "Othala")
-        ]
-    ]
-    
-    runes_data = [
-        ("Fehu", "Wealth, success", "Loss, greed"),
-        ("Uruz", "Strength, health", "Weakness, obsession"),
-        ("Thurisaz", "Protection, warning", "Danger, compulsion"),
-        ("Ansuz", "Wisdom, communication", "Misunderstanding, delusion"),
-        ("Raidho", "Journey, change", "Crisis, rigidity"),
-        ("Kenaz", "Creativity, vision", "Instability, loss"),
-        ("Gebo", "Generosity, balance", "Greed, dependence"),
-        ("Wunjo", "Joy, harmony", "Sorrow, alienation"),
-        ("Hagalaz", "Challenge, growth", "Disaster, stagnation"),
-        ("Nauthiz", "Need, constraint", "Hardship, deprivation"),
-        ("Isa", "Stillness, focus", "Ego, stagnation"),
-        ("Jera", "Harvest, reward", "Setback, reversal"),
-        ("Eihwaz", "Strength, reliability", "Confusion, dissatisfaction"),
-        ("Perthro", "Mystery, chance", "Addiction, loneliness"),
-        ("Algiz", "Protection, support", "Vulnerability, danger"),
-        ("Sowilo", "Success, vitality", "False goals, gullibility"),
-        ("Tiwaz", "Honor, leadership", "Imbalance, strife"),
-        ("Berkano", "Growth, fertility", "Anxiety, stagnation"),
-        ("Ehwaz", "Progress, movement", "Restlessness, mistrust"),
-        ("Mannaz", "Self, community", "Depression, isolation"),
-        ("Laguz", "Intuition, flow", "Fear, avoidance"),
-        ("Ingwaz", "Fertility, virtue", "Impotence, stagnation"),
-        ("Dagaz", "Awakening, clarity", "Blindness, hopelessness"),
-        ("Othala", "Legacy, prosperity", "Disorder, loss")
-    ]
-    
-    runes_meanings = {rune: {"upright": up, "reversed": rev} for rune, up, rev in runes_data}
-    
-    def draw_rune(available_runes, use_reversals):
-        rune_base = random.choice(available_runes)
-        is_reversed = use_reversals and random.choice([True, False])
-        rune_display = rune_base + " (Reversed)" if is_reversed else rune_base
-        name = rune_base.split(" - ")[1]
-        meaning = runes_meanings[name]["reversed"] if is_reversed else runes_meanings[name]["upright"]
-        return rune_display, meaning
-    
     colored_print("\nVirtual Runes Set")
     use_reversals = colored_input("\nUse reversals? (Y/N): ").strip().upper() == "Y"
     unlimited_runes = colored_input("\nUnlimited draws? (Y/N): ").strip().upper() == "Y"
-    available_runes = runes_set.copy()
-    colored_print("\n[Enter] to draw, [R] to reset, [M] for menu.\n")
+    available_runes = list(range(len(RUNES)))
+    seed, rng = RANDOM.reading()
+    colored_print(f"\nSeed: {seed}")
+    colored_print("\n[Enter] to draw, [S] for a spread, [R] to reset, [M] for menu.\n")
     
     while True:
         command = colored_input().strip().upper()
         if command == 'R':
-            return runes()
+            return 'runes'
         if command == "M":
-            return menu()
+            return 'menu'
+        if command == "S":
+            show_spread(RUNES, use_reversals)
+            continue
         if command != '':
             colored_print("Invalid command.")
             continue
         if not unlimited_runes and not available_runes:
             message = "No More Runes to Draw"
-            colored_print(f"+{'-' * (len(message) + 2)}+\n| {message} |\n+{'-' * (len(message) + 2)}+")
+            colored_print(card_box(message))
             continue
-        rune_display, meaning = draw_rune(available_runes, use_reversals)
-        if not unlimited_runes:
-            base_rune = rune_display.split(" (")[0]
-            available_runes.remove(base_rune)
-        colored_print(f"+{'-' * (len(rune_display) + 2)}+\n| {rune_display} |\n+{'-' * (len(rune_display) + 2)}+")
-        colored_print(f"Meaning: {meaning}")
+        rune_id, is_reversed = draw_card(available_runes, use_reversals, unlimited_runes, rng)
+        colored_print(RUNES[rune_id].boxes[is_reversed])
+        colored_print(f"Meaning: {RUNES[rune_id].meanings[is_reversed]}")
 
 # Coin Toss
+BULK_CHUNK_TOSSES = 1 << 24
+
+def toss_coin(rng):
+    return ("Heads", "Tails")[rng.integers(2)]
+
+class CoinStats:
+    # Running counters: O(1) per toss, nothing kept per result
+    def __init__(self):
+        self.heads = self.tails = self.runs = self.streak = 0
+        self.side = None
+        self.longest = {"Heads": 0, "Tails": 0}
+
+    def add(self, result):
+        if result == "Heads":
+            self.heads += 1
+        else:
+            self.tails += 1
+        if result == self.side:
+            self.streak += 1
+        else:
+            self.side, self.streak = result, 1
+            self.runs += 1
+        self.longest[result] = max(self.longest[result], self.streak)
+
+    @property
+    def total(self):
+        return self.heads + self.tails
+
+    def record(self):
+        return {'heads': self.heads, 'tails': self.tails, 'total': self.total, 'runs': self.runs, 'streak': self.streak,
+                'side': self.side, 'longest_heads': self.longest['Heads'], 'longest_tails': self.longest['Tails']}
+
+    def summary(self):
+        total = max(self.total, 1)
+        return (f"Heads: {self.heads/total*100:.2f}% (n={self.heads}), Tails: {self.tails/total*100:.2f}% (n={self.tails}), Total: {self.total}\n"
+                f"Streak: {self.streak} {self.side}, Longest: Heads {self.longest['Heads']} / Tails {self.longest['Tails']}, Runs: {self.runs}")
+
+def coin_chunk(task):
+    # Heads count and run summary of one chunk of packed random bits (1 = Heads)
+    size, seed, index = task
+    bits = np.unpackbits(np.frombuffer(seeded_rng(seed, index).bytes((size + 7) // 8), dtype=np.uint8))[:size]
+    starts = np.concatenate(([0], np.flatnonzero(bits[1:] != bits[:-1]) + 1))
+    lengths = np.diff(np.append(starts, size))
+    sides = bits[starts]
+    longest = {name: int(lengths[sides == value].max(initial=0)) for value, name in ((1, "Heads"), (0, "Tails"))}
+    return int(np.count_nonzero(bits)), len(lengths), int(sides[0]), int(lengths[0]), int(sides[-1]), int(lengths[-1]), longest
+
+def toss_bulk(count, seed=None, chunk=BULK_CHUNK_TOSSES, workers=1):
+    # Flips count coins in chunks, joining the open run across chunk boundaries
+    if count < 0:
+        raise ValueError(f"Number of tosses must be at least 0, not {count}.")
+    seed = RANDOM.next_seed(seed)
+    heads = runs = 0
+    longest = {"Heads": 0, "Tails": 0}
+    side, streak = None, 0
+    for part_heads, part_runs, first_side, first_length, last_side, last_length, part_longest in pool_map(coin_chunk, chunk_tasks(count, chunk, seed), workers):
+        heads += part_heads
+        runs += part_runs
+        if first_side == side:
+            runs -= 1
+            joined = streak + first_length
+            longest[("Tails", "Heads")[side]] = max(longest[("Tails", "Heads")[side]], joined)
+            if part_runs == 1:
+                last_length = joined
+        for name in longest:
+            longest[name] = max(longest[name], part_longest[name])
+        side, streak = last_side, last_length
+    tails = count - heads
+    chi_square = (heads - tails) ** 2 / count if count else 0.0
+    return {"tosses": count, "heads": heads, "tails": tails, "runs": runs,
+            "longest_heads": longest["Heads"], "longest_tails": longest["Tails"],
+            "chi_square": chi_square, "p_value": math.erfc(math.sqrt(chi_square / 2)), "seed": seed}
+
+def bulk_lines(stats):
+    total = max(stats['tosses'], 1)
+    return [f"Heads: {stats['heads']/total*100:.4f}% (n={stats['heads']}), Tails: {stats['tails']/total*100:.4f}% (n={stats['tails']}), Total: {stats['tosses']}",
+            f"Longest run: Heads {stats['longest_heads']} / Tails {stats['longest_tails']}, Runs: {stats['runs']}",
+            f"Chi-square: {stats['chi_square']:.4f} (df 1, p = {stats['p_value']:.4f}), Seed: {stats['seed']}"]
+
 def coin():
     clear_terminal()
-    results_log = []
+    stats = CoinStats()
+    seed, rng = RANDOM.reading()
     colored_print("\nVirtual Coin Toss")
-    colored_print("\n[Enter] to toss, [R] to reset, [M] for menu.\n")
+    colored_print(f"\nSeed: {seed}")
+    colored_print("\n[Enter] to toss, [B] for bulk tosses, [R] to reset, [M] for menu.\n")
     
     while True:
         command = colored_input().strip().upper()
         if command == 'R':
-            return coin()
+            return 'coin'
         if command == "M":
-            return menu()
-        result = random.choice(["Heads", "Tails"])
-        results_log.append(result)
-        total = len(results_log)
-        heads = results_log.count("Heads")
-        tails = total - heads
+            return 'menu'
+        if command == "B":
+            try:
+                count = int(colored_input("Number of tosses: "))
+                start = time.perf_counter()
+                lines = bulk_lines(toss_bulk(count))
+                colored_print("\n".join(lines + [f"({count} tosses in {time.perf_counter() - start:.3f}s)"]))
+            except ValueError as e:
+                colored_print(f"Invalid number: {e}")
+            continue
+        result = toss_coin(rng)
+        stats.add(result)
         colored_print(f"Result: {result}")
-        colored_print(f"Heads: {heads/total*100:.2f}% (n={heads}), Tails: {tails/total*100:.2f}% (n={tails}), Total: {total}")
+        colored_print(stats.summary())
 
 # Dice Set
+DICE_TERM = re.compile(r'^(\d*)d(\d+)(!?)(?:(kh|kl|dh|dl|k)(\d+))?(!?)$')
+LEGACY_DICE = re.compile(r'd(\d+)\((\d+)\)')
+MAX_EXPLOSIONS = 100
+EXPLOSION_CUTOFF = 1e-15
+SHOWN_ROLLS = 50
+FFT_SUPPORT = 4096
+
+class DiceTerm:
+    # count dice with sides faces (sides == 0 for a constant), optionally keeping the highest/lowest keep dice
+    __slots__ = ('sign', 'count', 'sides', 'keep', 'keep_highest', 'explode', 'text')
+
+    def __init__(self, sign, count, sides=0, keep=None, keep_highest=True, explode=False, text=''):
+        self.sign, self.count, self.sides = sign, count, sides
+        self.keep = count if keep is None else keep
+        self.keep_highest, self.explode, self.text = keep_highest, explode, text
+
+def parse_dice(choice):
+    # "3d6+2d8-1", "4d6kh3", "2d20kl1", "5d10dl2", "3d6!" and the older "d6(2),d8(3)"
+    text = LEGACY_DICE.sub(lambda m: f"{m.group(2)}d{m.group(1)}", choice.strip().lower()).replace(',', '+').replace(' ', '')
+    if not text:
+        raise ValueError("Empty dice expression")
+    terms = []
+    for sign, part in re.findall(r'([+-]?)([^+-]*)', text)[:-1]:
+        if not part:
+            raise ValueError(f"Invalid term in {choice!r}")
+        sign = -1 if sign == '-' else 1
+        if part.isdigit():
+            terms.append(DiceTerm(sign, int(part), text=part))
+            continue
+        match = DICE_TERM.match(part)
+        if not match:
+            raise ValueError(f"Invalid dice: {part}")
+        count, sides, bang, mode, amount, bang_after = match.groups()
+        count, sides = int(count or 1), int(sides)
+        if count < 1 or sides < 1:
+            raise ValueError(f"Invalid dice: {part}")
+        explode = bool(bang or bang_after)
+        if explode and sides == 1:
+            raise ValueError(f"A d1 cannot explode: {part}")
+        keep, keep_highest = None, True
+        if mode:
+            amount = int(amount)
+            if amount > count:
+                raise ValueError(f"Cannot keep or drop {amount} of {count} dice: {part}")
+            keep, keep_highest = {'kh': (amount, True), 'k': (amount, True), 'kl': (amount, False),
+                                  'dl': (count - amount, True), 'dh': (count - amount, False)}[mode]
+            if not keep:
+                raise ValueError(f"No dice left to keep: {part}")
+        terms.append(DiceTerm(sign, count, sides, keep, keep_highest, explode, part))
+    return terms
+
+def roll_die_values(term, size, rng):
+    # (size, count) array of die results, exploding dice re-rolled and added on their maximum
+    rolls = rng.integers(1, term.sides + 1, size=(size, term.count))
+    if term.explode:
+        live = rolls == term.sides
+        for _ in range(MAX_EXPLOSIONS):
+            if not live.any():
+                break
+            extra = rng.integers(1, term.sides + 1, size=int(live.sum()))
+            rolls[live] += extra
+            live[live] = extra == term.sides
+    return rolls
+
+def kept_values(term, rolls):
+    if term.keep == term.count:
+        return rolls
+    ordered = np.sort(rolls, axis=-1)
+    return ordered[..., term.count - term.keep:] if term.keep_highest else ordered[..., :term.keep]
+
+def roll_die(term, rng):
+    total = roll = rng.integers(1, term.sides + 1)
+    for _ in range(MAX_EXPLOSIONS if term.explode else 0):
+        if roll != term.sides:
+            break
+        roll = rng.integers(1, term.sides + 1)
+        total += roll
+    return total
+
+def roll_pool(terms, rng):
+    # One roll of every term: [(term, rolls, kept, subtotal)]
+    results = []
+    for term in terms:
+        if not term.sides:
+            results.append((term, [], [], term.sign * term.count))
+            continue
+        rolls = [roll_die(term, rng) for _ in range(term.count)]
+        kept = rolls
+        if term.keep != term.count:
+            ordered = sorted(rolls)
+            kept = ordered[term.count - term.keep:] if term.keep_highest else ordered[:term.keep]
+        results.append((term, rolls, kept, term.sign * sum(kept)))
+    return results
+
+def dice_chunk(task):
+    terms, size, seed, index = task
+    rng = seeded_rng(seed, index)
+    block = np.zeros(size, dtype=np.int64)
+    for term in terms:
+        if term.sides:
+            block += term.sign * kept_values(term, roll_die_values(term, size, rng)).sum(axis=1)
+        else:
+            block += term.sign * term.count
+    return block
+
+def roll_totals(terms, trials, seed=None, chunk=65536, workers=1):
+    # Totals of many independent rolls of the whole expression, vectorized per term
+    chunks = list(pool_map(dice_chunk, chunk_tasks(trials, chunk, RANDOM.next_seed(seed), terms), workers))
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+
+def convolve(a, b):
+    if len(a) + len(b) > FFT_SUPPORT:
+        size = len(a) + len(b) - 1
+        return np.clip(np.fft.irfft(np.fft.rfft(a, size) * np.fft.rfft(b, size), size), 0, None)
+    return np.convolve(a, b)
+
+def convolve_power(pmf, count):
+    # count-fold convolution by repeated squaring
+    result = np.ones(1)
+    while count:
+        if count & 1:
+            result = convolve(result, pmf)
+        count >>= 1
+        if count:
+            pmf = convolve(pmf, pmf)
+    return result
+
+def die_distribution(term):
+    # (lowest value, probabilities) of a single die, exploding dice truncated once the tail is negligible
+    if not term.explode:
+        return 1, np.full(term.sides, 1 / term.sides)
+    probs, chain = [], 1.0
+    for _ in range(MAX_EXPLOSIONS):
+        probs.extend([chain / term.sides] * (term.sides - 1) + [0.0])
+        chain /= term.sides
+        if chain < EXPLOSION_CUTOFF:
+            break
+    return 1, np.array(probs)
+
+def binomial_pmf(n, p, upto):
+    # P(k successes of n) for k < upto
+    if p >= 1:
+        return [1.0 if k == n else 0.0 for k in range(upto)]
+    return [math.exp(math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1) + k * math.log(p) + (n - k) * math.log1p(-p))
+            for k in range(min(upto, n + 1))]
+
+def keep_highest_distribution(count, sides, keep):
+    # Exact sum of the highest keep of count dice. Walk face values downward: the dice not yet placed are uniform
+    # below the current value, so how many show it is binomial; once keep dice are placed the kept sum is final
+    width = keep * sides + 1
+    placing = np.zeros((keep, width))
+    placing[0, 0] = 1.0
+    done = np.zeros(width)
+    for value in range(sides, 0, -1):
+        placed = np.zeros_like(placing)
+        for used in range(keep):
+            row = placing[used]
+            if not row.any():
+                continue
+            pmf = binomial_pmf(count - used, 1 / value, keep - used)
+            for more, p in enumerate(pmf):
+                if p:
+                    shift = more * value
+                    placed[used + more, shift:] += p * row[:width - shift]
+            shift = (keep - used) * value
+            done[shift:] += max(1.0 - sum(pmf), 0.0) * row[:width - shift]
+        placing = placed
+    return keep, done[keep:]
+
+def term_distribution(term):
+    if not term.sides:
+        low, probs = term.count, np.ones(1)
+    elif term.keep == term.count:
+        low, die = die_distribution(term)
+        low, probs = term.count * low, convolve_power(die, term.count)
+    elif term.explode:
+        raise ValueError(f"No exact distribution for exploding dice with keep/drop: {term.text}")
+    else:
+        low, probs = keep_highest_distribution(term.count, term.sides, term.keep)
+        if not term.keep_highest:
+            # Lowest dice are the highest of the mirrored faces sides + 1 - v
+            low, probs = term.keep * (term.sides + 1) - (low + len(probs) - 1), probs[::-1]
+    if term.sign < 0:
+        low, probs = -(low + len(probs) - 1), probs[::-1]
+    return low, probs
+
+def dice_distribution(terms):
+    # Exact outcome distribution of the whole expression: (lowest total, probabilities)
+    low, probs = 0, np.ones(1)
+    for term in terms:
+        term_low, term_probs = term_distribution(term)
+        low, probs = low + term_low, convolve(probs, term_probs)
+    return low, probs / probs.sum()
+
+def distribution_stats(low, probs):
+    values = np.arange(low, low + len(probs))
+    mean = float((values * probs).sum())
+    cumulative = np.cumsum(probs)
+    return {'mean': mean, 'std_dev': math.sqrt(max(float(((values - mean) ** 2 * probs).sum()), 0.0)),
+            'lowest': low, 'highest': low + len(probs) - 1, 'most_likely': int(values[probs.argmax()]),
+            'percentiles': {p: int(values[min(np.searchsorted(cumulative, p / 100), len(values) - 1)]) for p in (5, 25, 50, 75, 95)}}
+
+def stats_summary(stats):
+    return (f"Mean: {stats['mean']:.3f}, Std Dev: {stats['std_dev']:.3f}, Range: {stats['lowest']}-{stats['highest']}, Most likely: {stats['most_likely']}\n"
+            f"Percentiles: " + ", ".join(f"{p}%: {v}" for p, v in stats['percentiles'].items()))
+
+def distribution_summary(low, probs):
+    return stats_summary(distribution_stats(low, probs))
+
+def roll_record(term, rolls, kept, subtotal):
+    return {'term': term.text, 'rolls': rolls, 'kept': kept, 'total': subtotal}
+
+def describe_roll(term, rolls, kept, subtotal):
+    if not term.sides:
+        return f"{'-' if term.sign < 0 else '+'}{term.count}"
+    shown = rolls if len(rolls) <= SHOWN_ROLLS else f"[{len(rolls)} dice]"
+    kept_text = f" kept {kept}" if term.keep != term.count and len(kept) <= SHOWN_ROLLS else ""
+    return f"{'-' if term.sign < 0 else ''}{term.count} x d{term.sides}{'!' if term.explode else ''}: {shown}{kept_text} (Total: {subtotal})"
+
 def dice():
     clear_terminal()
     total_sum = 0
-    valid_dice = {'d4': 4, 'd6': 6, 'd8': 8, 'd10': 10, 'd12': 12, 'd20': 20}
+    dice_selection = None
     
-    def roll_dice(dice_selection):
-        nonlocal total_sum
+    while True:
+        if dice_selection is None:
+            colored_print("\nVirtual Dice Set")
+            colored_print("\nChoose dice (e.g., 3d6+2, 4d6kh3, 2d20kl1, 3d6!, d6(2),d8(3)) or [M] for menu.")
+            while dice_selection is None:
+                choice = colored_input().strip().lower()
+                if choice == 'm':
+                    return 'menu'
+                try:
+                    dice_selection = parse_dice(choice)
+                except ValueError as e:
+                    colored_print(f"Invalid format: {e}")
+            total_sum = 0
+        
         roll_total = 0
-        for sides, count in dice_selection:
-            rolls = [random.randint(1, sides) for _ in range(count)]
-            roll_total += sum(rolls)
-            colored_print(f"{count} x d{sides}: {rolls} (Total: {sum(rolls)})")
+        seed, rng = RANDOM.reading()
+        for term, rolls, kept, subtotal in roll_pool(dice_selection, rng):
+            roll_total += subtotal
+            colored_print(describe_roll(term, rolls, kept, subtotal))
         total_sum += roll_total
-        colored_print(f"Overall Total: {total_sum}")
-        colored_print("\n[Enter] to roll, [R] to change dice, [M] for menu.")
+        colored_print(f"Overall Total: {total_sum} (Seed: {seed})")
+        colored_print("\n[Enter] to roll, [P] for probabilities, [R] to change dice, [M] for menu.")
         
         while True:
             command = colored_input().strip().upper()
+            if command == 'P':
+                try:
+                    colored_print(distribution_summary(*dice_distribution(dice_selection)))
+                except ValueError as e:
+                    colored_print(f"Error: {e}")
+                continue
             if command == 'R':
                 clear_terminal()
-                return choose_dice()
+                dice_selection = None
+                break
             if command == 'M':
-                return menu()
+                return 'menu'
             if command == '':
-                return roll_dice(dice_selection)
+                break
             colored_print("Invalid command.")
-    
-    def choose_dice():
-        nonlocal total_sum
-        total_sum = 0
-        colored_print("\nVirtual Dice Set")
-        colored_print("\nChoose dice (e.g., d6(2),d8(3)) or [M] for menu.")
-        
-        while True:
-            choice = colored_input().strip().lower()
-            if choice == 'm':
-                return menu()
-            try:
-                dice_selection = []
-                for part in choice.split(','):
-                    part = part.strip()
-                    dice_type, count = part.split('(')
-                    if dice_type not in valid_dice:
-                        raise ValueError(f"Invalid dice: {dice_type}")
-                    count = int(count[:-1])
-                    dice_selection.append((valid_dice[dice_type], count))
-                return roll_dice(dice_selection)
-            except ValueError as e:
-                colored_print(f"Invalid format: {e}")
-    
-    choose_dice()
 
 # I-Ching
-def iching():
-    clear_terminal()
-    hexagram_meanings = {
-    '111111': '1. 乾 Qián - The Creative - Strong action, leadership, and creative power.',
-    '000000': '2. 坤 Kūn - The Receptive - Yielding, nurturing, and devotion.',
-    '100010': '3. 屯 Zhūn - Difficulty at the Beginning - Initial challenges, growth through perseverance.',
-    '010001': '4. 蒙 Méng - Youthful Folly - Inexperience, learning through mistakes.',
-    '111010': '5. 需 Xū - Waiting - Patience, timing, and preparation.',
-    '010111': '6. 訟 Sòng - Conflict - Disagreement, seeking resolution.',
-    '010000': '7. 師 Shī - The Army - Discipline, organization, and collective effort.',
-    '000010': '8. 比 Bǐ - Holding Together - Union, cooperation, and support.',
-    '111011': '9. 小畜 Xiǎo Chù - Small Taming - Gentle influence, small steps toward progress.',
-    '110111': '10. 履 Lǚ - Treading - Caution, careful progress, and respect.',
-    '111000': '11. 泰 Tài - Peace - Harmony, balance, and prosperity.',
-    '000111': '12. 否 Pǐ - Standstill - Stagnation, lack of progress, and disconnection.',
-    '101111': '13. 同人 Tóng Rén - Fellowship - Community, shared goals, and cooperation.',
-    '111101': '14. 大有 Dà Yǒu - Great Possession - Abundance, responsibility, and wealth.',
-    '001000': '15. 謙 Qiān - Modesty - Humility, simplicity, and balance.',
-    '000100': '16. 豫 Yù - Enthusiasm - Joy, inspiration, and collective action.',
-    '100110': '17. 隨 Suí - Following - Adaptation, following the flow, and flexibility.',
-    '011001': '18. 蠱 Gǔ - Work on the Decayed - Repair, renewal, and addressing neglect.',
-    '110000': '19. 臨 Lín - Approach - Nearing, preparation, and anticipation.',
-    '000011': '20. 觀 Guān - Contemplation - Observation, reflection, and insight.',
-    '100101': '21. 噬嗑 Shì Kè - Biting Through - Determination, overcoming obstacles.',
-    '101001': '22. 賁 Bì - Grace - Beauty, elegance, and refinement.',
-    '000001': '23. 剝 Bō - Splitting Apart - Decay, collapse, and letting go.',
-    '100000': '24. 復 Fù - Return - Renewal, turning point, and new beginnings.',
-    '100111': '25. 無妄 Wú Wàng - Innocence - Spontaneity, purity, and natural action.',
-    '111001': '26. 大畜 Dà Chù - Great Taming - Restraint, potential, and controlled power.',
-    '100001': '27. 頤 Yí - Nourishment - Sustenance, self-care, and growth.',
-    '011110': '28. 大過 Dà Guò - Preponderance of the Great - Excess, critical point, and transition.',
-    '010010': '29. 坎 Kǎn - The Abysmal - Danger, depth, and navigating challenges.',
-    '101101': '30. 離 Lí - The Clinging - Brightness, clarity, and dependence.',
-    '001110': '31. 咸 Xián - Influence - Attraction, influence, and mutual response.',
-    '011100': '32. 恆 Héng - Duration - Perseverance, commitment, and stability.',
-    '001111': '33. 遯 Dùn - Retreat - Withdrawal, strategic retreat, and conservation.',
-    '111100': '34. 大壯 Dà Zhuàng - Great Power - Strength, assertiveness, and responsibility.',
-    '000101': '35. 晉 Jìn - Progress - Advancement, growth, and flourishing.',
-    '101000': '36. 明夷 Míng Yí - Darkening of the Light - Concealment, endurance, and inner light.',
-    '101011': '37. 家人 Jiā Rén - The Family - Roles, relationships, and harmony at home.',
-    '110101': '38. 睽 Kuí - Opposition - Contrast, tension, and misunderstanding.',
-    '001010': '39. 蹇 Jiǎn - Obstruction - Obstacles, difficulty, and turning back.',
-    '010100': '40. 解 Xiè - Deliverance - Release, forgiveness, and moving forward.',
-    '110001': '41. 損 Sǔn - Decrease - Reduction, simplification, and lessening.',
-    '100011': '42. 益 Yì - Increase - Growth, expansion, and augmentation.',
-    '111110': '43. 夬 Guài - Breakthrough - Resolution, determination, and decisive action.',
-    '011111': '44. 姤 Gòu - Coming to Meet - Encounter, temptation, and caution.',
-    '000110': '45. 萃 Cuì - Gathering Together - Assembly, unity, and collective power.',
-    '011000': '46. 升 Shēng - Pushing Upward - Effort, gradual progress, and ascent.',
-    '010110': '47. 困 Kùn - Oppression - Exhaustion, adversity, and resilience.',
-    '011010': '48. 井 Jǐng - The Well - Resources, sustenance, and community support.',
-    '101110': '49. 革 Gé - Revolution - Change, transformation, and renewal.',
-    '011101': '50. 鼎 Dǐng - The Cauldron - Nourishment, alchemy, and transformation.',
-    '100100': '51. 震 Zhèn - The Arousing - Shock, awakening, and sudden change.',
-    '001001': '52. 艮 Gèn - Keeping Still - Stillness, meditation, and inner peace.',
-    '011011': '53. 漸 Jiàn - Development - Gradual progress, patience, and growth.',
-    '100110': '54. 歸妹 Guī Mèi - The Marrying Maiden - Subordination, secondary roles, and caution.',
-    '101100': '55. 豐 Fēng - Abundance - Fullness, prosperity, and peak moments.',
-    '001101': '56. 旅 Lǚ - The Wanderer - Travel, transience, and adaptability.',
-    '011011': '57. 巽 Xùn - The Gentle - Penetration, persistence, and subtle influence.',
-    '110110': '58. 兌 Duì - The Joyous - Joy, pleasure, and open communication.',
-    '011010': '59. 渙 Huàn - Dispersion - Dissolution, spreading, and reuniting.',
-    '010110': '60. 節 Jié - Limitation - Boundaries, discipline, and moderation.',
-    '110011': '61. 中孚 Zhōng Fú - Inner Truth - Sincerity, insight, and inner knowing.',
-    '001100': '62. 小過 Xiǎo Guò - Small Preponderance - Attention to detail, caution, and small steps.',
-    '101010': '63. 既濟 Jì Jì - After Completion - Completion, balance, and vigilance.',
-    '010101': '64. 未濟 Wèi Jì - Before Completion - Transition, potential, and preparation.'
-    }
-    trigrams = {
-        '111': 'Heaven (Qian) - Creative, Strong',
-        '110': 'Lake (Dui) - Joyous, Open',
-        '101': 'Fire (Li) - Clinging, Bright',
-        '100': 'Thunder (Zhen) - Arousing, Active',
-        '011': 'Wind (Xun) - Gentle, Penetrating',
-        '010': 'Water (Kan) - Abysmal, Dangerous',
-        '001': 'Mountain (Gen) - Still, Resting',
-        '000': 'Earth (Kun) - Receptive, Yielding'
-    }
-    
-    line_values = {
-        6: "Broken (changing yin)",
-        7: "Solid (static yang)",
-        8: "Broken (static yin)",
-        9: "Solid (changing yang)"
-    }    
+# Binaries read bottom line first; line 1 is bit 0 of the hexagram number
+HEXAGRAM_DATA = (
+    ('111111', '1. 乾 Qián - The Creative - Strong action, leadership, and creative power.'),
+    ('000000', '2. 坤 Kūn - The Receptive - Yielding, nurturing, and devotion.'),
+    ('100010', '3. 屯 Zhūn - Difficulty at the Beginning - Initial challenges, growth through perseverance.'),
+    ('010001', '4. 蒙 Méng - Youthful Folly - Inexperience, learning through mistakes.'),
+    ('111010', '5. 需 Xū - Waiting - Patience, timing, and preparation.'),
+    ('010111', '6. 訟 Sòng - Conflict - Disagreement, seeking resolution.'),
+    ('010000', '7. 師 Shī - The Army - Discipline, organization, and collective effort.'),
+    ('000010', '8. 比 Bǐ - Holding Together - Union, cooperation, and support.'),
+    ('111011', '9. 小畜 Xiǎo Chù - Small Taming - Gentle influence, small steps toward progress.'),
+    ('110111', '10. 履 Lǚ - Treading - Caution, careful progress, and respect.'),
+    ('111000', '11. 泰 Tài - Peace - Harmony, balance, and prosperity.'),
+    ('000111', '12. 否 Pǐ - Standstill - Stagnation, lack of progress, and disconnection.'),
+    ('101111', '13. 同人 Tóng Rén - Fellowship - Community, shared goals, and cooperation.'),
+    ('111101', '14. 大有 Dà Yǒu - Great Possession - Abundance, responsibility, and wealth.'),
+    ('001000', '15. 謙 Qiān - Modesty - Humility, simplicity, and balance.'),
+    ('000100', '16. 豫 Yù - Enthusiasm - Joy, inspiration, and collective action.'),
+    ('100110', '17. 隨 Suí - Following - Adaptation, following the flow, and flexibility.'),
+    ('011001', '18. 蠱 Gǔ - Work on the Decayed - Repair, renewal, and addressing neglect.'),
+    ('110000', '19. 臨 Lín - Approach - Nearing, preparation, and anticipation.'),
+    ('000011', '20. 觀 Guān - Contemplation - Observation, reflection, and insight.'),
+    ('100101', '21. 噬嗑 Shì Kè - Biting Through - Determination, overcoming obstacles.'),
+    ('101001', '22. 賁 Bì - Grace - Beauty, elegance, and refinement.'),
+    ('000001', '23. 剝 Bō - Splitting Apart - Decay, collapse, and letting go.'),
+    ('100000', '24. 復 Fù - Return - Renewal, turning point, and new beginnings.'),
+    ('100111', '25. 無妄 Wú Wàng - Innocence - Spontaneity, purity, and natural action.'),
+    ('111001', '26. 大畜 Dà Chù - Great Taming - Restraint, potential, and controlled power.'),
+    ('100001', '27. 頤 Yí - Nourishment - Sustenance, self-care, and growth.'),
+    ('011110', '28. 大過 Dà Guò - Preponderance of the Great - Excess, critical point, and transition.'),
+    ('010010', '29. 坎 Kǎn - The Abysmal - Danger, depth, and navigating challenges.'),
+    ('101101', '30. 離 Lí - The Clinging - Brightness, clarity, and dependence.'),
+    ('001110', '31. 咸 Xián - Influence - Attraction, influence, and mutual response.'),
+    ('011100', '32. 恆 Héng - Duration - Perseverance, commitment, and stability.'),
+    ('001111', '33. 遯 Dùn - Retreat - Withdrawal, strategic retreat, and conservation.'),
+    ('111100', '34. 大壯 Dà Zhuàng - Great Power - Strength, assertiveness, and responsibility.'),
+    ('000101', '35. 晉 Jìn - Progress - Advancement, growth, and flourishing.'),
+    ('101000', '36. 明夷 Míng Yí - Darkening of the Light - Concealment, endurance, and inner light.'),
+    ('101011', '37. 家人 Jiā Rén - The Family - Roles, relationships, and harmony at home.'),
+    ('110101', '38. 睽 Kuí - Opposition - Contrast, tension, and misunderstanding.'),
+    ('001010', '39. 蹇 Jiǎn - Obstruction - Obstacles, difficulty, and turning back.'),
+    ('010100', '40. 解 Xiè - Deliverance - Release, forgiveness, and moving forward.'),
+    ('110001', '41. 損 Sǔn - Decrease - Reduction, simplification, and lessening.'),
+    ('100011', '42. 益 Yì - Increase - Growth, expansion, and augmentation.'),
+    ('111110', '43. 夬 Guài - Breakthrough - Resolution, determination, and decisive action.'),
+    ('011111', '44. 姤 Gòu - Coming to Meet - Encounter, temptation, and caution.'),
+    ('000110', '45. 萃 Cuì - Gathering Together - Assembly, unity, and collective power.'),
+    ('011000', '46. 升 Shēng - Pushing Upward - Effort, gradual progress, and ascent.'),
+    ('010110', '47. 困 Kùn - Oppression - Exhaustion, adversity, and resilience.'),
+    ('011010', '48. 井 Jǐng - The Well - Resources, sustenance, and community support.'),
+    ('101110', '49. 革 Gé - Revolution - Change, transformation, and renewal.'),
+    ('011101', '50. 鼎 Dǐng - The Cauldron - Nourishment, alchemy, and transformation.'),
+    ('100100', '51. 震 Zhèn - The Arousing - Shock, awakening, and sudden change.'),
+    ('001001', '52. 艮 Gèn - Keeping Still - Stillness, meditation, and inner peace.'),
+    ('001011', '53. 漸 Jiàn - Development - Gradual progress, patience, and growth.'),
+    ('110100', '54. 歸妹 Guī Mèi - The Marrying Maiden - Subordination, secondary roles, and caution.'),
+    ('101100', '55. 豐 Fēng - Abundance - Fullness, prosperity, and peak moments.'),
+    ('001101', '56. 旅 Lǚ - The Wanderer - Travel, transience, and adaptability.'),
+    ('011011', '57. 巽 Xùn - The Gentle - Penetration, persistence, and subtle influence.'),
+    ('110110', '58. 兌 Duì - The Joyous - Joy, pleasure, and open communication.'),
+    ('010011', '59. 渙 Huàn - Dispersion - Dissolution, spreading, and reuniting.'),
+    ('110010', '60. 節 Jié - Limitation - Boundaries, discipline, and moderation.'),
+    ('110011', '61. 中孚 Zhōng Fú - Inner Truth - Sincerity, insight, and inner knowing.'),
+    ('001100', '62. 小過 Xiǎo Guò - Small Preponderance - Attention to detail, caution, and small steps.'),
+    ('101010', '63. 既濟 Jì Jì - After Completion - Completion, balance, and vigilance.'),
+    ('010101', '64. 未濟 Wèi Jì - Before Completion - Transition, potential, and preparation.'),
+)
+TRIGRAM_DATA = (
+    ('111', 'Heaven (Qian) - Creative, Strong'),
+    ('110', 'Lake (Dui) - Joyous, Open'),
+    ('101', 'Fire (Li) - Clinging, Bright'),
+    ('100', 'Thunder (Zhen) - Arousing, Active'),
+    ('011', 'Wind (Xun) - Gentle, Penetrating'),
+    ('010', 'Water (Kan) - Abysmal, Dangerous'),
+    ('001', 'Mountain (Gen) - Still, Resting'),
+    ('000', 'Earth (Kun) - Receptive, Yielding')
+)
 
+def line_bits(binary):
+    return int(binary[::-1], 2)
+
+def binary_lines(bits, width=6):
+    return ''.join('1' if bits >> i & 1 else '0' for i in range(width))
+
+# 64-slot tables indexed by the 6-bit hexagram number, trigrams by 3-bit number
+# (lower trigram = bits & 7, upper = bits >> 3)
+HEXAGRAMS = [None] * 64
+KING_WEN = [0] * 64
+KING_WEN_BITS = [0] * 64
+for number, (binary, meaning) in enumerate(HEXAGRAM_DATA, 1):
+    HEXAGRAMS[line_bits(binary)] = meaning
+    KING_WEN[line_bits(binary)] = number
+    KING_WEN_BITS[number - 1] = line_bits(binary)
+TRIGRAMS = [None] * 8
+for binary, meaning in TRIGRAM_DATA:
+    TRIGRAMS[line_bits(binary)] = meaning
+
+LINE_ASCII = {6: "-- --x", 7: "-----", 8: "-- --", 9: "-----o"}
+SECONDARY_ASCII = {7: "-----", 8: "-- --"}
+# Probabilities of line values 6, 7, 8, 9
+CASTING_METHODS = {
+    'coins': (1/8, 3/8, 3/8, 1/8),
+    'yarrow': (1/16, 5/16, 7/16, 3/16)
+}
+CAST_CHUNK = 1 << 20
+
+def get_ascii(line, is_primary=True):
+    return (LINE_ASCII if is_primary else SECONDARY_ASCII).get(line, "Invalid")
+
+def toss_line(rng):
+    numbers = [2 + rng.integers(2) for _ in range(3)]
+    return numbers, sum(numbers)
+
+def hexagram_pair(lines):
+    # Primary and secondary hexagram numbers of six line values, line 1 first
+    primary = sum(1 << i for i, line in enumerate(lines) if line in (7, 9))
+    changing = sum(1 << i for i, line in enumerate(lines) if line in (6, 9))
+    return primary, primary ^ changing
+
+def cast_block(method, size, seed, index):
+    # Every method's odds are sixteenths: map a uniform 0..15 straight to yang and changing bits
+    values = np.repeat([6, 7, 8, 9], np.round(np.array(CASTING_METHODS[method]) * 16).astype(int))
+    yang, changing = np.isin(values, (7, 9)), np.isin(values, (6, 9))
+    draws = seeded_rng(seed, index).integers(0, 16, size=(size, 6), dtype=np.uint8)
+    primary = np.packbits(yang[draws], axis=1, bitorder='little')[:, 0]
+    return primary, primary ^ np.packbits(changing[draws], axis=1, bitorder='little')[:, 0]
+
+def cast_hexagrams(count, method='coins', seed=None, chunk=CAST_CHUNK):
+    # Vectorized casts: yields (primary, secondary) uint8 arrays of at most chunk casts each
+    check_casts(count)
+    for task in chunk_tasks(count, chunk, RANDOM.next_seed(seed), method):
+        yield cast_block(*task)
+
+def cast_chunk(task):
+    primary, secondary = cast_block(*task)
+    return np.bincount(primary.astype(np.int64) * 64 + secondary, minlength=64 * 64)
+
+def line_matrix(method):
+    # Per-line 2x2 matrix, rows yin/yang now, columns yin/yang after changes
+    six, seven, eight, nine = CASTING_METHODS[method]
+    return np.array([[eight / (six + eight), six / (six + eight)],
+                     [nine / (seven + nine), seven / (seven + nine)]])
+
+def transition_matrix(method='coins'):
+    # Exact P(secondary | primary) for all 64 x 64 pairs as a Kronecker product of the six line matrices
+    matrix = np.ones((1, 1))
+    for _ in range(6):
+        matrix = np.kron(line_matrix(method), matrix)
+    return matrix
+
+def primary_probabilities(method='coins'):
+    six, seven, eight, nine = CASTING_METHODS[method]
+    probabilities = np.ones(1)
+    for _ in range(6):
+        probabilities = np.kron([six + eight, seven + nine], probabilities)
+    return probabilities
+
+def check_casts(count):
+    if count < 1:
+        raise ValueError(f"Number of casts must be at least 1, not {count}.")
+
+def cast_statistics(count, method='coins', seed=None, workers=1):
+    check_casts(count)
+    pairs = np.zeros(64 * 64, dtype=np.int64)
+    for counts in pool_map(cast_chunk, chunk_tasks(count, CAST_CHUNK, RANDOM.next_seed(seed), method), workers):
+        pairs += counts
+    return pairs.reshape(64, 64)
+
+def cast_summary(pairs, method, top=5):
+    count = int(pairs.sum())
+    expected = primary_probabilities(method)[:, None] * transition_matrix(method)
+    summary = {'casts': count, 'method': method, 'changing': float(1 - np.trace(pairs) / count),
+               'exact_changing': float(1 - np.trace(expected)), 'top': []}
+    for flat in np.argsort(pairs, axis=None)[::-1][:top]:
+        primary, secondary = divmod(int(flat), 64)
+        summary['top'].append({'primary': KING_WEN[primary], 'secondary': KING_WEN[secondary],
+                               'frequency': float(pairs[primary, secondary] / count), 'exact': float(expected[primary, secondary])})
+    return summary
+
+def cast_lines(summary):
+    lines = [f"{summary['casts']} casts ({summary['method']}), {summary['changing']:.2%} with changing lines (exact {summary['exact_changing']:.2%})"]
+    for pair in summary['top']:
+        lines.append(f"  {pair['primary']:>2} -> {pair['secondary']:>2}: {pair['frequency']:.4%} (exact {pair['exact']:.4%})")
+    return lines
+
+def hexagram_record(lines):
+    primary, secondary = hexagram_pair(lines)
+    return {'lines': lines, 'primary': KING_WEN[primary], 'secondary': KING_WEN[secondary],
+            'primary_meaning': HEXAGRAMS[primary], 'secondary_meaning': HEXAGRAMS[secondary]}
+
+def hexagram_report(lines):
+    primary, secondary = hexagram_pair(lines)
+    secondary_lines = [7 if line == 6 else 8 if line == 9 else line for line in lines]
     
-    def get_ascii(line, is_primary=True):
-        if is_primary:
-            return {
-                6: "-- --x", 7: "-----", 8: "-- --", 9: "-----o"
-            }.get(line, "Invalid")
-        return {7: "-----", 8: "-- --"}.get(line, "Invalid")
-    
+    report = []
+    hexagrams = [("Primary", primary, [get_ascii(line) for line in lines])]
+    if secondary != primary:
+        hexagrams.append(("Secondary", secondary, [get_ascii(line, False) for line in secondary_lines]))
+    for title, bits, ascii_lines in hexagrams:
+        report.append(f"\n{title} Hexagram:")
+        for i in range(5, -1, -1):
+            report.append(f"Line {i+1}: {ascii_lines[i]}")
+        report.append(f"Binary: {binary_lines(bits)}")
+        report.append(f"Meaning: {HEXAGRAMS[bits]}")
+        report.append(f"\nComposed of:")
+        report.append(f"  Lower trigram: {TRIGRAMS[bits & 7]}")
+        report.append(f"  Upper trigram: {TRIGRAMS[bits >> 3]}")
+    if secondary == primary:
+        report.append("\nNo secondary hexagram (no changing lines).")
+    return report
+
+def iching():
+    clear_terminal()
     colored_print("\nVirtual I-Ching")
     while True:
-        colored_print("\n[Enter] to start, [R] to reset, [M] for menu.")
+        colored_print("\n[Enter] to start, [B] for bulk casting, [R] to reset, [M] for menu.")
         command = colored_input().strip().upper()
         if command == 'R':
-            return iching()
+            return 'iching'
+        if command == 'B':
+            try:
+                count = int(colored_input("Number of casts: "))
+                check_casts(count)
+                method = colored_input("Method ([C]oins or [Y]arrow): ").strip().upper()
+                method = 'yarrow' if method == 'Y' else 'coins'
+            except ValueError as e:
+                colored_print(f"Invalid count: {e}")
+                continue
+            start = time.perf_counter()
+            seed = RANDOM.next_seed()
+            pairs = cast_statistics(count, method, seed)
+            for line in cast_lines(cast_summary(pairs, method)):
+                colored_print(line)
+            colored_print(f"Cast in {time.perf_counter() - start:.2f}s (Seed: {seed})")
+            continue
         if command == 'M':
-            return menu()
+            return 'menu'
         if command != '':
             colored_print("Invalid command.")
             continue
         
         lines = []
+        seed, rng = RANDOM.reading()
         for i in range(1, 7):
             colored_print(f"\nLine {i}:")
             colored_input(f"Press Enter to toss coins for line {i}...")
-            numbers = [random.choice([2, 3]) for _ in range(3)]
-            line_sum = sum(numbers)
+            numbers, line_sum = toss_line(rng)
             coin_display = " + ".join(["Heads (3)" if n == 3 else "Tails (2)" for n in numbers])
             colored_print(f"Result: {coin_display} = {line_sum}")
             lines.append(line_sum)
         
-        primary_ascii = [get_ascii(line) for line in lines]
-        changing_lines = [i+1 for i, line in enumerate(lines) if line in [6, 9]]
-        secondary_lines = [7 if line == 6 else 8 if line == 9 else line for line in lines]
-        secondary_ascii = [get_ascii(line, False) for line in secondary_lines] if changing_lines else []
-        
-        primary_binary = ''.join('1' if line in [7, 9] else '0' for line in lines)
-        colored_print("\nPrimary Hexagram:")
-        for i in range(5, -1, -1):
-            colored_print(f"Line {i+1}: {primary_ascii[i]}")
-        colored_print(f"Binary: {primary_binary}")
-        colored_print(f"Meaning: {hexagram_meanings.get(primary_binary, 'Unknown')}")
-        colored_print(f"\nComposed of:")
-        colored_print(f"  Lower trigram: {trigrams.get(primary_binary[:3], 'Unknown')}")
-        colored_print(f"  Upper trigram: {trigrams.get(primary_binary[3:], 'Unknown')}")
-        
-        if secondary_ascii:
-            secondary_binary = ''.join('1' if line in [7, 9] else '0' for line in secondary_lines)
-            colored_print("\nSecondary Hexagram:")
-            for i in range(5, -1, -1):
-                colored_print(f"Line {i+1}: {secondary_ascii[i]}")
-            colored_print(f"Binary: {secondary_binary}")
-            colored_print(f"Meaning: {hexagram_meanings.get(secondary_binary, 'Unknown')}")
-            colored_print(f"\nComposed of:")
-            colored_print(f"  Lower trigram: {trigrams.get(secondary_binary[:3], 'Unknown')}")
-            colored_print(f"  Upper trigram: {trigrams.get(secondary_binary[3:], 'Unknown')}")
-        else:
-            colored_print("\nNo secondary hexagram (no changing lines).")
+        for line in hexagram_report(lines):
+            colored_print(line)
+        colored_print(f"\nSeed: {seed}")
 
 # Birth Chart
 def birthchart():
     clear_terminal()
-    eph = load('de421.bsp')
-    planets = {
-        'Sun ☉': eph['sun'], 'Moon ☽': eph['moon'], 'Mercury ☿': eph['mercury'],
-        'Venus ♀': eph['venus'], 'Mars ♂': eph['mars'], 'Jupiter ♃': eph['jupiter barycenter'],
-        'Saturn ♄': eph['saturn barycenter'], 'Uranus ♅': eph['uranus barycenter'],
-        'Neptune ♆': eph['neptune barycenter'], 'Pluto ♇': eph['pluto barycenter']
-    }
-    signs = ["Aries ♈", "Taurus ♉", "Gemini ♊", "Cancer ♋", "Leo ♌", "Virgo ♍",
-             "Libra ♎", "Scorpio ♏", "Sagittarius ♐", "Capricorn ♑", "Aquarius ♒", "Pisces ♓"]
-    
-    def get_sign(degree):
-        return signs[int(degree // 30) % 12]
-    
-    def calculate_positions(birth_datetime, latitude, longitude):
-        location = Topos(latitude_degrees=latitude, longitude_degrees=longitude)
-        ts = load.timescale()
-        t = ts.utc(birth_datetime.year, birth_datetime.month, birth_datetime.day,
-                  birth_datetime.hour, birth_datetime.minute)
-        positions = {}
-        for planet, obj in planets.items():
-            astrometric = (eph['earth'] + location).at(t).observe(obj).apparent()
-            x, y = astrometric.ecliptic_position().au[:2]
-            degree = math.degrees(math.atan2(y, x)) % 360
-            positions[planet] = f"{get_sign(degree)} ({degree:.2f}°)"
-        return positions
+    ephem = ephemeris()
     
+    def run_batch():
+        source = colored_input("Input file (.csv or .jsonl): ").strip()
+        target = colored_input("Output file (.csv or .jsonl): ").strip()
+        start, skipped = time.perf_counter(), []
+        count = write_rows(batch_charts(read_rows(source), skipped=skipped.append), target)
+        elapsed = time.perf_counter() - start
+        for message in skipped:
+            colored_print(f"Skipped: {message}")
+        colored_print(f"\n{count} charts written to {target} in {elapsed:.2f}s ({count / max(elapsed, 1e-9) * 60:.0f} charts/min)"
+                      + (f", {len(skipped)} row(s) skipped" if skipped else ""))
+    
+    def build_index():
+        start_year, end_year = map(int, colored_input("Index era (start and end year, e.g., 1900 2050): ").split())
+        accuracy = float(colored_input("Accuracy in arcseconds (e.g., 1): ") or 1)
+        began = time.perf_counter()
+        index = PositionIndex.build(start_year, end_year, accuracy)
+        index.save()
+        colored_print(f"\nIndex saved to {INDEX_FILE} in {time.perf_counter() - began:.2f}s")
+        report_errors(index)
+    
+    def report_errors(index):
+        colored_print("Maximum error against skyfield:")
+        for (planet, _), error in zip(CHART_BODIES, index.validate().values()):
+            colored_print(f"{planet}: {error:.3f}\"")
+    
+    fast_index = None
+    houses = HOUSE_SYSTEMS[0]
     colored_print("\nVirtual Birth Chart")
+    colored_print(ephem.status())
     while True:
-        colored_print("\n[Enter] to start, [R] to reset, [M] for menu.")
+        colored_print(f"\n[Enter] to start, [B] for batch file, [I] to build the fast index, [F] to toggle fast mode, "
+                      f"[H] for the house system ({houses}), [R] to reset, [M] for menu.")
         choice = colored_input().strip().upper()
         if choice == 'R':
-            return birthchart()
+            return 'birthchart'
         if choice == 'M':
-            return menu()
+            return 'menu'
+        if choice == 'H':
+            houses = HOUSE_SYSTEMS[(HOUSE_SYSTEMS.index(houses) + 1) % len(HOUSE_SYSTEMS)]
+            colored_print(f"House system: {houses}")
+            continue
+        if choice in ('B', 'I', 'F'):
+            try:
+                if choice == 'B':
+                    run_batch()
+                elif choice == 'I':
+                    build_index()
+                elif fast_index:
+                    fast_index = None
+                    colored_print("Fast mode off.")
+                else:
+                    fast_index = PositionIndex.load()
+                    colored_print(f"Fast mode on (geocentric, from {INDEX_FILE}).")
+            except Exception as e:
+                colored_print(f"Error: {e}")
+            continue
         if choice != '':
             colored_print("Invalid command.")
             continue
@@ -537,71 +2293,70 @@ def birthchart():
             hour, minute = map(int, colored_input("Birth time (HH MM, 24-hour): ").split())
             latitude = float(colored_input("Latitude (e.g., 48.8566): "))
             longitude = float(colored_input("Longitude (e.g., 2.3522): "))
-            chart = calculate_positions(datetime(year, month, day, hour, minute), latitude, longitude)
+            when = datetime(year, month, day, hour, minute)
+            degrees = fast_degrees(fast_index, when) if fast_index else chart_degrees(when, latitude, longitude)
+            record, = chart_records([None], [when], [latitude], [longitude], degrees.reshape(-1, 1), houses)
             colored_print("\nAstrological Birth Chart:")
-            for planet, pos in chart.items():
-                colored_print(f"{planet}: {pos}")
+            colored_print("\n".join(chart_lines(record)))
         except Exception as e:
             colored_print(f"Error: {e}")
 
 # Planetary Positions
 def planets():
     clear_terminal()
-    eph = load('de421.bsp')
-    earth = eph['earth']
-    ts = load.timescale()
-    celestial_info = {
-        name: (symbol, eph[f"{name} {'barycenter' if name in ['jupiter', 'saturn', 'uranus', 'neptune', 'pluto'] else ''}".strip()])
-        for name, symbol in [
-            ('sun', '☉'), ('moon', '☽'), ('mercury', '☿'), ('venus', '♀'), ('earth', '⊕'),
-            ('mars', '♂'), ('jupiter', '♃'), ('saturn', '♄'), ('uranus', '♅'), ('neptune', '♆'), ('pluto', '♇')
-        ]
-    }
+    ephem = ephemeris()
+    
+    def write_table():
+        start = datetime(*map(int, colored_input("Start date (YYYY MM DD): ").split()))
+        end = datetime(*map(int, colored_input("End date (YYYY MM DD): ").split()))
+        step = parse_step(colored_input("Step (e.g., 1d, 6h, 30m): "))
+        path = colored_input("Output file (.npy): ").strip()
+        began = time.perf_counter()
+        count = write_planet_table(path, start, end, step)
+        colored_print(f"\n{count} rows x {len(PLANET_SYMBOLS)} bodies written to {path} in {time.perf_counter() - began:.2f}s")
     
-    def calculate_positions():
-        t = ts.now()
-        return {
-            name: (body.at(t).observe(earth).radec()[0].hours, body.at(t).observe(earth).radec()[1].degrees, symbol)
-            for name, (symbol, body) in celestial_info.items()
-        }
+    def show_events():
+        start = datetime(*map(int, colored_input("Start date (YYYY MM DD): ").split()))
+        end = datetime(*map(int, colored_input("End date (YYYY MM DD): ").split()))
+        bodies = colored_input("Bodies (e.g., mars venus; Enter for all): ").lower().split()
+        colored_print("\n".join(map(sky_event_text, sky_events(start, end + timedelta(days=1), bodies))) or "No events.")
     
     colored_print("\nVirtual Planet Positions")
+    colored_print(ephem.status())
     while True:
-        colored_print("\n[Enter] to start, [R] to reset, [M] for menu.")
+        colored_print("\n[Enter] to start, [T] for a table file, [E] for ingresses and stations, [R] to reset, [M] for menu.")
         choice = colored_input().strip().upper()
         if choice == 'R':
-            return planets()
+            return 'planets'
         if choice == 'M':
-            return menu()
-        positions = calculate_positions()
+            return 'menu'
+        if choice in ('T', 'E'):
+            try:
+                write_table() if choice == 'T' else show_events()
+            except Exception as e:
+                colored_print(f"Error: {e}")
+            continue
+        positions = planet_positions(ephem.ts.now())
         colored_print("\nCelestial Bodies Positions:")
-        for name, (ra, dec, symbol) in positions.items():
+        for name, symbol in PLANET_SYMBOLS:
+            ra, dec, _ = positions[name]
             colored_print(f"{symbol} {name.capitalize()} at (RA: {ra:.2f}h, Dec: {dec:.2f}°)")
 
 # Moon Phases
 def moon():
     clear_terminal()
-    planets = load('de421.bsp')
-    earth, moon, sun = planets['earth'], planets['moon'], planets['sun']
-    ts = load.timescale()
-    
-    def moon_phase(date):
-        t = ts.utc(date.year, date.month, date.day)
-        separation = moon.at(t).separation_from(sun.at(t)).degrees / 180.0
-        phases = ["New Moon", "Waxing Crescent", "First Quarter", "Waxing Gibbous",
-                  "Full Moon", "Waning Gibbous", "Last Quarter", "Waning Crescent"]
-        visuals = {"New Moon": "◯", "Waxing Crescent": "☽", "First Quarter": "◑", "Waxing Gibbous": "(",
-                   "Full Moon": "●", "Waning Gibbous": ")", "Last Quarter": "◐", "Waning Crescent": "☾"}
-        phase_index = int((separation * 8) % 8)
-        return phases[phase_index], visuals[phases[phase_index]]
+    ephem = ephemeris()
     
     def display_phases(start_date, end_date=None):
-        current = start_date
-        end = end_date or start_date
-        while current <= end:
-            phase, visual = moon_phase(current)
-            colored_print(f"{current.strftime('%Y-%m-%d')}: {phase} {visual}")
-            current += timedelta(days=1)
+        for first, indices in moon_phase_chunks(start_date, end_date):
+            colored_print("\n".join(
+                f"{first.date() + timedelta(days=day)}: {MOON_PHASES[index]} {MOON_VISUALS[index]}"
+                for day, index in enumerate(indices.tolist())))
+    
+    def display_events(start_date, end_date):
+        colored_print("\n".join(
+            f"{when.strftime('%Y-%m-%d %H:%M')} UTC: {QUARTER_PHASES[index]} {MOON_VISUALS[index * 2]}"
+            for when, index in moon_phase_events(start_date, end_date + timedelta(days=1))) or "No phase events.")
     
     def process_date(date_str):
         try:
@@ -612,15 +2367,21 @@ def moon():
     
     while True:
         colored_print("\nVirtual Moon Phases")
+        colored_print(ephem.status())
         colored_print("\nEnter date(s) (YYYY MM DD, or range with -), [R] to reset, or [M] for menu.")
+        colored_print("Prefix a range with E for exact new, quarter and full moon times.")
         date_input = colored_input().strip().upper()
         if date_input == "M":
-            return menu()
+            return 'menu'
         if date_input == "R":
             colored_print("Resetting... Let's chase the moon again!")
             clear_terminal()
             continue
-        if "-" in date_input:
+        if date_input.startswith("E"):
+            dates = [process_date(part) for part in date_input[1:].split("-")]
+            if all(dates):
+                display_events(dates[0], dates[-1])
+        elif "-" in date_input:
             start, end = map(process_date, date_input.split("-"))
             if start and end:
                 display_phases(start, end)
@@ -635,152 +2396,252 @@ def moon():
                 display_phases(date)
 
 # Numerology
+NUMEROLOGY_MEANINGS = {
+    "life_path": {
+        1: "Independence, Leadership",
+        2: "Diplomacy, Partnership",
+        3: "Creativity, Expression",
+        4: "Stability, Hard work",
+        5: "Freedom, Adaptability",
+        6: "Responsibility, Harmony",
+        7: "Spirituality, Introspection",
+        8: "Power, Ambition",
+        9: "Compassion, Humanitarianism",
+        11: "Inspiration, Intuition",
+        22: "Mastery, Vision",
+        33: "Healing, Altruism"
+    },
+    "destiny": {
+        1: "Leadership, Purpose",
+        2: "Collaboration, Balance",
+        3: "Joy, Creativity",
+        4: "Foundation, Stability",
+        5: "Change, Freedom",
+        6: "Service, Family",
+        7: "Wisdom, Solitude",
+        8: "Power, Success",
+        9: "Compassion, Service",
+        11: "Visionary, Insight",
+        22: "Master Builder, Potential",
+        33: "Healing, Love"
+    },
+    "soul_urge": {
+        1: "Self-Determination, Drive",
+        2: "Peace, Harmony",
+        3: "Expression, Joy",
+        4: "Practicality, Security",
+        5: "Adventure, Freedom",
+        6: "Love, Care",
+        7: "Mysticism, Depth",
+        8: "Ambition, Power",
+        9: "Humanitarianism, Idealism",
+        11: "Inspiration, Intuition",
+        22: "Mastery, Service",
+        33: "Compassion, Healing"
+    },
+    "personality": {
+        1: "Assertive, Strong",
+        2: "Gentle, Diplomatic",
+        3: "Outgoing, Charismatic",
+        4: "Reliable, Practical",
+        5: "Dynamic, Adaptable",
+        6: "Nurturing, Caring",
+        7: "Reserved, Analytical",
+        8: "Confident, Ambitious",
+        9: "Generous, Compassionate",
+        11: "Creative, Charismatic",
+        22: "Powerful, Authoritative",
+        33: "Selfless, Inspirational"
+    },
+    "birthday": {
+        1: "Leadership, Initiative",
+        2: "Cooperation, Sensitivity",
+        3: "Creativity, Joy",
+        4: "Discipline, Order",
+        5: "Freedom, Curiosity",
+        6: "Nurturing, Responsibility",
+        7: "Analysis, Contemplation",
+        8: "Ambition, Material Success",
+        9: "Humanitarian, Idealistic",
+        11: "Intuitive, Spiritual Insight",
+        22: "Mastery, Achievements",
+        33: "Healing, Enlightenment"
+    },
+    "maturity": {
+        1: "Individuality, Assertiveness",
+        2: "Balance, Harmony",
+        3: "Artistry, Communication",
+        4: "Structure, Dependability",
+        5: "Flexibility, Exploration",
+        6: "Support, Family Focus",
+        7: "Wisdom, Insight",
+        8: "Power, Achievement",
+        9: "Compassion, Sacrifice",
+        11: "Visionary, Inspirational",
+        22: "Strategic, Visionary",
+        33: "Service, Love"
+    },
+    "personal_year": {
+        1: "New Beginnings, Initiative",
+        2: "Patience, Relationships",
+        3: "Creativity, Socializing",
+        4: "Stability, Hard Work",
+        5: "Change, Adventure",
+        6: "Family, Harmony",
+        7: "Introspection, Spiritual Growth",
+        8: "Power, Material Success",
+        9: "Completion, Letting Go",
+        11: "Intuition, Insight",
+        22: "Mastery, Building",
+        33: "Compassion, Global Awareness"
+    }
+}
+
+MASTER_NUMBERS = (11, 22, 33)
+REDUCE_LIMIT = 1 << 16
+NUMEROLOGY_CHUNK_ROWS = 20000
+
+def digit_sum(n):
+    return sum(int(d) for d in str(n))
+
+def reduce(n):
+    while n > 9 and n not in MASTER_NUMBERS:
+        n = digit_sum(n)
+    return n
+
+def digit_sums(values):
+    total = np.zeros_like(values)
+    while values.any():
+        values, total = values // 10, total + values % 10
+    return total
+
+@functools.cache
+def reduced_table():
+    # Reduction of every n below REDUCE_LIMIT (single digits and master numbers stay), built on first batch use
+    table = np.arange(REDUCE_LIMIT)
+    while (pending := (table > 9) & ~np.isin(table, MASTER_NUMBERS)).any():
+        table[pending] = digit_sums(table[pending])
+    return table
+
+def reduce_array(values):
+    values = np.asarray(values, dtype=np.int64).copy()
+    while (large := values >= REDUCE_LIMIT).any():
+        values[large] = digit_sums(values[large])
+    return reduced_table()[values]
+
+def calculate_life_path(birthdate):
+    return reduce(sum(int(d) for d in birthdate.replace(" ", "")))
+
+DESTINY_VALUES = {'a': 1, 'j': 1, 's': 1, 'b': 2, 'k': 2, 't': 2, 'c': 3, 'l': 3, 'u': 3,
+                  'd': 4, 'm': 4, 'v': 4, 'e': 5, 'n': 5, 'w': 5, 'f': 6, 'o': 6, 'x': 6,
+                  'g': 7, 'p': 7, 'y': 7, 'h': 8, 'q': 8, 'z': 8, 'i': 9, 'r': 9}
+SOUL_URGE_VALUES = {'a': 1, 'e': 5, 'i': 9, 'o': 6, 'u': 3}
+PERSONALITY_VALUES = {'b': 2, 'c': 3, 'd': 4, 'f': 6, 'g': 7, 'h': 8, 'j': 1, 'k': 2, 'l': 3,
+                      'm': 4, 'n': 5, 'p': 7, 'q': 8, 'r': 9, 's': 1, 't': 2, 'v': 4, 'w': 5, 'x': 6, 'y': 7, 'z': 8}
+
+@functools.cache
+def letter_tables():
+    # Per-code-point values for ASCII: rows destiny, soul urge and personality, then digits; anything else scores 0
+    letters = np.zeros((3, 128), dtype=np.int64)
+    for table, values in zip(letters, (DESTINY_VALUES, SOUL_URGE_VALUES, PERSONALITY_VALUES)):
+        for letter, value in values.items():
+            table[ord(letter)] = value
+    digits = np.zeros(128, dtype=np.int64)
+    digits[ord('0'):ord('9') + 1] = np.arange(10)
+    return letters, digits
+
+def code_point_sums(texts, tables):
+    # Sums of table values over the characters of each text, in one pass over the joined code points
+    codes = np.frombuffer("".join(texts).encode('utf-32-le'), dtype=np.uint32)
+    values = tables[..., np.where(codes < 128, codes, 0)]
+    totals = np.concatenate([np.zeros(values.shape[:-1] + (1,), dtype=np.int64), np.cumsum(values, axis=-1)], axis=-1)
+    lengths = np.array([len(text) for text in texts])
+    ends = np.cumsum(lengths)
+    return totals[..., ends] - totals[..., ends - lengths]
+
+def calculate_destiny(name):
+    return reduce(sum(DESTINY_VALUES.get(c, 0) for c in name.lower()))
+
+def calculate_soul_urge(name):
+    return reduce(sum(SOUL_URGE_VALUES.get(c, 0) for c in name.lower()))
+
+def calculate_personality(name):
+    return reduce(sum(PERSONALITY_VALUES.get(c, 0) for c in name.lower()))
+
+def calculate_birthday(birthdate):
+    return reduce(int(birthdate.split()[2]))
+
+def calculate_maturity(life_path, destiny):
+    return reduce(life_path + destiny)
+
+def calculate_personal_year(birthdate):
+    year = datetime.now().year
+    month_day = sum(int(d) for d in birthdate.split()[1:])
+    return reduce(year + month_day)
+
+def numerology_report(name, birthdate):
+    life_path = calculate_life_path(birthdate)
+    destiny = calculate_destiny(name)
+    return [
+        (life_path, "Life Path", "life_path"), (calculate_birthday(birthdate), "Birthday", "birthday"),
+        (destiny, "Destiny", "destiny"), (calculate_soul_urge(name), "Soul Urge", "soul_urge"),
+        (calculate_personality(name), "Personality", "personality"), (calculate_maturity(life_path, destiny), "Maturity", "maturity"),
+        (calculate_personal_year(birthdate), "Personal Year", "personal_year")
+    ]
+
+def parse_person(row):
+    try:
+        name = str(row['name'])
+        birthdate = str(row.get('birthdate') or row['birth']).strip().replace('-', ' ')
+        year, month, day = map(int, birthdate.split())
+    except (KeyError, ValueError) as e:
+        raise ValueError(f"Row {row.get('id')} needs a name and a YYYY-MM-DD birthdate.") from e
+    return row.get('id'), name.lower(), birthdate.replace(' ', ''), month + day, day
+
+def numerology_chunk(rows):
+    ids, names, digits, month_days, days = zip(*[parse_person(row) for row in rows])
+    letters, digit_values = letter_tables()
+    destiny, soul_urge, personality = reduce_array(code_point_sums(names, letters))
+    life_path = reduce_array(code_point_sums(digits, digit_values))
+    columns = {
+        'life_path': life_path, 'birthday': reduce_array(days), 'destiny': destiny,
+        'soul_urge': soul_urge, 'personality': personality, 'maturity': reduce_array(life_path + destiny),
+        'personal_year': reduce_array(datetime.now().year + np.array(month_days))
+    }
+    keys = list(columns)
+    return [dict(zip(['id'] + keys, values)) for values in zip(ids, *(columns[key].tolist() for key in keys))]
+
+def batch_numerology(rows, workers=None, chunk_rows=NUMEROLOGY_CHUNK_ROWS):
+    # Streams all seven numbers per row in input order
+    for records in pool_map(numerology_chunk, chunked(number_rows(rows), chunk_rows), workers):
+        yield from records
+
+def numerology_lines(name, birthdate):
+    return [f"{desc} Number: {num} - {NUMEROLOGY_MEANINGS.get(type_, {}).get(num, 'Unknown')}"
+            for num, desc, type_ in numerology_report(name, birthdate)]
+
 def numerology():
     clear_terminal()
-    meanings = {
-        "life_path": {
-                1: "Independence, Leadership",
-                2: "Diplomacy, Partnership",
-                3: "Creativity, Expression",
-                4: "Stability, Hard work",
-                5: "Freedom, Adaptability",
-                6: "Responsibility, Harmony",
-                7: "Spirituality, Introspection",
-                8: "Power, Ambition",
-                9: "Compassion, Humanitarianism",
-                11: "Inspiration, Intuition",
-                22: "Mastery, Vision",
-                33: "Healing, Altruism"
-            },
-            "destiny": {
-                1: "Leadership, Purpose",
-                2: "Collaboration, Balance",
-                3: "Joy, Creativity",
-                4: "Foundation, Stability",
-                5: "Change, Freedom",
-                6: "Service, Family",
-                7: "Wisdom, Solitude",
-                8: "Power, Success",
-                9: "Compassion, Service",
-                11: "Visionary, Insight",
-                22: "Master Builder, Potential",
-                33: "Healing, Love"
-            },
-            "soul_urge": {
-                1: "Self-Determination, Drive",
-                2: "Peace, Harmony",
-                3: "Expression, Joy",
-                4: "Practicality, Security",
-                5: "Adventure, Freedom",
-                6: "Love, Care",
-                7: "Mysticism, Depth",
-                8: "Ambition, Power",
-                9: "Humanitarianism, Idealism",
-                11: "Inspiration, Intuition",
-                22: "Mastery, Service",
-                33: "Compassion, Healing"
-            },
-            "personality": {
-                1: "Assertive, Strong",
-                2: "Gentle, Diplomatic",
-                3: "Outgoing, Charismatic",
-                4: "Reliable, Practical",
-                5: "Dynamic, Adaptable",
-                6: "Nurturing, Caring",
-                7: "Reserved, Analytical",
-                8: "Confident, Ambitious",
-                9: "Generous, Compassionate",
-                11: "Creative, Charismatic",
-                22: "Powerful, Authoritative",
-                33: "Selfless, Inspirational"
-            },
-            "birthday": {
-                1: "Leadership, Initiative",
-                2: "Cooperation, Sensitivity",
-                3: "Creativity, Joy",
-                4: "Discipline, Order",
-                5: "Freedom, Curiosity",
-                6: "Nurturing, Responsibility",
-                7: "Analysis, Contemplation",
-                8: "Ambition, Material Success",
-                9: "Humanitarian, Idealistic",
-                11: "Intuitive, Spiritual Insight",
-                22: "Mastery, Achievements",
-                33: "Healing, Enlightenment"
-            },
-            "maturity": {
-                1: "Individuality, Assertiveness",
-                2: "Balance, Harmony",
-                3: "Artistry, Communication",
-                4: "Structure, Dependability",
-                5: "Flexibility, Exploration",
-                6: "Support, Family Focus",
-                7: "Wisdom, Insight",
-                8: "Power, Achievement",
-                9: "Compassion, Sacrifice",
-                11: "Visionary, Inspirational",
-                22: "Strategic, Visionary",
-                33: "Service, Love"
-            },
-            "personal_year": {
-                1: "New Beginnings, Initiative",
-                2: "Patience, Relationships",
-                3: "Creativity, Socializing",
-                4: "Stability, Hard Work",
-                5: "Change, Adventure",
-                6: "Family, Harmony",
-                7: "Introspection, Spiritual Growth",
-                8: "Power, Material Success",
-                9: "Completion, Letting Go",
-                11: "Intuition, Insight",
-                22: "Mastery, Building",
-                33: "Compassion, Global Awareness"
-            }
-        }
-    
-    def reduce(n):
-        while n > 9 and n not in [11, 22, 33]:
-            n = sum(int(d) for d in str(n))
-        return n
-    
-    def calculate_life_path(birthdate):
-        return reduce(sum(int(d) for d in birthdate.replace(" ", "")))
-    
-    def calculate_destiny(name):
-        letter_values = {'a': 1, 'j': 1, 's': 1, 'b': 2, 'k': 2, 't': 2, 'c': 3, 'l': 3, 'u': 3,
-                         'd': 4, 'm': 4, 'v': 4, 'e': 5, 'n': 5, 'w': 5, 'f': 6, 'o': 6, 'x': 6,
-                         'g': 7, 'p': 7, 'y': 7, 'h': 8, 'q': 8, 'z': 8, 'i': 9, 'r': 9}
-        return reduce(sum(letter_values.get(c, 0) for c in name.lower()))
-    
-    def calculate_soul_urge(name):
-        letter_values = {'a': 1, 'e': 5, 'i': 9, 'o': 6, 'u': 3}
-        return reduce(sum(letter_values.get(c, 0) for c in name.lower()))
-    
-    def calculate_personality(name):
-        letter_values = {'b': 2, 'c': 3, 'd': 4, 'f': 6, 'g': 7, 'h': 8, 'j': 1, 'k': 2, 'l': 3,
-                         'm': 4, 'n': 5, 'p': 7, 'q': 8, 'r': 9, 's': 1, 't': 2, 'v': 4, 'w': 5, 'x': 6, 'y': 7, 'z': 8}
-        consonants = ''.join(c for c in name.lower() if c not in 'aeiou ')
-        return reduce(sum(letter_values.get(c, 0) for c in consonants))
-    
-    def calculate_birthday(birthdate):
-        return reduce(int(birthdate.split()[2]))
-    
-    def calculate_maturity(life_path, destiny):
-        return reduce(life_path + destiny)
-    
-    def calculate_personal_year(birthdate):
-        year = datetime.now().year
-        month_day = sum(int(d) for d in birthdate.split()[1:])
-        return reduce(year + month_day)
-    
     colored_print("\nVirtual Numerology Calculator")
     while True:
-        colored_print("\n[Enter] to start, [R] to reset, [M] for menu.")
+        colored_print("\n[Enter] to start, [B] for batch, [R] to reset, [M] for menu.")
         choice = colored_input().strip().upper()
         if choice == 'R':
-            return numerology()
+            return 'numerology'
+        if choice == 'B':
+            source = colored_input("Input file (.csv or .jsonl with name, birthdate): ").strip()
+            target = colored_input("Output file (.csv or .jsonl): ").strip()
+            try:
+                start = time.perf_counter()
+                count = write_rows(batch_numerology(read_rows(source)), target)
+            except (ValueError, OSError) as e:
+                colored_print(f"Error: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            colored_print(f"\n{count} rows written to {target} in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.0f} rows/s)")
+            continue
         if choice == 'M':
-            menu()
+            return 'menu'
         if choice != '':
             colored_print("Invalid command.")
             continue
@@ -788,35 +2649,868 @@ def numerology():
         birthdate = colored_input("Birthdate (YYYY MM DD): ")
         name = colored_input("Full name: ").strip()
         
-        life_path = calculate_life_path(birthdate)
-        destiny = calculate_destiny(name)
-        soul_urge = calculate_soul_urge(name)
-        personality = calculate_personality(name)
-        birthday = calculate_birthday(birthdate)
-        maturity = calculate_maturity(life_path, destiny)
-        personal_year = calculate_personal_year(birthdate)
-        
         colored_print("\n--- Numerology Report ---")
-        for num, desc, type_ in [
-            (life_path, "Life Path", "life_path"), (birthday, "Birthday", "birthday"),
-            (destiny, "Destiny", "destiny"), (soul_urge, "Soul Urge", "soul_urge"),
-            (personality, "Personality", "personality"), (maturity, "Maturity", "maturity"),
-            (personal_year, "Personal Year", "personal_year")
-        ]:
-            colored_print(f"{desc} Number: {num} - {meanings.get(type_, {}).get(num, 'Unknown')}")
+        for line in numerology_lines(name, birthdate):
+            colored_print(line)
 
 # Sigil Consonant Extractor
+# Consonants kept per alphabet, and letters folded by hand where Unicode has no decomposition (final forms, Ł, Þ, ...)
+SIGIL_ALPHABETS = {
+    'latin': ('BCDFGHJKLMNPQRSTVWXYZ', {'ł': 'l', 'Ł': 'L', 'đ': 'd', 'Đ': 'D', 'ð': 'd', 'Ð': 'D', 'þ': 'th', 'Þ': 'TH',
+                                        'ħ': 'h', 'Ħ': 'H', 'ŋ': 'n', 'Ŋ': 'N', 'ƀ': 'b', 'ɍ': 'r', 'ȼ': 'c'}),
+    'greek': ('ΒΓΔΖΘΚΛΜΝΞΠΡΣΤΦΧΨ', {}),
+    'hebrew': ('אבגדהוזחטיכלמנסעפצקרשת', {'ך': 'כ', 'ם': 'מ', 'ן': 'נ', 'ף': 'פ', 'ץ': 'צ'})
+}
+SIGIL_READ_CHARS = 1 << 20
+
+class SigilFold(dict):
+    # str.translate table filled on first sight of each code point: strip diacritics/niqqud, fold finals, keep consonants
+    def __init__(self, alphabet):
+        super().__init__()
+        self.consonants, self.finals = SIGIL_ALPHABETS[alphabet]
+
+    def __missing__(self, code):
+        base = ''.join(c for c in unicodedata.normalize('NFKD', chr(code)) if not unicodedata.combining(c))
+        folded = ''.join(c for c in self.finals.get(base, base).upper() if c in self.consonants) or None
+        self[code] = folded
+        return folded
+
+SIGIL_FOLDS = {alphabet: SigilFold(alphabet) for alphabet in SIGIL_ALPHABETS}
+
+def sigil_consonants(intention, alphabet='latin'):
+    # First occurrence of each consonant, in order, in one pass
+    return ''.join(dict.fromkeys(intention.translate(SIGIL_FOLDS[alphabet])))
+
+def stream_sigils(stream, alphabet='latin', per_line=False, chunk_chars=SIGIL_READ_CHARS):
+    # Reads fixed-size chunks: one sigil per line, or one for the whole stream (stopping once every consonant is seen)
+    fold, full = SIGIL_FOLDS[alphabet], len(SIGIL_ALPHABETS[alphabet][0])
+    seen, partial = {}, False
+    while chunk := stream.read(chunk_chars):
+        pieces = chunk.split('\n') if per_line else [chunk]
+        for i, piece in enumerate(pieces):
+            if i:
+                yield ''.join(seen)
+                seen = {}
+            if len(seen) < full:
+                seen.update(dict.fromkeys(piece.translate(fold)))
+        partial = bool(pieces[-1]) or (partial and len(pieces) == 1)
+        if not per_line and len(seen) == full:
+            break
+    if partial or not per_line:
+        yield ''.join(seen)
+
 def createsigil():
     clear_terminal()
     colored_print("\nVirtual Sigil Consonant Extractor")
+    alphabet = 'latin'
     while True:
-        intention = colored_input("\nEnter intention, [R] to reset, [M] for menu: ").strip().upper()
+        intention = colored_input(f"\nEnter intention ({alphabet}), [F] for a file, [A] for alphabet, [R] to reset, [M] for menu: ").strip().upper()
         if intention == "R":
-            return createsigil()
+            return 'createsigil'
         if intention == "M":
-            return menu()
-        result = ''.join(sorted(set(c for c in intention if c.isalpha() and c not in 'AEIOU'), key=intention.index))
+            return 'menu'
+        if intention == "A":
+            choice = colored_input(f"Alphabet ({', '.join(SIGIL_ALPHABETS)}): ").strip().lower()
+            if choice in SIGIL_ALPHABETS:
+                alphabet = choice
+            else:
+                colored_print("Unknown alphabet.")
+            continue
+        if intention == "F":
+            path = colored_input("File: ").strip()
+            try:
+                with open(path, encoding='utf-8') as stream:
+                    result = next(stream_sigils(stream, alphabet))
+            except OSError as e:
+                colored_print(f"Error: {e}")
+                continue
+        else:
+            result = sigil_consonants(intention, alphabet)
         colored_print(f"\nSigil consonants (no vowels, no repeats): {result}")
 
+# Navigation
+SCREENS = {
+    "menu": menu, "tarot": tarot, "runes": runes, "coin": coin, "dice": dice, "iching": iching,
+    "birthchart": birthchart, "planets": planets, "moon": moon, "numerology": numerology, "createsigil": createsigil
+}
+
+def navigate(state="menu"):
+    # Each screen returns the name of the next one (None to quit), so the stack never grows
+    while state:
+        PROFILE.tool = state
+        try:
+            state = SCREENS[state]()
+        except ImportError as e:
+            colored_input(f"\n{e} Press Enter to return to the menu...")
+            state = 'menu'
+
+# Local HTTP service
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8765
+LOOPBACK_HOSTS = ('127.0.0.1', '::1', 'localhost')
+SERVICE_MAX_BODY = 1 << 20
+SERVICE_MAX_HEADERS = 100
+SERVICE_MAX_PENDING = 256
+SERVICE_BATCH_SIZE = 64
+SERVICE_BATCH_WINDOW = 0.002
+SERVICE_IDLE_SECONDS = 15
+SERVICE_DRAIN_SECONDS = 30
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+def service_time(request):
+    when = request.get('when')
+    return parse_birth({'datetime': when, 'lat': 0, 'lon': 0})[1] if when else None
+
+def service_count(request, field, default=None):
+    # A count such as draws or rolls: a whole number of at least 1, or default when the field is absent
+    value = request.get(field)
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"Number of {field} must be a whole number, not {value!r}.")
+    if value < 1:
+        raise ValueError(f"Number of {field} must be at least 1, not {value}.")
+    return value
+
+def service_draw(request, deck):
+    use_reversals = bool(request.get('reversals'))
+    seed, rng = RANDOM.reading(request.get('seed'))
+    if request.get('simulate'):
+        return spread_statistics(deck, request.get('spread') or 'single', int(request['simulate']), use_reversals, seed)
+    if request.get('spread'):
+        drawn = draw_spread(deck, request['spread'], use_reversals, rng)
+    else:
+        drawn = [(None, card, is_reversed) for card, is_reversed in
+                 draw_many(deck, service_count(request, 'draws', 1), use_reversals, bool(request.get('unlimited')), rng)]
+    return {'seed': seed, 'cards': [card_record(*draw) for draw in drawn]}
+
+def service_coin(request):
+    seed, rng = RANDOM.reading(request.get('seed'))
+    if request.get('bulk'):
+        return toss_bulk(int(request['bulk']), seed)
+    stats, results = CoinStats(), []
+    for _ in range(int(request.get('tosses', 1))):
+        results.append(toss_coin(rng))
+        stats.add(results[-1])
+    return {'seed': seed, 'results': results, **stats.record()}
+
+def service_dice(request):
+    terms = parse_dice(str(request['expression']))
+    if request.get('dist'):
+        low, probs = dice_distribution(terms)
+        return {'lowest': low, 'probabilities': probs.tolist()}
+    seed, rng = RANDOM.reading(request.get('seed'))
+    rolls = service_count(request, 'rolls')
+    if rolls is not None:
+        totals = roll_totals(terms, rolls, seed)
+        return {'seed': seed, 'rolls': len(totals), 'mean': float(totals.mean()), 'std_dev': float(totals.std()),
+                'min': int(totals.min()), 'max': int(totals.max())}
+    rolled = roll_pool(terms, rng)
+    return {'seed': seed, 'terms': [roll_record(*roll) for roll in rolled],
+            'total': sum(subtotal for *_, subtotal in rolled)}
+
+def service_iching(request):
+    method = request.get('method', 'coins')
+    if method not in CASTING_METHODS:
+        raise ValueError(f"Unknown method: {method}")
+    seed, rng = RANDOM.reading(request.get('seed'))
+    if request.get('casts') is not None:
+        pairs = cast_statistics(int(request['casts']), method, seed)
+        return {'seed': seed, 'casts': int(pairs.sum()), 'method': method,
+                'pairs': [[int(KING_WEN[p]), int(KING_WEN[q]), int(pairs[p, q])] for p, q in zip(*np.nonzero(pairs))]}
+    return {'seed': seed, **hexagram_record([toss_line(rng)[1] for _ in range(6)])}
+
+def service_numerology(request):
+    if 'rows' in request:
+        return {'rows': numerology_chunk(list(number_rows(request['rows'])))}
+    return numerology_chunk([request])[0]
+
+def service_sigil(request):
+    alphabet = request.get('alphabet', 'latin')
+    if alphabet not in SIGIL_ALPHABETS:
+        raise ValueError(f"Unknown alphabet: {alphabet}")
+    if 'lines' in request:
+        return {'sigils': [sigil_consonants(str(line), alphabet) for line in request['lines']]}
+    return {'sigil': sigil_consonants(str(request['intention']), alphabet)}
+
+def service_moon(request):
+    start, end = parse_date_range(str(request['dates']))
+    if request.get('events'):
+        return {'events': [{'time': when.isoformat(), 'phase': QUARTER_PHASES[index]}
+                           for when, index in moon_phase_events(start, end + timedelta(days=1))]}
+    return {'days': [{'date': (first + timedelta(days=day)).strftime('%Y-%m-%d'), 'phase': MOON_PHASES[index]}
+                     for first, indices in moon_phase_chunks(start, end) for day, index in enumerate(indices.tolist())]}
+
+def service_planets(request):
+    if 'events' in request:
+        start, end = parse_date_range(str(request['events']))
+        return {'events': [sky_event_record(event) for event in sky_events(start, end + timedelta(days=1), request.get('bodies'), 1)]}
+    positions = planet_snapshot(service_time(request))
+    return {name: {'ra_hours': ra, 'dec_degrees': dec, 'longitude': lon}
+            for name, (ra, dec, lon) in positions.items()}
+
+def service_chart(request):
+    houses, orbs = request.get('houses', 'placidus'), request.get('orbs')
+    if 'rows' not in request:
+        return chart_chunk([request], houses, orbs)[0]
+    return {'rows': chart_chunk(list(number_rows(request['rows'])), houses, orbs)}
+
+SERVICE_TOOLS = {
+    'tarot': lambda request: service_draw(request, TAROT),
+    'runes': lambda request: service_draw(request, RUNES),
+    'coin': service_coin, 'dice': service_dice, 'iching': service_iching,
+    'numerology': service_numerology, 'sigil': service_sigil, 'moon': service_moon,
+    'planets': service_planets, 'chart': service_chart
+}
+
+def warm_worker():
+    # Forked workers would otherwise share the parent's master stream; without skyfield only the astronomy
+    # tools fail, per request, while the rest keep working
+    RANDOM.reseed()
+    with contextlib.suppress(ImportError):
+        ephemeris()
+
+def service_result(tool, request):
+    # (status, result) for one request; every failure becomes an error message here, in the worker, because
+    # exceptions such as skyfield's range errors cannot be pickled back to the server
+    try:
+        return 200, SERVICE_TOOLS[tool](request)
+    except KeyError as e:
+        return 400, {'error': f"Missing field {e}"}
+    except (ValueError, TypeError) as e:
+        return 400, {'error': str(e)}
+    except Exception as e:
+        return 500, {'error': f"{type(e).__name__}: {e}"}
+
+def service_batch(items):
+    # Runs in a pool worker: [(tool, request)] -> [(status, result)]; single charts in a batch share one vectorized
+    # call, and if that fails each chart is retried alone so only the bad request gets the error
+    results = [None] * len(items)
+    charts = []
+    for i, (tool, request) in enumerate(items):
+        if tool == 'chart' and not {'rows', 'houses', 'orbs'} & set(request):
+            charts.append(i)
+        else:
+            results[i] = service_result(tool, request)
+    try:
+        for i, record in zip(charts, chart_chunk([items[i][1] for i in charts]) if charts else ()):
+            results[i] = (200, record)
+    except Exception:
+        for i in charts:
+            results[i] = service_result(*items[i])
+    return results
+
+def json_default(value):
+    # numpy scalars and anything else json cannot encode on its own
+    return value.item() if hasattr(value, 'item') else str(value)
+
+class ToolService:
+    def __init__(self, workers=None, max_pending=SERVICE_MAX_PENDING, batch_size=SERVICE_BATCH_SIZE, batch_window=SERVICE_BATCH_WINDOW):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = futures.ProcessPoolExecutor(self.workers, initializer=warm_worker)
+        self.max_pending, self.batch_size, self.batch_window = max_pending, batch_size, batch_window
+        self.queue = self.idle = None
+        self.pending = self.requests = self.rejected = self.batches = self.connections = 0
+
+    async def submit(self, tool, request):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((tool, request, future))
+        return await future
+
+    async def batcher(self):
+        # Waits for an idle worker, then takes whatever queued up meanwhile (plus the batch window) as one pool task
+        while True:
+            await self.idle.acquire()
+            items = [await self.queue.get()]
+            await asyncio.sleep(self.batch_window)
+            while len(items) < self.batch_size and not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            self.batches += 1
+            asyncio.create_task(self.run_batch(items))
+
+    async def run_batch(self, items):
+        try:
+            task, finish = pool_task(service_batch)
+            results = finish(await asyncio.get_running_loop().run_in_executor(
+                self.pool, task, [(tool, request) for tool, request, _ in items]))
+        except Exception as e:
+            results = [(500, {'error': str(e)})] * len(items)
+        finally:
+            self.idle.release()
+        for (_, _, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        return {'requests': self.requests, 'rejected': self.rejected, 'batches': self.batches, 'connections': self.connections,
+                'pending': self.pending, 'max_pending': self.max_pending, 'cache': RESULTS.report() if RESULTS.enabled else None}
+
+    async def handle(self, method, path, body):
+        path = path.split('?', 1)[0].strip('/')
+        if path in ('health', 'stats'):
+            return 200, {'status': 'ok'} if path == 'health' else self.stats()
+        if path not in SERVICE_TOOLS:
+            return 404, {'error': f"Unknown tool: {path}", 'tools': list(SERVICE_TOOLS)}
+        if method != 'POST':
+            return 405, {'error': "Use POST with a JSON object body."}
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError as e:
+            return 400, {'error': f"Invalid JSON: {e}"}
+        if not isinstance(request, dict):
+            return 400, {'error': "The body must be a JSON object."}
+        if self.pending >= self.max_pending:
+            # Backpressure: refuse instead of queueing without bound
+            self.rejected += 1
+            return 503, {'error': "Too many pending requests, retry shortly."}
+        self.pending += 1
+        self.requests += 1
+        try:
+            return await self.submit(path, request)
+        finally:
+            self.pending -= 1
+
+    async def connection(self, reader, writer):
+        # HTTP/1.1 with keep-alive; one request at a time per connection
+        self.connections += 1
+        try:
+            while True:
+                line = await asyncio.wait_for(reader.readline(), SERVICE_IDLE_SECONDS)
+                if not line.strip():
+                    break
+                method, path, version = line.decode('latin-1').split()
+                headers = {}
+                while (header := await reader.readline()).strip():
+                    if len(headers) >= SERVICE_MAX_HEADERS:
+                        raise ValueError("Too many headers")
+                    name, _, value = header.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+                length = int(headers.get('content-length', 0))
+                if length > SERVICE_MAX_BODY:
+                    status, payload, keep_alive = 413, {'error': f"Body over {SERVICE_MAX_BODY} bytes"}, False
+                else:
+                    status, payload = await self.handle(method.upper(), path, await reader.readexactly(length))
+                body = json.dumps(payload, ensure_ascii=False, default=json_default).encode('utf-8')
+                head = [f"HTTP/1.1 {status} {HTTP_REASONS[status]}", "Content-Type: application/json; charset=utf-8",
+                        f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                if status == 503:
+                    head.append("Retry-After: 1")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        if host not in LOOPBACK_HOSTS:
+            raise ValueError(f"The service only binds to localhost ({', '.join(LOOPBACK_HOSTS)}).")
+        self.queue, self.idle = asyncio.Queue(), asyncio.Semaphore(self.workers)
+        self.batcher_task = asyncio.create_task(self.batcher())
+        return await asyncio.start_server(self.connection, host, port)
+
+    async def serve(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        server = await self.start(host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Serving {', '.join(SERVICE_TOOLS)} on http://{address[0]}:{address[1]}/<tool>", file=sys.stderr)
+        # SIGTERM closes the server like Ctrl+C, so the caller still shuts the worker pool down
+        with contextlib.suppress(NotImplementedError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.close)
+        async with server:
+            with contextlib.suppress(asyncio.CancelledError):
+                await server.serve_forever()
+            # Requests already read still get their answer (written as handle() returns) before the pool goes
+            deadline = time.monotonic() + SERVICE_DRAIN_SECONDS
+            while self.pending and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+
+# Benchmarks
+BENCH_REPEATS = 3
+BENCH_TOLERANCE = 0.25
+
+def bench_names(count):
+    rng = seeded_rng(0)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz "))
+    return ["".join(letters[rng.integers(0, 27, size=int(rng.integers(5, 30)))]) for _ in range(count)]
+
+def bench_births(count):
+    rng = seeded_rng(0)
+    start = datetime(1900, 1, 1)
+    return [{'datetime': (start + timedelta(minutes=int(minutes))).isoformat(), 'lat': float(lat), 'lon': float(lon)}
+            for minutes, lat, lon in zip(rng.integers(0, 150 * 525960, count), rng.uniform(-60, 60, count), rng.uniform(-180, 180, count))]
+
+@functools.cache
+def bench_store(charts=1000000):
+    return SynastryStore(np.arange(charts), seeded_rng(0).uniform(0, 360, (len(SYNASTRY_KEYS), charts)))
+
+# name -> (unit, sizes, setup); setup(size) returns the callable that gets timed
+BENCHMARKS = {
+    'startup_python': ('starts', (1,), lambda size: lambda: subprocess.run([sys.executable, '-c', 'pass'], check=True)),
+    'startup_coin': ('starts', (1,), lambda size: lambda: subprocess.run([sys.executable, os.path.abspath(__file__), 'coin'],
+                                                                        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)),
+    'tarot_draws': ('draws', (100, 10000), lambda size: lambda: draw_many(TAROT, size, True, True, ReadingRandom(0))),
+    'spread_simulation': ('spreads', (10000, 1000000), lambda size: lambda: simulate_spreads(TAROT, 'celtic-cross', size, True, 0)),
+    'coin_tosses': ('tosses', (100000, 10000000), lambda size: lambda: toss_bulk(size, 0)),
+    'dice_rolls': ('rolls', (10000, 1000000), lambda size: lambda: roll_totals(parse_dice("4d6kh3+2d8!+1"), size, 0)),
+    'dice_distribution': ('dice', (10, 100, 1000), lambda size: lambda: dice_distribution(parse_dice(f"{size}d20kh{max(size // 10, 1)}+{size}d6"))),
+    'iching_casts': ('casts', (10000, 1000000), lambda size: lambda: cast_statistics(size, 'yarrow', 0)),
+    'moon_phase_days': ('days', (365, 36500), lambda size: lambda: sum(len(phases) for _, phases in moon_phase_chunks(datetime(1900, 1, 1), datetime(1900, 1, 1) + timedelta(days=size - 1)))),
+    'sky_event_years': ('years', (1, 50), lambda size: lambda: sum(1 for _ in sky_events(datetime(1950, 1, 1), datetime(1950 + size, 1, 1), workers=1))),
+    'charts': ('charts', (1, 100, 2000), lambda size: (lambda rows: lambda: chart_chunk(rows))(bench_births(size))),
+    'numerology_names': ('names', (1000, 100000), lambda size: (lambda rows: lambda: numerology_chunk(rows))(
+        [{'name': name, 'birthdate': '1990-05-17'} for name in bench_names(size)])),
+    'sigil_chars': ('chars', (10000, 1000000), lambda size: (lambda text: lambda: sigil_consonants(text))(" ".join(bench_names(size // 10))[:size])),
+    'synastry_lookups': ('lookups', (100, 10000), lambda size: (lambda store, longitudes: lambda: sum(
+        len(store.matches('venus', longitude, 'conjunction', 0.5)[0]) for longitude in longitudes))(bench_store(), seeded_rng(1).uniform(0, 360, size).tolist()))
+}
+
+def timed(work):
+    start = time.perf_counter()
+    work()
+    return time.perf_counter() - start
+
+def run_benchmarks(names=None, quick=False, repeats=BENCH_REPEATS):
+    # Best-of-repeats timing per benchmark and size, after one warm-up call
+    for name, (unit, sizes, setup) in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        for size in sizes[:1] if quick else sizes:
+            work = setup(size)
+            work()
+            best = min(timed(work) for _ in range(repeats))
+            yield {'name': name, 'size': size, 'unit': unit, 'seconds': best, 'rate': size / max(best, 1e-12)}
+
+def compare_benchmarks(results, baseline, tolerance=BENCH_TOLERANCE):
+    # [(result, baseline rate or None, regressed)] matched on name and size
+    rates = {(entry['name'], entry['size']): entry['rate'] for entry in baseline['results']}
+    return [(result, rates.get((result['name'], result['size'])),
+             (result['name'], result['size']) in rates and result['rate'] < rates[(result['name'], result['size'])] * (1 - tolerance))
+            for result in results]
+
+# Command line interface
+def parse_date_range(text):
+    # "2020-01-01..2030-12-31" or a single "2020-01-01"
+    start, _, end = text.partition('..')
+    start = datetime.fromisoformat(start.strip())
+    return start, datetime.fromisoformat(end.strip()) if end else start
+
+def cli_draw(args):
+    deck = RUNES if args.tool == 'runes' else TAROT
+    seed, rng = RANDOM.reading(args.seed)
+    print(f"Seed: {seed}", file=sys.stderr)
+    if args.simulate:
+        start = time.perf_counter()
+        stats = spread_statistics(deck, args.spread or 'single', args.simulate, args.reversals, seed, args.workers)
+        print(f"{args.simulate} {stats['spread']} spreads in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+        if args.out:
+            with open(args.out, 'w', encoding='utf-8') as f:
+                json.dump(stats, f, ensure_ascii=False)
+        OUTPUT.records(stats['positions'], lambda position: (
+            f"{position['position']}: chi-square {position['chi_square']:.1f} (df {position['degrees_of_freedom']}), "
+            f"most {position['most_drawn']}, least {position['least_drawn']}"))
+        return
+    if args.spread:
+        drawn = draw_spread(deck, args.spread, args.reversals, rng)
+    else:
+        drawn = ((None, card, is_reversed) for card, is_reversed in draw_many(deck, args.draws, args.reversals, args.unlimited, rng))
+    OUTPUT.records((card_record(*draw) for draw in drawn), card_text)
+
+def cli_coin(args):
+    seed, rng = RANDOM.reading(args.seed)
+    print(f"Seed: {seed}", file=sys.stderr)
+    if args.bulk is not None:
+        OUTPUT.record(toss_bulk(args.bulk, seed, workers=args.workers), lambda stats: "\n".join(bulk_lines(stats)))
+        return
+    stats = CoinStats()
+    
+    def tosses():
+        for _ in range(args.tosses):
+            result = toss_coin(rng)
+            stats.add(result)
+            yield {'result': result}
+    
+    OUTPUT.records(tosses(), lambda toss: toss['result'])
+    OUTPUT.record(stats.record(), lambda record: stats.summary())
+
+def cli_dice(args):
+    terms = parse_dice(args.expression)
+    if args.dist or args.at_least is not None:
+        low, probs = dice_distribution(terms)
+        if args.at_least is not None:
+            OUTPUT.record({'at_least': args.at_least, 'probability': float(probs[max(args.at_least - low, 0):].sum())},
+                          lambda record: f"P(total >= {record['at_least']}) = {record['probability']:.10g}")
+            return
+        tail = np.cumsum(probs[::-1])[::-1]
+        OUTPUT.record(distribution_stats(low, probs), stats_summary)
+        OUTPUT.records(({'total': value, 'probability': p, 'at_least': at_least}
+                        for value, p, at_least in zip(range(low, low + len(probs)), probs.tolist(), tail.tolist())),
+                       lambda row: f"{row['total']}\t{row['probability']:.10g}\t{row['at_least']:.10g}")
+        return
+    seed, rng = RANDOM.reading(args.seed)
+    print(f"Seed: {seed}", file=sys.stderr)
+    if args.rolls:
+        totals = roll_totals(terms, args.rolls, seed, workers=args.workers)
+        OUTPUT.record({'rolls': args.rolls, 'mean': float(totals.mean()), 'std_dev': float(totals.std()),
+                       'min': int(totals.min()), 'max': int(totals.max())},
+                      lambda stats: f"{stats['rolls']} rolls: mean {stats['mean']:.3f}, std dev {stats['std_dev']:.3f}, min {stats['min']}, max {stats['max']}")
+        return
+    rolled = roll_pool(terms, rng)
+    OUTPUT.records(rolled, lambda roll: describe_roll(*roll), lambda roll: roll_record(*roll))
+    OUTPUT.record({'total': sum(subtotal for *_, subtotal in rolled)}, lambda record: f"Overall Total: {record['total']}")
+
+def cli_iching(args):
+    if args.transitions:
+        primary = KING_WEN_BITS[args.transitions - 1]
+        row = transition_matrix(args.method)[primary]
+        OUTPUT.records(({'primary': args.transitions, 'secondary': KING_WEN[secondary], 'probability': float(row[secondary]),
+                         'meaning': HEXAGRAMS[secondary]} for secondary in np.argsort(row)[::-1]),
+                       lambda pair: f"{pair['secondary']}\t{pair['probability']:.10g}\t{pair['meaning']}")
+        return
+    seed, rng = RANDOM.reading(args.seed)
+    print(f"Seed: {seed}", file=sys.stderr)
+    if args.casts is not None:
+        check_casts(args.casts)
+        if args.out:
+            casts = np.zeros(args.casts, dtype=[('primary', 'u1'), ('secondary', 'u1')])
+            king_wen = np.array(KING_WEN, dtype=np.uint8)
+            first = 0
+            for primary, secondary in cast_hexagrams(args.casts, args.method, seed):
+                casts['primary'][first:first + len(primary)] = king_wen[primary]
+                casts['secondary'][first:first + len(primary)] = king_wen[secondary]
+                first += len(primary)
+            np.save(args.out, casts)
+            OUTPUT.note(f"{args.casts} casts written to {args.out}")
+            return
+        OUTPUT.record(cast_summary(cast_statistics(args.casts, args.method, seed, args.workers), args.method),
+                      lambda summary: "\n".join(cast_lines(summary)))
+        return
+    lines = [toss_line(rng)[1] for _ in range(6)]
+    OUTPUT.record(lines, lambda lines: "\n".join(hexagram_report(lines)).strip(), hexagram_record)
+
+def cli_chart(args):
+    if args.batch:
+        start, skipped = time.perf_counter(), []
+
+        def skip(message):
+            skipped.append(message)
+            print(f"Skipped: {message}", file=sys.stderr)
+
+        count = write_rows(batch_charts(read_rows(args.batch), args.workers, houses=args.houses, orbs=parse_orbs(args.orbs), skipped=skip), args.out)
+        elapsed = time.perf_counter() - start
+        print(f"{count} charts in {elapsed:.2f}s ({count / max(elapsed, 1e-9) * 60:.0f} charts/min)"
+              + (f", {len(skipped)} row(s) skipped" if skipped else ""), file=sys.stderr)
+        return
+    if args.when is None or args.lat is None or args.lon is None:
+        raise ValueError("chart needs --when, --lat and --lon (or --batch).")
+    _, when, latitude, longitude = parse_birth({'datetime': args.when, 'lat': args.lat, 'lon': args.lon})
+    degrees = fast_degrees(PositionIndex.load(args.fast), when) if args.fast else chart_degrees(when, latitude, longitude)
+    record, = chart_records([None], [when], [latitude], [longitude], degrees.reshape(-1, 1), args.houses, parse_orbs(args.orbs))
+    OUTPUT.record(record, lambda record: "\n".join(chart_lines(record)))
+
+def cli_planets(args):
+    if args.events:
+        start, end = parse_date_range(args.events)
+        OUTPUT.records(sky_events(start, end + timedelta(days=1), args.bodies, args.workers), sky_event_text, sky_event_record)
+        return
+    if args.table:
+        start, end = parse_date_range(args.table_range)
+        count = write_planet_table(args.table, start, end, parse_step(args.step))
+        print(f"{count} rows written to {args.table}", file=sys.stderr)
+        return
+    positions = planet_snapshot(parse_birth({'datetime': args.when, 'lat': 0, 'lon': 0})[1] if args.when else None)
+    OUTPUT.records(({'body': name, 'symbol': symbol, 'ra_hours': positions[name][0], 'dec_degrees': positions[name][1],
+                     'longitude': positions[name][2]} for name, symbol in PLANET_SYMBOLS),
+                   lambda planet: f"{planet['symbol']} {planet['body'].capitalize()} at (RA: {planet['ra_hours']:.2f}h, Dec: {planet['dec_degrees']:.2f}°)")
+
+def cli_moon(args):
+    start, end = parse_date_range(args.dates)
+    if args.events:
+        OUTPUT.records(moon_phase_events(start, end + timedelta(days=1)),
+                       lambda event: f"{event[0].strftime('%Y-%m-%d %H:%M')} UTC: {QUARTER_PHASES[event[1]]} {MOON_VISUALS[event[1] * 2]}",
+                       lambda event: {'time': event[0].isoformat(), 'phase': QUARTER_PHASES[event[1]]})
+        return
+    days = ((first.date() + timedelta(days=day), index) for first, indices in moon_phase_chunks(start, end)
+            for day, index in enumerate(indices.tolist()))
+    OUTPUT.records(days, lambda day: f"{day[0]}: {MOON_PHASES[day[1]]} {MOON_VISUALS[day[1]]}",
+                   lambda day: {'date': day[0].isoformat(), 'phase': MOON_PHASES[day[1]]})
+
+def cli_numerology(args):
+    if args.batch:
+        start = time.perf_counter()
+        count = write_rows(batch_numerology(read_rows(args.batch), args.workers), args.out)
+        elapsed = time.perf_counter() - start
+        print(f"{count} rows in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.0f} rows/s)", file=sys.stderr)
+        return
+    if args.name is None or args.birth is None:
+        raise ValueError("numerology needs --name and --birth (or --batch).")
+    OUTPUT.records(numerology_report(args.name, args.birth.replace('-', ' ')),
+                   lambda number: f"{number[1]} Number: {number[0]} - {NUMEROLOGY_MEANINGS.get(number[2], {}).get(number[0], 'Unknown')}",
+                   lambda number: {'number': number[2], 'value': number[0], 'meaning': NUMEROLOGY_MEANINGS.get(number[2], {}).get(number[0])})
+
+def cli_sigil(args):
+    if args.file:
+        stream = sys.stdin if args.file == '-' else open(args.file, encoding='utf-8')
+        try:
+            OUTPUT.records(stream_sigils(stream, args.alphabet, args.lines), data=lambda sigil: {'sigil': sigil})
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        return
+    if not args.intention:
+        raise ValueError("sigil needs an intention (or --file).")
+    OUTPUT.record(sigil_consonants(" ".join(args.intention), args.alphabet), data=lambda sigil: {'sigil': sigil})
+
+def cli_serve(args):
+    service = ToolService(args.workers, args.max_pending)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.pool.shutdown(cancel_futures=True)
+
+def cli_bench(args):
+    unknown = set(args.only or ()) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmark: {', '.join(sorted(unknown))} (choose from {', '.join(BENCHMARKS)})")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    results = []
+    for result in run_benchmarks(args.only, args.quick, args.repeat):
+        results.append(result)
+        print(f"{result['name']:<18} {result['size']:>9}  {result['rate']:>14,.0f} {result['unit']}/s  ({result['seconds']:.4f}s)", file=sys.stderr)
+    report = {'created': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'python': sys.version.split()[0],
+              'numpy': np.__version__, 'results': results}
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+    if baseline is None:
+        return 0
+    regressions = 0
+    for result, rate, regressed in compare_benchmarks(results, baseline, args.tolerance):
+        change = f"{result['rate'] / rate - 1:+.1%}" if rate else "new"
+        print(f"{result['name']:<18} {result['size']:>9}  {change:>8}{'  REGRESSION' if regressed else ''}")
+        regressions += regressed
+    print(f"{regressions} regression(s) beyond {args.tolerance:.0%} against {args.baseline}")
+    return 1 if regressions else 0
+
+def cli_synastry(args):
+    if args.action == 'build':
+        if not args.batch:
+            raise ValueError("synastry build needs --batch.")
+        start = time.perf_counter()
+        store = SynastryStore.build(read_rows(args.batch), args.workers)
+        store.save(args.store)
+        print(f"{len(store)} charts stored in {args.store} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+        return
+    store = SynastryStore.load(args.store)
+    if args.id is not None:
+        chart = store.chart(args.id)
+    elif args.when and args.lat is not None and args.lon is not None:
+        _, block = synastry_chunk([{'datetime': args.when, 'lat': args.lat, 'lon': args.lon}])
+        chart = dict(zip(SYNASTRY_KEYS, block[:, 0].tolist()))
+    else:
+        raise ValueError("synastry query needs --id, or --when, --lat and --lon.")
+    pairs = list(itertools.product([args.source] if args.source else SYNASTRY_KEYS, [args.target] if args.target else SYNASTRY_KEYS))
+    orbs = dict.fromkeys(ASPECTS, args.orb) if args.orb is not None else None
+    labels = {key: label for label, key in CHART_POINTS}
+    contacts = ((str(store.ids[index]), source, target, aspect, off)
+                for index, source, target, aspect, off in store.contacts(chart, pairs, [args.aspect] if args.aspect else None, orbs)
+                if args.id is None or store.ids[index] != args.id)
+    OUTPUT.records(contacts,
+                   lambda contact: f"{contact[0]}: {labels[contact[1]]} {ASPECT_SYMBOLS[contact[3]]} {labels[contact[2]]} {contact[3]} (orb {contact[4]:.2f}°)",
+                   lambda contact: {'id': contact[0], 'from': contact[1], 'to': contact[2], 'aspect': contact[3], 'orb': round(contact[4], 3)})
+
+def cli_cache(args):
+    if not RESULTS.enabled:
+        RESULTS.enable()
+    if args.action == 'clear':
+        RESULTS.clear()
+        print(f"Cleared {RESULTS.path}", file=sys.stderr)
+        return
+    report = RESULTS.report()
+    print(f"{report['file']}: {report['bytes'] / (1 << 20):.1f} of {report['max_bytes'] >> 20} MiB, {report['evictions']} eviction(s)", file=sys.stderr)
+    OUTPUT.records(report['tools'].items(), lambda tool: (
+        f"{tool[0]}: {tool[1]['entries']} entries, {tool[1]['bytes'] / 1024:.1f} KiB, {tool[1]['hits']} hits, {tool[1]['misses']} misses "
+        f"({tool[1]['hits'] / max(tool[1]['hits'] + tool[1]['misses'], 1):.1%} hit rate)"), lambda tool: {'tool': tool[0], **tool[1]})
+
+def cli_index(args):
+    if args.action == 'build':
+        index = PositionIndex.build(args.era[0], args.era[1], args.accuracy)
+        index.save(args.index)
+        print(f"Index saved to {args.index}", file=sys.stderr)
+    else:
+        index = PositionIndex.load(args.index)
+    OUTPUT.records(zip(CHART_BODIES, index.validate().values()), lambda body: f"{body[0][0]}: {body[1]:.3f}\"",
+                   lambda body: {'body': body[0][1], 'max_error_arcsec': body[1]})
+
+def positive_int(text):
+    # argparse type for counts that must be at least 1
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='virtual-esoteric-toolkit',
+                                     description="The Virtual Esoteric Toolkit. Run without arguments for the interactive menu.")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_FILE, metavar='FILE',
+                        help=f"record timing spans and counters, written as JSON on exit (default {PROFILE_FILE}, '-' for stderr)")
+    parser.add_argument('--cache', action='store_true', help=f"reuse astronomy results across runs from a SQLite cache ({RESULT_CACHE_FILE})")
+    parser.add_argument('--cache-file', metavar='FILE', help="use this cache file (implies --cache)")
+    parser.add_argument('--format', choices=RENDER_MODES,
+                        help="output as coloured text, plain text or JSON Lines (default: colour on a terminal, plain when piped)")
+    tools = parser.add_subparsers(dest='tool')
+    
+    for name in ('tarot', 'runes'):
+        tool = tools.add_parser(name, help=f"draw from the {name}")
+        tool.add_argument('--draws', type=int, default=1)
+        tool.add_argument('--reversals', action='store_true')
+        tool.add_argument('--unlimited', action='store_true', help="draw with replacement")
+        tool.add_argument('--spread', help=f"named spread: {', '.join(SPREADS)}")
+        tool.add_argument('--simulate', type=int, metavar='N', help="simulate N spreads and report frequency statistics")
+        tool.add_argument('--seed', type=int, help="replay a reading from its logged seed")
+        tool.add_argument('--workers', type=int, default=1, help="processes for --simulate (results do not depend on it)")
+        tool.add_argument('--out', metavar='FILE.json', help="write full simulation statistics as JSON")
+        tool.set_defaults(run=cli_draw)
+    
+    tool = tools.add_parser('coin', help="toss coins")
+    tool.add_argument('--tosses', type=int, default=1)
+    tool.add_argument('--bulk', type=int, metavar='N', help="flip N coins at once and report totals, runs and chi-square")
+    tool.add_argument('--seed', type=int, help="replay a reading from its logged seed")
+    tool.add_argument('--workers', type=int, default=1, help="processes for --bulk (results do not depend on it)")
+    tool.set_defaults(run=cli_coin)
+    
+    tool = tools.add_parser('dice', help="roll dice, e.g. 3d6+2d8, 4d6kh3, 2d20kl1+5, 3d6!")
+    tool.add_argument('expression', help="NdS terms with kh/kl/dh/dl keep-drop, ! exploding and +/- modifiers")
+    tool.add_argument('--dist', action='store_true', help="print the exact outcome distribution")
+    tool.add_argument('--at-least', type=int, metavar='X', help="exact probability that the total is at least X")
+    tool.add_argument('--rolls', type=positive_int, metavar='N', help="roll N times in bulk and summarize the totals")
+    tool.add_argument('--seed', type=int, help="replay a reading from its logged seed")
+    tool.add_argument('--workers', type=int, default=1, help="processes for --rolls (results do not depend on it)")
+    tool.set_defaults(run=cli_dice)
+    
+    tool = tools.add_parser('iching', help="cast a hexagram, or many with --casts")
+    tool.add_argument('--casts', type=int, metavar='N', help="cast N hexagrams in bulk and compare with the exact odds")
+    tool.add_argument('--method', choices=sorted(CASTING_METHODS), default='coins')
+    tool.add_argument('--out', metavar='FILE.npy', help="save bulk casts as King Wen (primary, secondary) pairs")
+    tool.add_argument('--transitions', type=int, metavar='HEXAGRAM', choices=range(1, 65), help="exact odds of each secondary hexagram from a King Wen number")
+    tool.add_argument('--seed', type=int, help="replay a reading from its logged seed")
+    tool.add_argument('--workers', type=int, default=1, help="processes for --casts (results do not depend on it)")
+    tool.set_defaults(run=cli_iching)
+    
+    tool = tools.add_parser('chart', help="birth chart for one birth or a CSV/JSONL batch")
+    tool.add_argument('--when', help="birth date and time (ISO 8601, UTC unless an offset is given)")
+    tool.add_argument('--lat', type=float)
+    tool.add_argument('--lon', type=float)
+    tool.add_argument('--fast', nargs='?', const=INDEX_FILE, metavar='INDEX', help="use the fast geocentric position index")
+    tool.add_argument('--houses', choices=HOUSE_SYSTEMS, default='placidus', help="house system (default placidus)")
+    tool.add_argument('--orbs', metavar='ASPECT=DEG,...', help=f"override aspect orbs, e.g. square=6,trine=5 (aspects: {', '.join(ASPECTS)})")
+    tool.add_argument('--batch', metavar='FILE', help="CSV/JSONL file of datetime, latitude, longitude rows ('-' for stdin)")
+    tool.add_argument('--out', default='-', help="batch output file (.csv or .jsonl, '-' for stdout)")
+    tool.add_argument('--workers', type=int)
+    tool.set_defaults(run=cli_chart)
+    
+    tool = tools.add_parser('planets', help="planetary positions now, at --when, as a table file, or an ingress and station calendar")
+    tool.add_argument('--when')
+    tool.add_argument('--table', metavar='FILE.npy')
+    tool.add_argument('--range', dest='table_range', default='2000-01-01..2000-12-31', help="table span, START..END")
+    tool.add_argument('--step', default='1d', help="table step, e.g. 1d, 6h, 30m")
+    tool.add_argument('--events', metavar='START..END', help="every sign ingress and retrograde/direct station in the span, in time order")
+    tool.add_argument('--bodies', nargs='+', choices=list(SKY_EVENT_STEP_DAYS), metavar='BODY', help="bodies for --events (default all)")
+    tool.add_argument('--workers', type=int, help="processes for --events")
+    tool.set_defaults(run=cli_planets)
+    
+    tool = tools.add_parser('moon', help="moon phases for a date or START..END range")
+    tool.add_argument('dates')
+    tool.add_argument('--events', action='store_true', help="exact new, quarter and full moon times")
+    tool.set_defaults(run=cli_moon)
+    
+    tool = tools.add_parser('numerology', help="numerology report, or all seven numbers per row with --batch")
+    tool.add_argument('--name')
+    tool.add_argument('--birth', help="YYYY-MM-DD")
+    tool.add_argument('--batch', metavar='FILE', help="CSV/JSONL file of name, birthdate rows ('-' for stdin)")
+    tool.add_argument('--out', default='-', help="batch output file (.csv or .jsonl, '-' for stdout)")
+    tool.add_argument('--workers', type=int)
+    tool.set_defaults(run=cli_numerology)
+    
+    tool = tools.add_parser('sigil', help="sigil consonants of an intention, or of a text file")
+    tool.add_argument('intention', nargs='*')
+    tool.add_argument('--file', metavar='FILE', help="read the intention from a file ('-' for stdin)")
+    tool.add_argument('--lines', action='store_true', help="one sigil per line of --file")
+    tool.add_argument('--alphabet', choices=list(SIGIL_ALPHABETS), default='latin')
+    tool.set_defaults(run=cli_sigil)
+    
+    tool = tools.add_parser('synastry', help="store many charts, then search them for aspects to one chart")
+    tool.add_argument('action', choices=['build', 'query'])
+    tool.add_argument('--store', default=SYNASTRY_FILE)
+    tool.add_argument('--batch', metavar='FILE', help="CSV/JSONL file of id, datetime, latitude, longitude rows to store ('-' for stdin)")
+    tool.add_argument('--workers', type=int)
+    tool.add_argument('--id', help="query with a chart already in the store")
+    tool.add_argument('--when', help="or query with this birth (ISO 8601, UTC unless an offset is given)")
+    tool.add_argument('--lat', type=float)
+    tool.add_argument('--lon', type=float)
+    tool.add_argument('--from', dest='source', choices=SYNASTRY_KEYS, help="point of the query chart (default all)")
+    tool.add_argument('--to', dest='target', choices=SYNASTRY_KEYS, help="point of the stored charts (default all)")
+    tool.add_argument('--aspect', choices=list(ASPECTS), help="default all")
+    tool.add_argument('--orb', type=float, help="orb in degrees for every aspect searched (default per aspect)")
+    tool.set_defaults(run=cli_synastry)
+    
+    tool = tools.add_parser('index', help="build or validate the fast position index")
+    tool.add_argument('action', choices=['build', 'validate'])
+    tool.add_argument('--era', type=int, nargs=2, default=[1900, 2050], metavar=('START', 'END'))
+    tool.add_argument('--accuracy', type=float, default=1.0, help="target accuracy in arcseconds")
+    tool.add_argument('--index', default=INDEX_FILE)
+    tool.set_defaults(run=cli_index)
+    
+    tool = tools.add_parser('cache', help="hit/miss counts and size of the result cache, or clear it")
+    tool.add_argument('action', choices=['stats', 'clear'])
+    tool.set_defaults(run=cli_cache)
+    
+    tool = tools.add_parser('bench', help="time every tool's core computation; compare with a baseline")
+    tool.add_argument('--only', nargs='+', metavar='NAME', help=f"benchmarks to run: {', '.join(BENCHMARKS)}")
+    tool.add_argument('--quick', action='store_true', help="smallest input size only")
+    tool.add_argument('--repeat', type=int, default=BENCH_REPEATS, help="best of this many timed runs")
+    tool.add_argument('--out', metavar='FILE.json', help="save results (use as a later --baseline)")
+    tool.add_argument('--baseline', metavar='FILE.json', help="exit 1 if any rate falls more than --tolerance below this run")
+    tool.add_argument('--tolerance', type=float, default=BENCH_TOLERANCE)
+    tool.set_defaults(run=cli_bench)
+    
+    tool = tools.add_parser('serve', help="run the local HTTP/JSON service (POST /<tool>)")
+    tool.add_argument('--host', default=SERVICE_HOST, choices=LOOPBACK_HOSTS)
+    tool.add_argument('--port', type=int, default=SERVICE_PORT)
+    tool.add_argument('--workers', type=int)
+    tool.add_argument('--max-pending', type=int, default=SERVICE_MAX_PENDING, help="requests in progress before answering 503")
+    tool.set_defaults(run=cli_serve)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    if args.profile:
+        PROFILE.enable(args.profile)
+    if args.cache or args.cache_file:
+        RESULTS.enable(args.cache_file or RESULTS.path or RESULT_CACHE_FILE)
+    if args.tool is None:
+        navigate()
+        return 0
+    PROFILE.tool = args.tool
+    OUTPUT.auto(args.format)
+    try:
+        return args.run(args) or 0
+    except BrokenPipeError:
+        # Output piped into head and friends; stay quiet on the way out
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except (ValueError, OSError, ImportError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
 if __name__ == "__main__":
-    menu()
+    sys.exit(main())